@@ -1,24 +1,72 @@
 from __future__ import annotations
 
 import html
+import json
 import mimetypes
 import os
+import shutil
 import uuid
 from datetime import datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from email.message import Message
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, Optional, Tuple
-from urllib.parse import unquote, urlparse
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
 
-from src.runner import run_validation
+from src.cancellation import CancellationToken
+from src.jobs import Job, JobQueue
+from src.multipart import UploadTooLarge, parse_multipart
+from src.report import ReportSummary
+from src.result_cache import ResultCache
+from src.rules import DEFAULT_RULES, load_rule_book
+from src.runner import STATE_FILENAME, SUMMARY_JSON_FILENAME, run_validation
 
 HOST = "127.0.0.1"
 PORT_START = 8000
 PORT_END = 8010
 OUTPUTS_DIR = Path.home() / "PayrollValidatorOutputs"
+# Interactive runs favour a quick response over the smallest download.
+OUTPUT_COMPRESSION = "fastest"
+# Re-uploads of the same workbook only re-check the employee blocks that changed.
+STATE_DIR = OUTPUTS_DIR / "state"
+# Optional department rule sets; see src/rules.load_rule_book for the format.
+RULES_PATH = OUTPUTS_DIR / "rules.json"
+# Re-submitted uploads (or a double-posted form) reuse the earlier run's outputs.
+RESULT_CACHE = ResultCache(OUTPUTS_DIR / "cache")
+# A run still going after this many seconds is stopped and its outputs removed.
+RUN_TIMEOUT_SECONDS = 300
+# Validations running at once; later uploads wait in the job queue. Page and
+# download requests never wait.
+MAX_CONCURRENT_VALIDATIONS = max(2, (os.cpu_count() or 2) // 2)
+# How often a job's status page reloads itself while it is queued or running.
+JOB_REFRESH_SECONDS = 2
+# Shown on the status page of a running job.
+STAGE_LABELS = {
+    "fetch_cache": "Checking for an identical earlier upload",
+    "read_punches": "Reading the punch report",
+    "read_timesheet": "Reading the timesheet",
+    "validate": "Validating employees and writing the report",
+    "write_statuses": "Writing the validated timesheet",
+    "store_cache": "Saving the results",
+}
+# Idle keep-alive connections and stalled uploads are dropped after this long.
+CONNECTION_TIMEOUT_SECONDS = 60
+# Sent with responses to requests whose body was not read to the end; the
+# leftover bytes would otherwise be taken for the next request.
+CLOSE_CONNECTION = {"Connection": "close"}
+# Larger request bodies are refused before any of it is read.
+MAX_UPLOAD_BYTES = 200 * 2**20
+# Upload form field -> file name used when the browser sends none.
+UPLOAD_FIELDS = {"csv": "punches.csv", "xlsx": "timesheet.xlsx"}
 
 
 class UploadHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests, so every response
+    # must carry a Content-Length.
+    protocol_version = "HTTP/1.1"
+    timeout = CONNECTION_TIMEOUT_SECONDS
+
     def do_GET(self) -> None:
         parsed = urlparse(self.path)
         if parsed.path == "/":
@@ -27,97 +75,115 @@ class UploadHandler(BaseHTTPRequestHandler):
         if parsed.path.startswith("/outputs/"):
             self._serve_file(parsed.path[len("/outputs/") :])
             return
+        if parsed.path.startswith("/jobs/"):
+            self._serve_job(parsed.path[len("/jobs/") :], parsed.query)
+            return
         self._send_html(self._error_page("Not found."), status=404)
 
+    def do_HEAD(self) -> None:
+        parsed = urlparse(self.path)
+        if parsed.path.startswith("/outputs/"):
+            self._serve_file(parsed.path[len("/outputs/") :])
+            return
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
     def do_POST(self) -> None:
         parsed = urlparse(self.path)
         if parsed.path != "/upload":
-            self._send_html(self._error_page("Not found."), status=404)
+            self._send_html(self._error_page("Not found."), status=404, headers=CLOSE_CONNECTION)
             return
 
+        run_id = datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        run_dir = OUTPUTS_DIR / f"run-{run_id}"
+        run_dir.mkdir(parents=True, exist_ok=True)
         try:
-            files = self._parse_multipart()
+            files = self._receive_upload(run_dir)
+        except UploadTooLarge as exc:
+            shutil.rmtree(run_dir, ignore_errors=True)
+            self._send_html(self._error_page(str(exc)), status=413, headers=CLOSE_CONNECTION)
+            return
         except ValueError as exc:
-            self._send_html(self._error_page(str(exc)), status=400)
+            shutil.rmtree(run_dir, ignore_errors=True)
+            self._send_html(self._error_page(str(exc)), status=400, headers=CLOSE_CONNECTION)
             return
+        except BaseException:
+            shutil.rmtree(run_dir, ignore_errors=True)
+            raise
 
         csv_file = files.get("csv")
         xlsx_file = files.get("xlsx")
         if csv_file is None or xlsx_file is None:
+            shutil.rmtree(run_dir, ignore_errors=True)
             self._send_html(
                 self._error_page("Please upload both a CSV and XLSX file."), status=400
             )
             return
 
-        run_id = datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
-        run_dir = OUTPUTS_DIR / f"run-{run_id}"
-        run_dir.mkdir(parents=True, exist_ok=True)
-
-        csv_path = run_dir / _safe_filename(csv_file[0], "punches.csv")
-        xlsx_path = run_dir / _safe_filename(xlsx_file[0], "timesheet.xlsx")
-        csv_path.write_bytes(csv_file[1])
-        xlsx_path.write_bytes(xlsx_file[1])
-
-        try:
-            report_path, validated_path, count, ok_count, needs_attention = run_validation(
-                csv_path, xlsx_path, run_dir
+        job = self.server.jobs.submit(run_id, csv_file[1].name, xlsx_file[1].name)
+        if self._wants_json(parsed.query):
+            self._send_json(
+                {"job_id": job.job_id, "state": job.state, "status_url": f"/jobs/{job.job_id}"},
+                status=202,
             )
-        except Exception as exc:
-            self._send_html(self._error_page(f"Validation failed: {exc}"), status=500)
             return
+        self.send_response(303)
+        self.send_header("Location", f"/jobs/{job.job_id}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
 
-        report_link = f"/outputs/{report_path.relative_to(OUTPUTS_DIR)}"
-        validated_link = f"/outputs/{validated_path.relative_to(OUTPUTS_DIR)}"
-        self._send_html(
-            self._result_page(
-                report_link,
-                validated_link,
-                count,
-                ok_count,
-                needs_attention,
+    def _serve_job(self, job_id: str, query: str) -> None:
+        job = self.server.jobs.get(job_id)
+        if job is None:
+            self._send_html(self._error_page("No such validation job."), status=404)
+            return
+        links = _job_links(job)
+        if self._wants_json(query):
+            self._send_json(dict(job.to_dict(), links=links))
+        elif job.state == "done":
+            summary = ReportSummary()
+            summary.load_dict(job.result["summary"])
+            self._send_html(
+                self._result_page(
+                    links["report"],
+                    links["validated"],
+                    links["summary"],
+                    job.result["discrepancies"],
+                    job.result["ok"],
+                    job.result["needs_attention"],
+                    summary,
+                )
             )
+        elif job.state == "failed":
+            self._send_html(self._error_page(f"Validation failed: {job.error}"))
+        else:
+            self._send_html(self._job_page(job))
+
+    def _wants_json(self, query: str) -> bool:
+        if "application/json" in self.headers.get("Accept", ""):
+            return True
+        return parse_qs(query).get("format") == ["json"]
+
+    def _receive_upload(self, run_dir: Path) -> Dict[str, Tuple[str, Path]]:
+        """Streams the uploaded files into ``run_dir``; see ``UPLOAD_FIELDS``."""
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            raise ValueError("Missing upload size.") from None
+
+        def destination(name: str, filename: str) -> Optional[Path]:
+            fallback = UPLOAD_FIELDS.get(name)
+            return run_dir / _safe_filename(filename, fallback) if fallback else None
+
+        return parse_multipart(
+            self.rfile,
+            self.headers.get("Content-Type", ""),
+            length,
+            destination,
+            max_bytes=MAX_UPLOAD_BYTES,
         )
 
-    def _parse_multipart(self) -> Dict[str, Tuple[str, bytes]]:
-        content_type = self.headers.get("Content-Type", "")
-        if "multipart/form-data" not in content_type:
-            raise ValueError("Invalid form submission.")
-        if "boundary=" not in content_type:
-            raise ValueError("Missing multipart boundary.")
-
-        boundary = content_type.split("boundary=")[-1].strip()
-        if boundary.startswith("\"") and boundary.endswith("\""):
-            boundary = boundary[1:-1]
-        boundary_bytes = ("--" + boundary).encode()
-
-        length = int(self.headers.get("Content-Length", "0"))
-        body = self.rfile.read(length)
-        parts = body.split(boundary_bytes)
-        files: Dict[str, Tuple[str, bytes]] = {}
-
-        for part in parts:
-            if not part or part in (b"--\r\n", b"--"):
-                continue
-            if part.startswith(b"\r\n"):
-                part = part[2:]
-            if part.endswith(b"--\r\n"):
-                part = part[:-4]
-            elif part.endswith(b"\r\n"):
-                part = part[:-2]
-            header_bytes, _, data = part.partition(b"\r\n\r\n")
-            if not data:
-                continue
-            headers = header_bytes.decode("utf-8", errors="replace").split("\r\n")
-            disposition = next(
-                (line for line in headers if line.lower().startswith("content-disposition")),
-                "",
-            )
-            name = _extract_field(disposition, "name")
-            filename = _extract_field(disposition, "filename")
-            if name and filename:
-                files[name] = (filename, data)
-        return files
-
     def _serve_file(self, relative_path: str) -> None:
         relative_path = unquote(relative_path)
         if ".." in Path(relative_path).parts:
@@ -128,28 +194,75 @@ class UploadHandler(BaseHTTPRequestHandler):
         if OUTPUTS_DIR.resolve() not in full_path.parents:
             self._send_html(self._error_page("Invalid path."), status=400)
             return
-        if not full_path.exists():
+        if not full_path.is_file():
             self._send_html(self._error_page("File not found."), status=404)
             return
 
         mime_type, _ = mimetypes.guess_type(full_path.as_posix())
         mime_type = mime_type or "application/octet-stream"
-        self.send_response(200)
-        self.send_header("Content-Type", mime_type)
-        self.send_header(
-            "Content-Disposition", f"attachment; filename={full_path.name}"
-        )
-        self.end_headers()
         with full_path.open("rb") as handle:
-            self.wfile.write(handle.read())
+            stat = os.fstat(handle.fileno())
+            # Outputs are written once per run, so size, mtime and inode pin
+            # down the bytes without hashing them.
+            etag = f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+            last_modified = formatdate(stat.st_mtime, usegmt=True)
+            if _not_modified(self.headers, etag, stat.st_mtime):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                return
+
+            size = stat.st_size
+            byte_range = None
+            if self.headers.get("Range") and _if_range_matches(self.headers, etag, stat.st_mtime):
+                try:
+                    byte_range = _parse_range(self.headers["Range"], size)
+                except ValueError:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+            start, end = byte_range or (0, size - 1)
+            self.send_response(206 if byte_range else 200)
+            self.send_header("Content-Type", mime_type)
+            self.send_header(
+                "Content-Disposition", f"attachment; filename={full_path.name}"
+            )
+            self.send_header("Content-Length", str(end - start + 1))
+            if byte_range:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            if self.command != "HEAD" and end >= start:
+                # The kernel copies straight from the file to the socket where
+                # it can; sendfile falls back to chunked sends elsewhere.
+                self.connection.sendfile(handle, start, end - start + 1)
+
+    def _send_json(self, payload: Dict[str, object], status: int = 200) -> None:
+        content = (json.dumps(payload, indent=2) + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(content)
 
-    def _send_html(self, body: str, status: int = 200) -> None:
+    def _send_html(
+        self, body: str, status: int = 200, headers: Optional[Dict[str, str]] = None
+    ) -> None:
         content = body.encode("utf-8")
         self.send_response(status)
         self.send_header("Content-Type", "text/html; charset=utf-8")
         self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(content)
+        if self.command != "HEAD":
+            self.wfile.write(content)
 
     def _index_page(self) -> str:
         return f"""
@@ -193,10 +306,18 @@ class UploadHandler(BaseHTTPRequestHandler):
         self,
         report_link: str,
         validated_link: str,
+        summary_link: str,
         count: int,
         ok_count: int,
         needs_attention: int,
+        summary: ReportSummary,
     ) -> str:
+        breakdown_rows = "".join(
+            f"<tr><td>{html.escape(group.replace('_', ' '))}</td>"
+            f"<td>{html.escape(key)}</td><td>{group_count}</td></tr>"
+            for group in ("error_type", "field")
+            for key, group_count in summary.breakdown(group)
+        )
         return f"""
 <!doctype html>
 <html>
@@ -208,6 +329,8 @@ class UploadHandler(BaseHTTPRequestHandler):
       a {{ color: #0c66e4; }}
       .card {{ max-width: 640px; padding: 20px; border: 1px solid #ddd; border-radius: 12px; }}
       ul {{ padding-left: 18px; }}
+      table {{ border-collapse: collapse; margin: 8px 0 16px; }}
+      td {{ padding: 2px 12px 2px 0; }}
     </style>
   </head>
   <body>
@@ -216,14 +339,46 @@ class UploadHandler(BaseHTTPRequestHandler):
       <p><strong>Discrepancies:</strong> {count}</p>
       <p><strong>Employees OK:</strong> {ok_count}</p>
       <p><strong>Needs Attention:</strong> {needs_attention}</p>
+      <p><strong>Over / under-recorded minutes:</strong> {summary.over_minutes} / {summary.under_minutes}</p>
+      <table>{breakdown_rows}</table>
       <ul>
         <li><a href="{html.escape(report_link)}">Download validation report</a></li>
         <li><a href="{html.escape(validated_link)}">Download validated timesheet</a></li>
+        <li><a href="{html.escape(summary_link)}">Download summary</a></li>
       </ul>
       <p><a href="/">Run another validation</a></p>
     </div>
   </body>
 </html>
+"""
+
+    def _job_page(self, job: Job) -> str:
+        if job.state == "running":
+            status = STAGE_LABELS.get(job.stage or "", "Starting") + "..."
+        else:
+            status = "Waiting for other validations to finish..."
+        return f"""
+<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <meta http-equiv="refresh" content="{JOB_REFRESH_SECONDS}" />
+    <title>Validating...</title>
+    <style>
+      body {{ font-family: Arial, sans-serif; margin: 40px; color: #1a1a1a; }}
+      .card {{ max-width: 640px; padding: 20px; border: 1px solid #ddd; border-radius: 12px; }}
+      .note {{ font-size: 0.9em; color: #555; margin-top: 12px; }}
+    </style>
+  </head>
+  <body>
+    <h1>Validating {html.escape(job.xlsx_name)}</h1>
+    <div class="card">
+      <p>{html.escape(status)}</p>
+      <div class="note">This page refreshes by itself and shows the results when they are ready.
+        You can close it and come back to this address later.</div>
+    </div>
+  </body>
+</html>
 """
 
     def _error_page(self, message: str) -> str:
@@ -244,20 +399,136 @@ class UploadHandler(BaseHTTPRequestHandler):
 """
 
 
+def _run_job(
+    job: Job, progress: Callable[[str], None], cancel_token: CancellationToken
+) -> Dict[str, Any]:
+    summary = ReportSummary()
+    report_path, validated_path, count, ok_count, needs_attention = run_validation(
+        job.run_dir / job.csv_name,
+        job.run_dir / job.xlsx_name,
+        job.run_dir,
+        compression=OUTPUT_COMPRESSION,
+        state_path=STATE_DIR / f"{job.xlsx_name}-{STATE_FILENAME}",
+        rules=load_rule_book(RULES_PATH) if RULES_PATH.exists() else DEFAULT_RULES,
+        summary=summary,
+        cache=RESULT_CACHE,
+        cancel_token=cancel_token,
+        timeout=RUN_TIMEOUT_SECONDS,
+        progress=progress,
+    )
+    return {
+        "discrepancies": count,
+        "ok": ok_count,
+        "needs_attention": needs_attention,
+        "report": report_path.name,
+        "validated": validated_path.name,
+        "summary": summary.to_dict(),
+    }
+
+
+def _job_links(job: Job) -> Dict[str, str]:
+    """Download links of a finished job's outputs; empty until it is done."""
+    if job.state != "done":
+        return {}
+    base = f"/outputs/{job.run_dir.name}"
+    return {
+        "report": f"{base}/{job.result['report']}",
+        "validated": f"{base}/{job.result['validated']}",
+        "summary": f"{base}/{SUMMARY_JSON_FILENAME}",
+    }
+
+
+def _not_modified(headers: Message, etag: str, mtime: float) -> bool:
+    """Whether a conditional GET can be answered with 304 Not Modified."""
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        # If-None-Match compares weakly and takes precedence over the date.
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    return _unchanged_since(headers.get("If-Modified-Since"), mtime)
+
+
+def _if_range_matches(headers: Message, etag: str, mtime: float) -> bool:
+    """Whether a Range request may be honoured; otherwise the whole file is sent."""
+    if_range = headers.get("If-Range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # If-Range needs a strong match.
+        return if_range == etag
+    return _unchanged_since(if_range, mtime)
+
+
+def _unchanged_since(http_date: Optional[str], mtime: float) -> bool:
+    if not http_date:
+        return False
+    try:
+        since = parsedate_to_datetime(http_date)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have whole seconds.
+    return int(mtime) <= since.timestamp()
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` of a single ``bytes=`` range.
+
+    Returns ``None`` for headers to ignore (other units, several ranges,
+    malformed); raises ``ValueError`` if the range lies outside the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first.isdigit() or last.isdigit()):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        # The last N bytes.
+        if int(last) == 0 or size == 0:
+            raise ValueError("Range not satisfiable.")
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError("Range not satisfiable.")
+    if end < start:
+        return None
+    return start, end
+
+
 def _safe_filename(filename: str, fallback: str) -> str:
     cleaned = Path(filename).name
-    return cleaned or fallback
+    return cleaned if cleaned not in ("", ".", "..") else fallback
 
 
-def _extract_field(header: str, key: str) -> Optional[str]:
-    key_token = f'{key}="'
-    if key_token not in header:
-        return None
-    start = header.index(key_token) + len(key_token)
-    end = header.find('"', start)
-    if end == -1:
-        return None
-    return header[start:end]
+class ValidatorServer(ThreadingHTTPServer):
+    """Handles each connection on its own thread.
+
+    Uploads are validated in the background by ``jobs``, at most
+    ``max_validations`` at once; the rest wait in its queue.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        handler: type[BaseHTTPRequestHandler],
+        max_validations: int = MAX_CONCURRENT_VALIDATIONS,
+    ) -> None:
+        if max_validations < 1:
+            raise ValueError("max_validations must be at least 1.")
+        super().__init__(address, handler)
+        self.jobs = JobQueue(OUTPUTS_DIR, _run_job, workers=max_validations)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.jobs.shutdown()
 
 
 def main() -> None:
@@ -269,15 +540,21 @@ def main() -> None:
         webbrowser.open(url)
     except Exception:
         pass
+    resumed = server.jobs.recover()
+    if resumed:
+        print(f"Resuming {len(resumed)} unfinished validation(s).")
     print(f"Open {url} in your browser.")
-    server.serve_forever()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
 
 
-def _start_server() -> Tuple[HTTPServer, int]:
+def _start_server() -> Tuple[ValidatorServer, int]:
     last_error: Optional[OSError] = None
     for port in range(PORT_START, PORT_END + 1):
         try:
-            return HTTPServer((HOST, port), UploadHandler), port
+            return ValidatorServer((HOST, port), UploadHandler), port
         except OSError as exc:
             last_error = exc
             if exc.errno in (48, 98):  # address in use
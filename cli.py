@@ -1,13 +1,35 @@
 from __future__ import annotations
 
 import argparse
+import sys
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-from src.runner import run_validation
+from src.cancellation import ValidationCancelled, ValidationTimedOut
+from src.metrics import RunMetrics
+from src.report import REPORT_FORMATS, ReportSummary
+from src.result_cache import ResultCache
+from src.rules import DEFAULT_RULES, load_rule_book
+from src.runner import BATCH_MANIFEST_FILENAME, STATE_FILENAME, pair_inputs, run_batch, run_validation
+from src.validator import MODES
+from src.xlsx_writer import COMPRESSION_LEVELS
 
+# Exit statuses of a run stopped before it finished, as timeout(1) and an
+# interrupted shell report them.
+EXIT_TIMED_OUT = 124
+EXIT_CANCELLED = 130
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Validate payroll timesheet against punch data.")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "batch":
+        _main_batch(argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Validate payroll timesheet against punch data.",
+        epilog="Run 'cli.py batch --help' to validate many CSV/XLSX pairs at once.",
+    )
     parser.add_argument("--csv", required=True, help="Path to the punch report CSV.")
     parser.add_argument("--xlsx", required=True, help="Path to the filled payroll XLSX.")
     parser.add_argument(
@@ -15,18 +37,177 @@ def main() -> None:
         default="outputs",
         help="Directory for the validation report and validated XLSX.",
     )
-    args = parser.parse_args()
-
-    report_path, validated_path, count, ok_count, needs_attention = run_validation(
-        args.csv, args.xlsx, args.out_dir
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Validate employee blocks on this many processes (default: one).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse results for unchanged employee blocks from the previous run in --out-dir.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse outputs of earlier runs with identical inputs and options from this folder.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Write per-stage timings, memory peaks and counts to run_metrics.json in --out-dir.",
     )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="Keep the run under this much resident memory, spilling punch data to disk if needed.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Stop the run after this many seconds and remove the outputs it had written.",
+    )
+    _add_run_options(parser)
+    args = parser.parse_args(argv)
+    state_path = Path(args.out_dir) / STATE_FILENAME if args.incremental else None
+
+    summary = ReportSummary()
+    try:
+        report_path, validated_path, count, ok_count, needs_attention = run_validation(
+            args.csv,
+            args.xlsx,
+            args.out_dir,
+            workers=args.workers,
+            state_path=state_path,
+            summary=summary,
+            cache=ResultCache(args.cache_dir) if args.cache_dir else None,
+            metrics=RunMetrics() if args.metrics else None,
+            memory_budget=args.memory_budget * 2**20 if args.memory_budget else None,
+            timeout=args.timeout,
+            **_run_options(args),
+        )
+    except ValidationTimedOut:
+        print(
+            f"Validation timed out after {args.timeout:g} s; partial outputs removed.",
+            file=sys.stderr,
+        )
+        raise SystemExit(EXIT_TIMED_OUT)
+    except ValidationCancelled:
+        print("Validation cancelled; partial outputs removed.", file=sys.stderr)
+        raise SystemExit(EXIT_CANCELLED)
 
-    print(f"Discrepancies: {count}")
+    if report_path is not None:
+        print(f"Discrepancies: {count}")
+        for group in ("error_type", "field"):
+            for key, group_count in summary.breakdown(group):
+                print(f"  {group} {key}: {group_count}")
+        print(f"Over-recorded minutes: {summary.over_minutes}")
+        print(f"Under-recorded minutes: {summary.under_minutes}")
     print(f"Employees OK: {ok_count}")
     print(f"Employees Needs Attention: {needs_attention}")
-    print(f"Report: {report_path}")
+    if report_path is not None:
+        print(f"Report: {report_path}")
     print(f"Validated XLSX: {validated_path}")
 
 
+def _main_batch(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="cli.py batch",
+        description="Validate every punch report against the timesheet that has its week's tab.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Punch report CSVs, timesheet XLSX files, or folders containing them.",
+    )
+    parser.add_argument(
+        "--out-root",
+        default="outputs",
+        help="Directory that receives one output folder per pair and the batch manifest.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Validate this many pairs at once on separate processes (default: one per CPU).",
+    )
+    _add_run_options(parser)
+    args = parser.parse_args(argv)
+
+    csv_paths: List[Path] = []
+    xlsx_paths: List[Path] = []
+    for item in map(Path, args.inputs):
+        candidates = sorted(item.iterdir()) if item.is_dir() else [item]
+        for path in candidates:
+            if path.suffix.lower() == ".csv":
+                csv_paths.append(path)
+            elif path.suffix.lower() == ".xlsx" and not path.stem.endswith("-validated"):
+                xlsx_paths.append(path)
+
+    pairs = pair_inputs(csv_paths, xlsx_paths)
+    entries = run_batch(pairs, args.out_root, workers=args.workers, **_run_options(args))
+    failed = 0
+    for entry in entries:
+        name = f"{Path(entry['csv']).name} + {Path(entry['xlsx']).name}"
+        if "error" in entry:
+            failed += 1
+            print(f"{name}: FAILED ({entry['error']})")
+        else:
+            print(
+                f"{name}: {entry['discrepancies']} discrepancies, "
+                f"{entry['ok']} OK, {entry['needs_attention']} need attention"
+            )
+    print(f"Manifest: {Path(args.out_root) / BATCH_MANIFEST_FILENAME}")
+    if failed:
+        raise SystemExit(1)
+
+
+def _add_run_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--compression",
+        choices=sorted(COMPRESSION_LEVELS),
+        default="default",
+        help="Compression level for the validated XLSX (fastest, default or smallest).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["python", "numpy"],
+        default="python",
+        help="Validation engine; numpy checks all employee-days as arrays (requires numpy).",
+    )
+    parser.add_argument(
+        "--rules",
+        default=None,
+        help="JSON file of named rule sets and the department codes that use them.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=list(MODES),
+        default="full",
+        help="status_only marks each employee ok / needs attention without writing a report.",
+    )
+    parser.add_argument(
+        "--report-format",
+        choices=list(REPORT_FORMATS),
+        default="csv",
+        help="Discrepancy report format; arrow and parquet need pyarrow (else jsonl.gz).",
+    )
+
+
+def _run_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "compression": args.compression,
+        "engine": args.engine,
+        "rules": load_rule_book(args.rules) if args.rules else DEFAULT_RULES,
+        "mode": args.mode,
+        "report_format": args.report_format,
+    }
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark NameResolver on a synthetic multi-site roster.
+
+Builds a roster of distinct employees, then resolves timesheet names that are
+exact, truncated to a first name, or one typo away. Decisions are checked
+against a linear first-name scan (the pre-index algorithm) on every lookup.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models import EmployeeBlock  # noqa: E402
+from src.name_resolver import NameResolver, _name_tokens, _within_edit_distance  # noqa: E402
+
+LETTERS = "abcdefghilmnoprstuvz"
+
+
+def build_roster(rng: random.Random, size: int, first_names: int) -> list[str]:
+    firsts = ["".join(rng.choice(LETTERS) for _ in range(rng.randint(3, 7))) for _ in range(first_names)]
+    lasts = ["".join(rng.choice(LETTERS) for _ in range(rng.randint(4, 9))) for _ in range(size // 4)]
+    roster: set[str] = set()
+    while len(roster) < size:
+        parts = [rng.choice(firsts), rng.choice(lasts)]
+        if rng.random() < 0.2:
+            parts.append(rng.choice(lasts))
+        roster.add(" ".join(parts))
+    return sorted(roster)
+
+
+def timesheet_names(rng: random.Random, roster: list[str], count: int) -> list[str]:
+    names = []
+    for _ in range(count):
+        name = rng.choice(roster)
+        roll = rng.random()
+        chars = list(name)
+        pos = rng.randrange(len(chars))
+        if roll < 0.2:
+            chars[pos] = rng.choice(LETTERS)
+        elif roll < 0.35:
+            del chars[pos]
+        elif roll < 0.45:
+            chars.insert(pos, rng.choice(LETTERS))
+        elif roll < 0.5:
+            chars = list(name.split()[0])
+        names.append("".join(chars).strip().title())
+    return names
+
+
+def linear_resolve(name: str, key: str, roster: list[str], variants: dict, by_first: dict):
+    tokens = _name_tokens(name)
+    if not tokens:
+        return None
+    ordered = [" ".join(tokens)]
+    if len(tokens) >= 2:
+        ordered += [" ".join(tokens[:2]), " ".join([tokens[0], tokens[-1]])]
+    ordered.append(tokens[0])
+    for variant in dict.fromkeys(ordered):
+        candidates = variants.get(variant, set())
+        if key in candidates:
+            return key
+        if len(candidates) == 1:
+            return next(iter(candidates))
+    if len(tokens) >= 2:
+        fuzzy = {
+            employee_key
+            for employee_key in by_first.get(tokens[0], ())
+            if _within_edit_distance(tokens[-1], employee_key.split()[-1])
+        }
+        if len(fuzzy) == 1:
+            return next(iter(fuzzy))
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--employees", type=int, default=50_000)
+    parser.add_argument("--first-names", type=int, default=40)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    roster = build_roster(rng, args.employees, args.first_names)
+    names = timesheet_names(rng, roster, args.lookups)
+    blocks = [
+        EmployeeBlock(name=name, key=" ".join(_name_tokens(name)), dates_by_col={},
+                      times_by_date={}, status_row=None)
+        for name in names
+    ]
+
+    started = time.perf_counter()
+    resolver = NameResolver(roster)
+    built = time.perf_counter()
+    resolved = [resolver.resolve(block) for block in blocks]
+    finished = time.perf_counter()
+
+    variants: dict[str, set[str]] = {}
+    by_first: dict[str, list[str]] = {}
+    for employee_key in roster:
+        tokens = _name_tokens(employee_key)
+        by_first.setdefault(tokens[0], []).append(employee_key)
+        for variant in {" ".join(tokens), tokens[0], " ".join(tokens[:2]), f"{tokens[0]} {tokens[-1]}"}:
+            variants.setdefault(variant, set()).add(employee_key)
+    scan_started = time.perf_counter()
+    reference = [linear_resolve(b.name, b.key, roster, variants, by_first) for b in blocks]
+    scan_finished = time.perf_counter()
+
+    matched = sum(1 for key in resolved if key is not None)
+    print(f"employees: {len(roster)}  lookups: {len(blocks)}  matched: {matched}")
+    print(f"index build: {built - started:.3f}s")
+    print(f"resolve (indexed): {finished - built:.3f}s")
+    print(f"resolve (linear scan): {scan_finished - scan_started:.3f}s")
+    if resolved != reference:
+        mismatches = sum(1 for a, b in zip(resolved, reference) if a != b)
+        raise SystemExit(f"{mismatches} decisions differ from the linear scan")
+    print("decisions: identical to linear scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+# Readers and writers check their token once per this many rows.
+CHECK_EVERY_ROWS = 1024
+
+
+class ValidationCancelled(Exception):
+    """Raised inside a run whose cancellation token was cancelled."""
+
+
+class ValidationTimedOut(ValidationCancelled):
+    """Raised inside a run that went past its token's deadline."""
+
+
+class CancellationToken:
+    """A flag another thread (or an event loop) sets to stop a run.
+
+    The run checks it between stages, and per block or per ``CHECK_EVERY_ROWS``
+    rows inside them, and raises ``ValidationCancelled`` at the first check
+    after ``cancel``. With a ``timeout`` (seconds) it also raises
+    ``ValidationTimedOut`` once that much time has passed. A token made with
+    a ``parent`` is cancelled whenever the parent is.
+    """
+
+    def __init__(
+        self, timeout: Optional[float] = None, parent: Optional["CancellationToken"] = None
+    ) -> None:
+        self._event = threading.Event()
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.parent = parent
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise ValidationCancelled("The validation run was cancelled.")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise ValidationTimedOut(f"The validation run took longer than {self.timeout:g} seconds.")
+        if self.parent is not None:
+            self.parent.raise_if_cancelled()
+
+
+def check_cancelled(token: Optional[CancellationToken]) -> None:
+    if token is not None:
+        token.raise_if_cancelled()
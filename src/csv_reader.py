@@ -4,8 +4,10 @@ import csv
 import re
 from datetime import date
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Optional, Tuple
 
+from .cancellation import CHECK_EVERY_ROWS, CancellationToken, check_cancelled
+from .memory_budget import CHECK_INTERVAL, MemoryBudget, SpilledPunches
 from .models import DailyPunches, PunchSegment
 from .utils import normalize_name, parse_csv_date, parse_csv_time
 
@@ -36,7 +38,16 @@ def read_report_range(csv_path: str | Path) -> Tuple[date, date] | None:
     return parsed
 
 
-def read_punches(csv_path: str | Path) -> Dict[Tuple[str, date], DailyPunches]:
+def read_punches(
+    csv_path: str | Path,
+    budget: Optional[MemoryBudget] = None,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Mapping[Tuple[str, date], DailyPunches]:
+    """Groups punch rows by employee and day.
+
+    With a ``budget``, the groups move to a ``SpilledPunches`` store on disk
+    once the process nears it, and the rest of the rows are added there.
+    """
     path = Path(csv_path)
     with path.open(newline="") as handle:
         reader = csv.reader(handle)
@@ -61,9 +72,18 @@ def read_punches(csv_path: str | Path) -> Dict[Tuple[str, date], DailyPunches]:
         idx_date = idx("DATE")
         idx_in = idx("IN")
         idx_out = idx("OUT")
+        idx_dept = header.index("DEPT CODE") if "DEPT CODE" in header else None
 
         grouped: Dict[Tuple[str, date], DailyPunches] = {}
-        for row in reader:
+        spilled: Optional[SpilledPunches] = None
+        for row_number, row in enumerate(reader):
+            if row_number % CHECK_EVERY_ROWS == 0:
+                check_cancelled(cancel_token)
+            if budget is not None and spilled is None and row_number % CHECK_INTERVAL == 0:
+                if budget.near():
+                    spilled = SpilledPunches()
+                    spilled.add_grouped(grouped)
+                    grouped.clear()
             if not row or len(row) <= idx_out:
                 continue
             date_raw = row[idx_date].strip()
@@ -88,6 +108,10 @@ def read_punches(csv_path: str | Path) -> Dict[Tuple[str, date], DailyPunches]:
                 continue
 
             key = normalize_name(name)
+            segment = PunchSegment(in_minutes=in_minutes, out_minutes=out_minutes)
+            if spilled is not None:
+                spilled.add(key, punch_date, name.strip(), _dept_code(row, idx_dept), segment)
+                continue
             bucket_key = (key, punch_date)
             if bucket_key not in grouped:
                 grouped[bucket_key] = DailyPunches(
@@ -95,17 +119,25 @@ def read_punches(csv_path: str | Path) -> Dict[Tuple[str, date], DailyPunches]:
                     employee_key=key,
                     date=punch_date,
                     segments=[],
+                    dept_code=_dept_code(row, idx_dept),
                 )
-            grouped[bucket_key].segments.append(
-                PunchSegment(in_minutes=in_minutes, out_minutes=out_minutes)
-            )
+            grouped[bucket_key].segments.append(segment)
 
+        if spilled is not None:
+            return spilled.finish()
         for daily in grouped.values():
             daily.segments.sort(key=lambda seg: seg.in_minutes)
 
         return grouped
 
 
+def _dept_code(row: list[str], idx_dept: int | None) -> str | None:
+    # The first punch row of an employee-day decides which rule set applies.
+    if idx_dept is None or idx_dept >= len(row):
+        return None
+    return row[idx_dept].strip() or None
+
+
 def _parse_date_range(text: str) -> Tuple[date, date] | None:
     match = DATE_RANGE_SLASH_RE.search(text)
     if match:
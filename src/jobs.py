@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .cancellation import CancellationToken
+
+JOB_FILENAME = "job.json"
+JOB_STATES = ("queued", "running", "done", "failed")
+# Job ids name their run directory, ``run-<id>``.
+_JOB_ID = re.compile(r"[0-9A-Za-z_-]+")
+
+
+@dataclass
+class Job:
+    job_id: str
+    run_dir: Path
+    # Uploaded input file names inside run_dir.
+    csv_name: str
+    xlsx_name: str
+    state: str = "queued"
+    # Pipeline stage of a running job, as reported by run_validation.
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    # What the run function returned, once done.
+    result: Optional[Dict[str, Any]] = None
+    created_at: str = ""
+    updated_at: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = asdict(self)
+        payload["run_dir"] = self.run_dir.name
+        return payload
+
+    @classmethod
+    def load(cls, run_dir: Path) -> "Job":
+        payload = json.loads((run_dir / JOB_FILENAME).read_text())
+        payload["run_dir"] = run_dir
+        return cls(**payload)
+
+    def save(self) -> None:
+        # Written whole and renamed so readers never see half a file.
+        tmp_path = self.run_dir / f"{JOB_FILENAME}.tmp"
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+        os.replace(tmp_path, self.run_dir / JOB_FILENAME)
+
+
+JobRunner = Callable[[Job, Callable[[str], None], CancellationToken], Dict[str, Any]]
+
+
+class JobQueue:
+    """Runs validation jobs on a thread pool, ``workers`` at a time.
+
+    Each job lives in ``root/run-<job_id>`` next to its inputs and outputs, and
+    its state is saved to ``job.json`` on every change, so finished jobs can be
+    looked up after a restart and ``recover`` queues unfinished ones again.
+    ``run(job, progress, cancel_token)`` does the work and returns the job's
+    result; an exception it raises fails the job with its message. The token
+    is cancelled by ``shutdown``.
+    """
+
+    def __init__(self, root: str | Path, run: JobRunner, workers: int) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        self.root = Path(root)
+        self._run = run
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="validation")
+        self._lock = threading.Lock()
+        # Jobs submitted since start; older ones are read from disk.
+        self._jobs: Dict[str, Job] = {}
+        # Tokens of the jobs running now, by job id.
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._closed = False
+
+    def run_dir(self, job_id: str) -> Path:
+        return self.root / f"run-{job_id}"
+
+    def submit(self, job_id: str, csv_name: str, xlsx_name: str) -> Job:
+        now = _now()
+        job = Job(job_id, self.run_dir(job_id), csv_name, xlsx_name, created_at=now, updated_at=now)
+        job.save()
+        return self._enqueue(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A snapshot of the job, or ``None`` if there is no such job."""
+        if not _JOB_ID.fullmatch(job_id):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return replace(job)
+        try:
+            return Job.load(self.run_dir(job_id))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def recover(self) -> List[Job]:
+        """Queues jobs left queued or running by an earlier process, oldest first."""
+        recovered: List[Job] = []
+        for job_path in sorted(self.root.glob(f"run-*/{JOB_FILENAME}")):
+            try:
+                job = Job.load(job_path.parent)
+            except (OSError, ValueError, TypeError):
+                continue
+            if job.state in ("queued", "running") and job.job_id not in self._jobs:
+                self._update(job, state="queued", stage=None)
+                recovered.append(self._enqueue(job))
+        return recovered
+
+    def shutdown(self) -> None:
+        """Stops taking jobs and cancels the running ones.
+
+        Running jobs stop at their next cancellation check and are saved as
+        queued again; they and the jobs still waiting are left on disk for
+        ``recover``. Returns without waiting for them to stop.
+        """
+        with self._lock:
+            self._closed = True
+            for token in self._tokens.values():
+                token.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _enqueue(self, job: Job) -> Job:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            snapshot = replace(job)
+        self._pool.submit(self._execute, job)
+        return snapshot
+
+    def _execute(self, job: Job) -> None:
+        token = CancellationToken()
+        with self._lock:
+            if self._closed:
+                return
+            self._tokens[job.job_id] = token
+        try:
+            self._update(job, state="running")
+            result = self._run(job, lambda stage: self._update(job, stage=stage), token)
+        except Exception as exc:
+            if token.cancelled:
+                # Stopped by shutdown; recover runs it again.
+                self._update(job, state="queued", stage=None)
+            else:
+                self._update(job, state="failed", stage=None, error=str(exc) or type(exc).__name__)
+        else:
+            self._update(job, state="done", stage=None, result=result)
+        finally:
+            with self._lock:
+                del self._tokens[job.job_id]
+
+    def _update(self, job: Job, **changes: Any) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.updated_at = _now()
+            job.save()
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
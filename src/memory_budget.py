@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+from collections.abc import Mapping
+from datetime import date
+from typing import Dict, Iterator, Optional, Tuple
+
+from .models import DailyPunches, PunchSegment
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+# Grouped punches are moved to disk once the process uses this share of the
+# budget; the rest is left for validation, the report and the status workbook.
+SPILL_FRACTION = 0.8
+# Rows read between two RSS checks.
+CHECK_INTERVAL = 4096
+# SQLite keeps at most this many KiB of a spilled store in memory.
+SPILL_CACHE_KIB = 2048
+
+
+class MemoryBudget:
+    """A cap on the process's resident memory, in bytes.
+
+    Under a budget ``run_validation`` runs one stage at a time, validates with
+    the python engine in this process and parses the timesheet incrementally;
+    outputs are the same. ``near`` tells readers when to move what they have
+    gathered to disk. Where the resident size cannot be read it is always
+    near, so everything spills.
+    """
+
+    def __init__(self, limit_bytes: int) -> None:
+        if limit_bytes <= 0:
+            raise ValueError("The memory budget must be a positive number of bytes.")
+        self.limit_bytes = limit_bytes
+
+    def near(self) -> bool:
+        rss = current_rss()
+        return rss is None or rss >= self.limit_bytes * SPILL_FRACTION
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or ``None`` if unknown.
+
+    Linux reports the current size; other platforms only the peak so far,
+    which never understates it.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class SpilledPunches(Mapping):
+    """Punch groups kept in an anonymous on-disk SQLite database.
+
+    A read-only ``(employee_key, date) -> DailyPunches`` mapping that behaves
+    like the dict ``read_punches`` builds: keys iterate in first-seen order and
+    each employee-day's segments are sorted by clock-in, ties in row order.
+    ``DailyPunches`` are rebuilt on each lookup.
+    """
+
+    def __init__(self) -> None:
+        # An empty file name is a private temporary database, deleted on close.
+        self._db = sqlite3.connect("", check_same_thread=False)
+        self._db.execute(f"PRAGMA cache_size = -{SPILL_CACHE_KIB}")
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute(
+            "CREATE TABLE punch (employee_key TEXT, day INTEGER, seq INTEGER,"
+            " employee_name TEXT, dept_code TEXT, in_minutes INTEGER, out_minutes INTEGER)"
+        )
+        self._seq = 0
+        self._length: Optional[int] = None
+
+    def add(
+        self,
+        employee_key: str,
+        day: date,
+        employee_name: str,
+        dept_code: Optional[str],
+        segment: PunchSegment,
+    ) -> None:
+        self._db.execute(
+            "INSERT INTO punch VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                employee_key,
+                day.toordinal(),
+                self._seq,
+                employee_name,
+                dept_code,
+                segment.in_minutes,
+                segment.out_minutes,
+            ),
+        )
+        self._seq += 1
+
+    def add_grouped(self, grouped: Dict[Tuple[str, date], DailyPunches]) -> None:
+        """Moves groups gathered in memory into the store, in their order."""
+        for daily in grouped.values():
+            for segment in daily.segments:
+                self.add(daily.employee_key, daily.date, daily.employee_name, daily.dept_code, segment)
+
+    def finish(self) -> "SpilledPunches":
+        self._db.execute("CREATE INDEX punch_day ON punch (employee_key, day, seq)")
+        self._db.commit()
+        return self
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __getitem__(self, punch_key: Tuple[str, date]) -> DailyPunches:
+        employee_key, day = punch_key
+        rows = self._db.execute(
+            "SELECT employee_name, dept_code, in_minutes, out_minutes FROM punch"
+            " WHERE employee_key = ? AND day = ? ORDER BY seq",
+            (employee_key, day.toordinal()),
+        ).fetchall()
+        if not rows:
+            raise KeyError(punch_key)
+        segments = [PunchSegment(in_minutes=row[2], out_minutes=row[3]) for row in rows]
+        segments.sort(key=lambda seg: seg.in_minutes)
+        return DailyPunches(
+            employee_name=rows[0][0],
+            employee_key=employee_key,
+            date=day,
+            segments=segments,
+            dept_code=rows[0][1],
+        )
+
+    def __iter__(self) -> Iterator[Tuple[str, date]]:
+        cursor = self._db.execute(
+            "SELECT employee_key, day FROM punch GROUP BY employee_key, day ORDER BY MIN(seq)"
+        )
+        for employee_key, ordinal in cursor:
+            yield employee_key, date.fromordinal(ordinal)
+
+    def __len__(self) -> int:
+        if self._length is None:
+            (self._length,) = self._db.execute(
+                "SELECT COUNT(*) FROM (SELECT DISTINCT employee_key, day FROM punch)"
+            ).fetchone()
+        return self._length
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+METRICS_FILENAME = "run_metrics.json"
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    # Peak traced allocation above what was live when the stage started.
+    peak_bytes: Optional[int] = None
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+MetricsSink = Callable[["RunMetrics"], None]
+
+
+class RunMetrics:
+    """Wall time, CPU time, traced memory peak and counts per pipeline stage.
+
+    Pass one to ``run_validation`` to have it recorded and written as
+    ``run_metrics.json`` next to the outputs; each of ``sinks`` is then called
+    with the finished metrics. Measured stages run one after another rather
+    than overlapping, so their numbers are their own. A stage entered more than
+    once (the timesheet is inflated, then parsed) adds up into one record.
+    """
+
+    def __init__(self, sinks: Iterable[MetricsSink] = (), trace_memory: bool = True) -> None:
+        self.sinks = list(sinks)
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageMetrics] = {}
+        self.wall_seconds = 0.0
+        self.peak_bytes: Optional[int] = None
+        self._open: List[StageMetrics] = []
+        # Highest traced total seen; stages reset tracemalloc's own peak.
+        self._highest = 0
+
+    @contextmanager
+    def run(self) -> Iterator["RunMetrics"]:
+        """Measures the whole run; traces allocations unless already traced."""
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self._tracing:
+            tracemalloc.reset_peak()
+            baseline = self._highest = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_seconds = time.perf_counter() - start
+            if self._tracing:
+                self.peak_bytes = max(0, self._observe_peak() - baseline)
+            if started_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        record = self.stages.setdefault(name, StageMetrics(name))
+        tracing = self._tracing
+        if tracing:
+            # The peak is process wide, so a stage's own peak only holds while
+            # stages do not overlap; instrumented runs execute them in turn.
+            self._observe_peak()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        self._open.append(record)
+        try:
+            yield record
+        finally:
+            self._open.pop()
+            record.wall_seconds += time.perf_counter() - wall
+            record.cpu_seconds += time.process_time() - cpu
+            if tracing:
+                peak = max(0, self._observe_peak() - baseline)
+                record.peak_bytes = max(record.peak_bytes or 0, peak)
+
+    def timed(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yields ``items``, booking the time spent producing them to ``name``.
+
+        Meant for a generator consumed inside another stage: its time is moved
+        out of that stage. Its memory stays with the consuming stage's peak.
+        """
+        record = self.stages.setdefault(name, StageMetrics(name))
+        parent = self._open[-1] if self._open else None
+        return self._timed_items(iter(items), record, parent)
+
+    def _timed_items(
+        self, iterator: Iterator[T], record: StageMetrics, parent: Optional[StageMetrics]
+    ) -> Iterator[T]:
+        while True:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                spent_wall = time.perf_counter() - wall
+                spent_cpu = time.process_time() - cpu
+                record.wall_seconds += spent_wall
+                record.cpu_seconds += spent_cpu
+                if parent is not None:
+                    parent.wall_seconds -= spent_wall
+                    parent.cpu_seconds -= spent_cpu
+            yield item
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_seconds": round(self.wall_seconds, 6),
+            "peak_bytes": self.peak_bytes,
+            "stages": [
+                dict(
+                    asdict(record),
+                    wall_seconds=round(record.wall_seconds, 6),
+                    cpu_seconds=round(record.cpu_seconds, 6),
+                )
+                for record in self.stages.values()
+            ],
+        }
+
+    def emit(self, path: str | Path) -> None:
+        """Writes the metrics as JSON to ``path``, then hands them to each sink."""
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+        for sink in self.sinks:
+            sink(self)
+
+    def _observe_peak(self) -> int:
+        peak = tracemalloc.get_traced_memory()[1]
+        self._highest = max(self._highest, peak)
+        return peak
+
+    @property
+    def _tracing(self) -> bool:
+        return self.trace_memory and tracemalloc.is_tracing()
+
+
+def stage(metrics: Optional[RunMetrics], name: str) -> ContextManager[StageMetrics]:
+    """``metrics.stage(name)``, or a throwaway record when not measuring."""
+    if metrics is None:
+        return nullcontext(StageMetrics(name))
+    return metrics.stage(name)
+
+
+class InlineExecutor:
+    """Executor stand-in that runs each task at submit time, in the caller."""
+
+    def submit(self, func: Callable[..., T], *args: Any) -> "Future[T]":
+        future: "Future[T]" = Future()
+        try:
+            future.set_result(func(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+    def __enter__(self) -> "InlineExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .utils import format_minutes
 
 
 @dataclass(frozen=True)
@@ -17,6 +19,7 @@ class DailyPunches:
     employee_key: str
     date: date
     segments: List[PunchSegment]
+    dept_code: Optional[str] = None
 
 
 @dataclass
@@ -36,14 +39,139 @@ class ExpectedTimes:
     shift_minutes: Optional[int]
 
 
-@dataclass
+FIELDS = (
+    "day",
+    "punch_sequence",
+    "lunch_break",
+    "clock_in",
+    "clock_out_lunch",
+    "clock_in_work",
+    "clock_out",
+)
+ERROR_TYPES = (
+    "missing_punch_data",
+    "invalid_punch_sequence",
+    "missing_or_invalid_lunch",
+    "unexpected_entry",
+    "missing_entry",
+    "mismatch",
+    "missing_timesheet_row",
+)
+FIELD_CODES = {name: code for code, name in enumerate(FIELDS)}
+ERROR_CODES = {name: code for code, name in enumerate(ERROR_TYPES)}
+
+_PUNCH_SEQUENCE = FIELD_CODES["punch_sequence"]
+_LUNCH_BREAK = FIELD_CODES["lunch_break"]
+
+# Raw discrepancy values: text, a minute-of-day, or candidate minutes. A
+# punch_sequence actual is the segment count; a lunch_break expected is the
+# required lunch length and its actual the recorded (out, in) minutes.
+RawValue = Union[str, int, Tuple[int, ...], None]
+
+
 class Discrepancy:
-    employee_name: str
-    date: Optional[date]
-    field: str
-    expected: Optional[str]
-    actual: Optional[str]
-    error_type: str
+    """One report row, stored compactly.
+
+    Field and error type are kept as integer codes and times and counts as raw
+    ints; ``expected``/``actual`` are only turned into text (``HH:MM``,
+    candidates joined with `` | ``) when read, typically by the report writer.
+    """
+
+    __slots__ = ("employee_name", "date", "field_code", "error_code", "raw_expected", "raw_actual")
+
+    def __init__(
+        self,
+        employee_name: str,
+        date: Optional[date],
+        field: str,
+        expected: RawValue,
+        actual: RawValue,
+        error_type: str,
+    ) -> None:
+        self.employee_name = employee_name
+        self.date = date
+        self.field_code = FIELD_CODES[field]
+        self.error_code = ERROR_CODES[error_type]
+        self.raw_expected = expected
+        self.raw_actual = actual
+
+    @property
+    def field(self) -> str:
+        return FIELDS[self.field_code]
+
+    @property
+    def error_type(self) -> str:
+        return ERROR_TYPES[self.error_code]
+
+    @property
+    def expected(self) -> Optional[str]:
+        return _format_raw(self.field_code, self.raw_expected)
+
+    @property
+    def actual(self) -> Optional[str]:
+        return _format_raw(self.field_code, self.raw_actual)
+
+    def pack(self) -> tuple:
+        """Plain-tuple form for pickling across processes or storing as JSON."""
+        return (
+            self.employee_name,
+            self.date.toordinal() if self.date else None,
+            self.field_code,
+            self.error_code,
+            self.raw_expected,
+            self.raw_actual,
+        )
+
+    @classmethod
+    def unpack(cls, row: Sequence, day: Optional[date]) -> "Discrepancy":
+        item = cls.__new__(cls)
+        item.employee_name = row[0]
+        item.date = day
+        item.field_code = row[2]
+        item.error_code = row[3]
+        # JSON turns candidate and lunch tuples into lists.
+        item.raw_expected = tuple(row[4]) if isinstance(row[4], list) else row[4]
+        item.raw_actual = tuple(row[5]) if isinstance(row[5], list) else row[5]
+        return item
+
+    def _values(self) -> tuple:
+        return (
+            self.employee_name,
+            self.date,
+            self.field,
+            self.expected,
+            self.actual,
+            self.error_type,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Discrepancy):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        name, day, field, expected, actual, error_type = self._values()
+        return (
+            f"Discrepancy(employee_name={name!r}, date={day!r}, field={field!r}, "
+            f"expected={expected!r}, actual={actual!r}, error_type={error_type!r})"
+        )
+
+
+def _format_raw(field_code: int, value: RawValue) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if field_code == _PUNCH_SEQUENCE:
+        return str(value)
+    if field_code == _LUNCH_BREAK:
+        if isinstance(value, int):
+            return f"{value} minutes"
+        lunch_out, lunch_in = value
+        return f"{format_minutes(lunch_out)}-{format_minutes(lunch_in)}"
+    if isinstance(value, int):
+        return format_minutes(value)
+    return " | ".join(format_minutes(minutes) for minutes in value)
 
 
 @dataclass
@@ -53,3 +181,4 @@ class EmployeeBlock:
     dates_by_col: Dict[str, date]
     times_by_date: Dict[date, RecordedTimes]
     status_row: Optional[int]
+    start_time_hints: Dict[Optional[date], int] = field(default_factory=dict)
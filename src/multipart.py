@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional, Tuple
+
+# Bytes read from the request per call.
+READ_CHUNK = 64 * 1024
+# A part's header block longer than this is treated as a malformed upload.
+MAX_PART_HEADER_BYTES = 16 * 1024
+
+# (form field name, client file name) -> where to store the part, or None to drop it.
+Destination = Callable[[str, str], Optional[Path]]
+
+
+class UploadTooLarge(ValueError):
+    """Raised before reading a request body longer than the allowed size."""
+
+
+def parse_multipart(
+    stream: BinaryIO,
+    content_type: str,
+    content_length: int,
+    destination: Destination,
+    max_bytes: Optional[int] = None,
+) -> Dict[str, Tuple[str, Path]]:
+    """Streams the file parts of a ``multipart/form-data`` body to disk.
+
+    Reads exactly ``content_length`` bytes from ``stream`` in ``READ_CHUNK``
+    pieces, so memory use does not grow with the upload. Each part with a file
+    name is written to ``destination(name, filename)``; returns field name ->
+    (client file name, stored path). Parts without a file name or without any
+    content are skipped, as are those ``destination`` declines.
+    """
+    if "multipart/form-data" not in content_type:
+        raise ValueError("Invalid form submission.")
+    if "boundary=" not in content_type:
+        raise ValueError("Missing multipart boundary.")
+    if content_length < 0:
+        raise ValueError("Invalid upload size.")
+    if max_bytes is not None and content_length > max_bytes:
+        raise UploadTooLarge(
+            f"The upload is {content_length / 2**20:.1f} MB; the limit is {max_bytes / 2**20:.0f} MB."
+        )
+
+    boundary = content_type.split("boundary=")[-1].split(";")[0].strip()
+    if boundary.startswith('"') and boundary.endswith('"'):
+        boundary = boundary[1:-1]
+    if not boundary:
+        raise ValueError("Missing multipart boundary.")
+    delimiter = b"\r\n--" + boundary.encode("latin-1")
+
+    body = _BodyReader(stream, content_length)
+    files: Dict[str, Tuple[str, Path]] = {}
+    _skip_through(body, delimiter)
+    while _starts_part(body):
+        headers = _read_headers(body)
+        disposition = next(
+            (line for line in headers if line.lower().startswith("content-disposition")),
+            "",
+        )
+        name = _extract_field(disposition, "name")
+        filename = _extract_field(disposition, "filename")
+        target = destination(name, filename) if name and filename else None
+        if target is None:
+            _skip_through(body, delimiter)
+            continue
+        with target.open("wb") as handle:
+            size = _copy_through(body, delimiter, handle)
+        if size:
+            files[name] = (filename, target)
+        else:
+            target.unlink()
+    body.drain()
+    return files
+
+
+class _BodyReader:
+    """The request body, at most ``length`` bytes, read into ``buffer`` on demand."""
+
+    def __init__(self, stream: BinaryIO, length: int) -> None:
+        self._stream = stream
+        self._remaining = length
+        # The leading CRLF makes the first boundary look like every later one.
+        self.buffer = bytearray(b"\r\n")
+
+    def fill(self) -> None:
+        if self._remaining <= 0:
+            raise ValueError("The upload ended unexpectedly.")
+        chunk = self._stream.read(min(READ_CHUNK, self._remaining))
+        if not chunk:
+            raise ValueError("The upload ended unexpectedly.")
+        self._remaining -= len(chunk)
+        self.buffer += chunk
+
+    def drain(self) -> None:
+        """Reads and drops the epilogue, leaving the connection at the next request."""
+        self.buffer.clear()
+        while self._remaining > 0:
+            chunk = self._stream.read(min(READ_CHUNK, self._remaining))
+            if not chunk:
+                return
+            self._remaining -= len(chunk)
+
+
+def _copy_through(body: _BodyReader, delimiter: bytes, handle: Optional[BinaryIO]) -> int:
+    """Moves bytes up to ``delimiter`` into ``handle`` and consumes the delimiter.
+
+    The delimiter may straddle two chunks, so the last ``len(delimiter) - 1``
+    bytes stay buffered until more data arrives. Returns the bytes copied.
+    """
+    copied = 0
+    while True:
+        index = body.buffer.find(delimiter)
+        if index != -1:
+            if handle is not None:
+                handle.write(body.buffer[:index])
+            copied += index
+            del body.buffer[: index + len(delimiter)]
+            return copied
+        ready = len(body.buffer) - (len(delimiter) - 1)
+        if ready > 0:
+            if handle is not None:
+                handle.write(body.buffer[:ready])
+            copied += ready
+            del body.buffer[:ready]
+        body.fill()
+
+
+def _skip_through(body: _BodyReader, delimiter: bytes) -> None:
+    _copy_through(body, delimiter, None)
+
+
+def _starts_part(body: _BodyReader) -> bool:
+    """After a delimiter: True if a part follows, False at the closing one."""
+    while True:
+        # Senders may pad the boundary line with spaces or tabs.
+        stripped = body.buffer.lstrip(b" \t")
+        if len(stripped) >= 2:
+            break
+        body.fill()
+    del body.buffer[: len(body.buffer) - len(stripped)]
+    marker = bytes(body.buffer[:2])
+    del body.buffer[:2]
+    if marker == b"--":
+        return False
+    if marker == b"\r\n":
+        return True
+    raise ValueError("Malformed multipart upload.")
+
+
+def _read_headers(body: _BodyReader) -> list[str]:
+    while True:
+        if body.buffer.startswith(b"\r\n"):
+            del body.buffer[:2]
+            return []
+        index = body.buffer.find(b"\r\n\r\n")
+        if index != -1:
+            header_bytes = bytes(body.buffer[:index])
+            del body.buffer[: index + 4]
+            return header_bytes.decode("utf-8", errors="replace").split("\r\n")
+        if len(body.buffer) > MAX_PART_HEADER_BYTES:
+            raise ValueError("Malformed multipart upload.")
+        body.fill()
+
+
+def _extract_field(header: str, key: str) -> Optional[str]:
+    key_token = f'{key}="'
+    if key_token not in header:
+        return None
+    start = header.index(key_token) + len(key_token)
+    end = header.find('"', start)
+    if end == -1:
+        return None
+    return header[start:end]
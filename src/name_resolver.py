@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import DailyPunches, EmployeeBlock
+from .utils import normalize_name
+
+
+class NameResolver:
+    """Maps timesheet employee names onto punch employee keys.
+
+    Indexes are built once per distinct punch employee. Exact lookups go through
+    name variants (full name, first two tokens, first + last, first name); the
+    one-edit fallback on the last name uses a single-deletion index per first
+    name, built on first use, and every resolution is memoized by block name.
+    """
+
+    def __init__(self, employee_keys: Iterable[str]) -> None:
+        self._variants: Dict[str, set[str]] = {}
+        self._by_first: Dict[str, List[str]] = {}
+        self._deletion_indexes: Dict[str, Dict[str, List[Tuple[str, str]]]] = {}
+        self._memo: Dict[Tuple[str, str], Optional[str]] = {}
+        for employee_key in dict.fromkeys(employee_keys):
+            tokens = _name_tokens(employee_key)
+            if tokens:
+                self._by_first.setdefault(tokens[0], []).append(employee_key)
+            for variant in _name_variants(tokens):
+                self._variants.setdefault(variant, set()).add(employee_key)
+
+    @classmethod
+    def from_punches(cls, punches: Dict[Tuple[str, date], DailyPunches]) -> "NameResolver":
+        return cls(employee_key for employee_key, _day in punches)
+
+    def resolve(self, block: EmployeeBlock) -> Optional[str]:
+        memo_key = (block.name, block.key)
+        if memo_key not in self._memo:
+            self._memo[memo_key] = self._resolve(block.name, block.key)
+        return self._memo[memo_key]
+
+    def _resolve(self, name: str, block_key: str) -> Optional[str]:
+        tokens = _name_tokens(name)
+        if not tokens:
+            return None
+        variants: list[str] = [" ".join(tokens)]
+        if len(tokens) >= 2:
+            variants.append(" ".join(tokens[:2]))
+            variants.append(" ".join([tokens[0], tokens[-1]]))
+        variants.append(tokens[0])
+        seen: set[str] = set()
+        for variant in variants:
+            if variant in seen:
+                continue
+            seen.add(variant)
+            candidates = self._variants.get(variant, set())
+            if block_key in candidates:
+                return block_key
+            if len(candidates) == 1:
+                return next(iter(candidates))
+
+        if len(tokens) >= 2:
+            fuzzy = self._one_edit_matches(tokens[0], tokens[-1])
+            if len(fuzzy) == 1:
+                return next(iter(fuzzy))
+        return None
+
+    def _one_edit_matches(self, first: str, last: str) -> set[str]:
+        # Two words within one edit share a single-deletion variant, so candidates
+        # come from hash lookups and only those few are checked exactly.
+        index = self._deletion_index_for(first)
+        candidates: set[Tuple[str, str]] = set()
+        for variant in _deletions(last):
+            candidates.update(index.get(variant, ()))
+        return {
+            employee_key
+            for key_last, employee_key in candidates
+            if _within_edit_distance(last, key_last)
+        }
+
+    def _deletion_index_for(self, first: str) -> Dict[str, List[Tuple[str, str]]]:
+        index = self._deletion_indexes.get(first)
+        if index is None:
+            index = {}
+            for employee_key in self._by_first.get(first, ()):
+                key_tokens = employee_key.split()
+                if not key_tokens:
+                    continue
+                entry = (key_tokens[-1], employee_key)
+                for variant in _deletions(key_tokens[-1]):
+                    index.setdefault(variant, []).append(entry)
+            self._deletion_indexes[first] = index
+        return index
+
+
+def _name_variants(tokens: list[str]) -> set[str]:
+    if not tokens:
+        return set()
+    variants = {" ".join(tokens), tokens[0]}
+    if len(tokens) >= 2:
+        variants.add(" ".join(tokens[:2]))
+        variants.add(" ".join([tokens[0], tokens[-1]]))
+    return variants
+
+
+def _name_tokens(name: str) -> list[str]:
+    return [token for token in normalize_name(name).split() if len(token) > 1]
+
+
+def _deletions(word: str) -> set[str]:
+    return {word} | {word[:idx] + word[idx + 1 :] for idx in range(len(word))}
+
+
+def _within_edit_distance(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        mismatches = sum(1 for x, y in zip(a, b) if x != y)
+        return mismatches <= 1
+    # ensure a is shorter
+    if len(a) > len(b):
+        a, b = b, a
+    i = j = 0
+    edits = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            i += 1
+            j += 1
+            continue
+        edits += 1
+        if edits > 1:
+            return False
+        j += 1
+    return True
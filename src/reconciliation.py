@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterator, Tuple
+
+from .models import DailyPunches
+
+
+class ReconciliationIndex:
+    """Per-employee date bitmaps for matching punch days to timesheet days.
+
+    Bit ``n`` of an employee's bitmap stands for the ``n``-th day after the
+    earliest punch date. ``punch_days`` holds the days with punches and
+    ``timesheet_days`` the days a timesheet block was matched against, so the
+    punch days missing from the timesheet are one ``&~`` per employee.
+    """
+
+    def __init__(self, punches: Dict[Tuple[str, date], DailyPunches]) -> None:
+        self.punches = punches
+        self.base = min((day.toordinal() for _key, day in punches), default=0)
+        self.punch_days: Dict[str, int] = {}
+        for employee_key, day in punches:
+            bit = 1 << (day.toordinal() - self.base)
+            self.punch_days[employee_key] = self.punch_days.get(employee_key, 0) | bit
+        self.timesheet_days: Dict[str, int] = {}
+
+    def mark_timesheet_day(self, employee_key: str, day: date) -> None:
+        offset = day.toordinal() - self.base
+        if offset >= 0:
+            bit = 1 << offset
+            self.timesheet_days[employee_key] = self.timesheet_days.get(employee_key, 0) | bit
+
+    def missing_timesheet_days(self) -> Iterator[Tuple[str, date]]:
+        """Punch days with no timesheet entry, by employee then date."""
+        for employee_key, punch_bits in self.punch_days.items():
+            missing = punch_bits & ~self.timesheet_days.get(employee_key, 0)
+            while missing:
+                lowest = missing & -missing
+                missing ^= lowest
+                yield employee_key, date.fromordinal(self.base + lowest.bit_length() - 1)
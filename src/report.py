@@ -1,26 +1,432 @@
 from __future__ import annotations
 
 import csv
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import warnings
+from collections import Counter
+from contextlib import ExitStack
+from datetime import date
 from pathlib import Path
-from typing import Iterable
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from .models import Discrepancy
+from .models import ERROR_CODES, ERROR_TYPES, FIELD_CODES, FIELDS, Discrepancy
+from .xlsx_report import write_xlsx_report
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+    pq = None
 
-def write_report(path: str | Path, discrepancies: Iterable[Discrepancy]) -> None:
+REPORT_COLUMNS = ("employee", "date", "field", "expected", "actual", "error_type")
+# Report format -> file suffix. Arrow IPC and Parquet need pyarrow.
+REPORT_FORMATS = {
+    "csv": ".csv",
+    "jsonl.gz": ".jsonl.gz",
+    "arrow": ".arrow",
+    "parquet": ".parquet",
+    "xlsx": ".xlsx",
+}
+COLUMNAR_FORMATS = ("arrow", "parquet")
+# Columnar formats buffer this many rows per record batch / row group.
+ROW_GROUP_SIZE = 65_536
+# Bytes moved per read when rows are copied from an earlier report.
+_COPY_CHUNK = 1 << 20
+
+ReportRow = Tuple[str, Optional[date], str, Optional[str], Optional[str], str]
+
+_MISMATCH = ERROR_CODES["mismatch"]
+# Recording a start later (or an end earlier) than expected under-records paid
+# time; the sign turns "recorded minus expected" into paid minutes gained.
+_PAID_SIGN = {
+    FIELD_CODES["clock_in"]: -1,
+    FIELD_CODES["clock_in_work"]: -1,
+    FIELD_CODES["clock_out_lunch"]: 1,
+    FIELD_CODES["clock_out"]: 1,
+}
+SUMMARY_GROUPS = ("employee", "error_type", "field", "date")
+
+
+class ReportSummary:
+    """Counters updated once per discrepancy while the report is written.
+
+    Discrepancies are counted per employee, error type, field and date.
+    Mismatched times also add up over- and under-recorded paid minutes, taken
+    against the closest expected time.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.by_employee: Counter = Counter()
+        self.by_error_code: Counter = Counter()
+        self.by_field_code: Counter = Counter()
+        self.by_date: Counter = Counter()
+        self.over_minutes = 0
+        self.under_minutes = 0
+
+    def add(self, item: Discrepancy) -> None:
+        self.total += 1
+        self.by_employee[item.employee_name] += 1
+        self.by_error_code[item.error_code] += 1
+        self.by_field_code[item.field_code] += 1
+        self.by_date[item.date] += 1
+        sign = _PAID_SIGN.get(item.field_code)
+        if sign is None or item.error_code != _MISMATCH:
+            return
+        actual, expected = item.raw_actual, item.raw_expected
+        if not isinstance(actual, int) or not isinstance(expected, tuple) or not expected:
+            return
+        nearest = min(expected, key=lambda value: abs(value - actual))
+        paid = sign * (actual - nearest)
+        if paid > 0:
+            self.over_minutes += paid
+        else:
+            self.under_minutes -= paid
+
+    def breakdown(self, group: str) -> List[Tuple[str, int]]:
+        """``(key, count)`` pairs for one of ``SUMMARY_GROUPS``.
+
+        Dates are listed in order; other groups largest count first.
+        """
+        if group == "employee":
+            counts = self.by_employee
+        elif group == "error_type":
+            counts = {ERROR_TYPES[code]: count for code, count in self.by_error_code.items()}
+        elif group == "field":
+            counts = {FIELDS[code]: count for code, count in self.by_field_code.items()}
+        elif group == "date":
+            return sorted(
+                (day.isoformat() if day else "", count) for day, count in self.by_date.items()
+            )
+        else:
+            raise ValueError(f"Unknown summary group: {group}")
+        return sorted(counts.items(), key=lambda pair: (-pair[1], pair[0]))
+
+    def to_dict(self) -> Dict[str, object]:
+        payload: Dict[str, object] = {
+            "discrepancies": self.total,
+            "over_recorded_minutes": self.over_minutes,
+            "under_recorded_minutes": self.under_minutes,
+        }
+        for group in SUMMARY_GROUPS:
+            payload[f"by_{group}"] = dict(self.breakdown(group))
+        return payload
+
+    def load_dict(self, payload: Dict[str, object]) -> None:
+        """Replaces the counters with those of a ``to_dict`` payload."""
+        self.total = int(payload["discrepancies"])
+        self.over_minutes = int(payload["over_recorded_minutes"])
+        self.under_minutes = int(payload["under_recorded_minutes"])
+        self.by_employee = Counter(payload["by_employee"])
+        self.by_error_code = Counter(
+            {ERROR_CODES[name]: count for name, count in payload["by_error_type"].items()}
+        )
+        self.by_field_code = Counter(
+            {FIELD_CODES[name]: count for name, count in payload["by_field"].items()}
+        )
+        self.by_date = Counter(
+            {
+                date.fromisoformat(day) if day else None: count
+                for day, count in payload["by_date"].items()
+            }
+        )
+
+    def write(self, json_path: str | Path, csv_path: str | Path) -> None:
+        """Writes the summary as JSON and as a flat ``group,key,count`` CSV."""
+        Path(json_path).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+        with Path(csv_path).open("w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["group", "key", "count"])
+            writer.writerow(["total", "discrepancies", self.total])
+            writer.writerow(["total", "over_recorded_minutes", self.over_minutes])
+            writer.writerow(["total", "under_recorded_minutes", self.under_minutes])
+            for group in SUMMARY_GROUPS:
+                for key, count in self.breakdown(group):
+                    writer.writerow([group, key, count])
+
+
+def resolve_report_format(report_format: str) -> str:
+    """Returns the format to write, falling back to JSONL when pyarrow is missing."""
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {report_format}")
+    if report_format in COLUMNAR_FORMATS and pa is None:
+        warnings.warn(
+            f"pyarrow is not installed; writing the {report_format} report as jsonl.gz instead.",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return "jsonl.gz"
+    return report_format
+
+
+def report_filename(report_format: str, stem: str = "validation_report") -> str:
+    return stem + REPORT_FORMATS[report_format]
+
+
+def write_report(
+    path: str | Path,
+    discrepancies: Iterable[Discrepancy],
+    report_format: str = "csv",
+    summary: Optional[ReportSummary] = None,
+) -> int:
+    """Writes one row per discrepancy as it is produced; returns the row count.
+
+    When ``summary`` is given it is updated in the same pass.
+    """
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {report_format}")
+    if report_format in COLUMNAR_FORMATS and pa is None:
+        raise ImportError(f"The {report_format} report format requires pyarrow to be installed.")
     report_path = Path(path)
     report_path.parent.mkdir(parents=True, exist_ok=True)
-    with report_path.open("w", newline="") as handle:
+    if summary is not None:
+        discrepancies = _counted(discrepancies, summary)
+    return _WRITERS[report_format](report_path, (_report_row(item) for item in discrepancies))
+
+
+def _counted(
+    discrepancies: Iterable[Discrepancy], summary: ReportSummary
+) -> Iterator[Discrepancy]:
+    for item in discrepancies:
+        summary.add(item)
+        yield item
+
+
+def _report_row(item: Discrepancy) -> ReportRow:
+    return (
+        item.employee_name,
+        item.date,
+        item.field,
+        item.expected,
+        item.actual,
+        item.error_type,
+    )
+
+
+def _write_csv(path: Path, rows: Iterator[ReportRow]) -> int:
+    count = 0
+    with path.open("w", newline="", encoding="utf-8") as handle:
         writer = csv.writer(handle)
-        writer.writerow(["employee", "date", "field", "expected", "actual", "error_type"])
-        for item in discrepancies:
-            writer.writerow(
-                [
-                    item.employee_name,
-                    item.date.isoformat() if item.date else "",
-                    item.field,
-                    item.expected or "",
-                    item.actual or "",
-                    item.error_type,
-                ]
-            )
+        writer.writerow(REPORT_COLUMNS)
+        for row in rows:
+            writer.writerow(_csv_fields(row))
+            count += 1
+    return count
+
+
+def _csv_fields(row: ReportRow) -> List[str]:
+    employee, day, field, expected, actual, error_type = row
+    return [
+        employee,
+        day.isoformat() if day else "",
+        field,
+        expected or "",
+        actual or "",
+        error_type,
+    ]
+
+
+def write_csv_report_spliced(
+    path: str | Path,
+    groups: Iterable[Tuple[Optional[str], Iterable[Discrepancy]]],
+    previous: Optional[Dict[str, Any]] = None,
+    summary: Optional[ReportSummary] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """Writes a CSV report, reusing the rows of unchanged blocks from the last one.
+
+    ``groups`` yields ``(key, discrepancies)`` per block in report order; a
+    ``None`` key marks rows that are never reused. ``previous`` is the layout
+    an earlier call returned. Rows of a key it lists are copied from that report
+    as bytes instead of being formatted again, provided the file is unchanged
+    since. When it is the same file, the leading stretch that kept its place
+    stays on disk untouched and only what follows is rewritten.
+
+    Returns the row count and the layout of the new report.
+    """
+    report_path = Path(path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    source_path = _intact_report(previous)
+    spans = {key: (start, end) for key, start, end in previous["spans"]} if source_path else {}
+    in_place = source_path is not None and source_path == report_path.resolve()
+    header = _csv_bytes([list(REPORT_COLUMNS)])
+
+    count = 0
+    layout: List[list] = []
+    with ExitStack() as stack:
+        source = stack.enter_context(source_path.open("rb")) if source_path else None
+        staged = stack.enter_context(tempfile.TemporaryFile(dir=report_path.parent))
+        copier = _RangeCopier(source, staged)
+        if in_place:
+            kept = offset = len(header)
+        else:
+            staged.write(header)
+            kept, offset = 0, len(header)
+        # While true, the new report so far equals the old file's first bytes.
+        leading = in_place
+        for key, discrepancies in groups:
+            items = list(discrepancies)
+            count += len(items)
+            if summary is not None:
+                for item in items:
+                    summary.add(item)
+            reused = spans.get(key) if key is not None else None
+            if reused is not None:
+                start, end = reused
+                if leading and start == offset:
+                    kept = end
+                else:
+                    leading = False
+                    copier.add(start, end)
+                length = end - start
+            elif items:
+                leading = False
+                data = _csv_bytes(_csv_fields(_report_row(item)) for item in items)
+                copier.flush()
+                staged.write(data)
+                length = len(data)
+            else:
+                continue
+            if key is not None and length:
+                layout.append([key, offset, offset + length])
+            offset += length
+        copier.flush()
+
+        staged.seek(0)
+        with report_path.open("r+b" if in_place else "wb") as handle:
+            handle.seek(kept)
+            shutil.copyfileobj(staged, handle, _COPY_CHUNK)
+            handle.truncate()
+    stat = report_path.stat()
+    return count, {
+        "path": str(report_path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "spans": layout,
+    }
+
+
+def _intact_report(layout: Optional[Dict[str, Any]]) -> Optional[Path]:
+    """The report a layout describes, if it is still the file that was written."""
+    if not layout:
+        return None
+    path = Path(layout["path"])
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) != (layout["size"], layout["mtime_ns"]):
+        return None
+    return path
+
+
+def _csv_bytes(rows: Iterable[List[str]]) -> bytes:
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+class _RangeCopier:
+    """Copies byte ranges of ``source`` to ``target``, joining adjacent ones."""
+
+    def __init__(self, source: Optional[BinaryIO], target: BinaryIO) -> None:
+        self._source = source
+        self._target = target
+        self._start = self._end = 0
+
+    def add(self, start: int, end: int) -> None:
+        if start != self._end:
+            self.flush()
+            self._start = start
+        self._end = end
+
+    def flush(self) -> None:
+        remaining = self._end - self._start
+        if remaining and self._source is not None:
+            self._source.seek(self._start)
+            while remaining:
+                chunk = self._source.read(min(_COPY_CHUNK, remaining))
+                if not chunk:
+                    raise ValueError("The previous report is shorter than its layout.")
+                self._target.write(chunk)
+                remaining -= len(chunk)
+        self._start = self._end = 0
+
+
+def _write_jsonl_gz(path: Path, rows: Iterator[ReportRow]) -> int:
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as handle:
+        for employee, day, field, expected, actual, error_type in rows:
+            record = {
+                "employee": employee,
+                "date": day.isoformat() if day else None,
+                "field": field,
+                "expected": expected,
+                "actual": actual,
+                "error_type": error_type,
+            }
+            handle.write(json.dumps(record, separators=(",", ":")))
+            handle.write("\n")
+            count += 1
+    return count
+
+
+def _arrow_schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("employee", pa.string()),
+            ("date", pa.date32()),
+            ("field", pa.string()),
+            ("expected", pa.string()),
+            ("actual", pa.string()),
+            ("error_type", pa.string()),
+        ]
+    )
+
+
+def _record_batches(rows: Iterator[ReportRow], schema: "pa.Schema") -> Iterator["pa.RecordBatch"]:
+    columns: List[list] = [[] for _ in REPORT_COLUMNS]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+        if len(columns[0]) >= ROW_GROUP_SIZE:
+            yield pa.record_batch(columns, schema=schema)
+            columns = [[] for _ in REPORT_COLUMNS]
+    if columns[0]:
+        yield pa.record_batch(columns, schema=schema)
+
+
+def _write_arrow(path: Path, rows: Iterator[ReportRow]) -> int:
+    schema = _arrow_schema()
+    count = 0
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(
+        sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd")
+    ) as writer:
+        for batch in _record_batches(rows, schema):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def _write_parquet(path: Path, rows: Iterator[ReportRow]) -> int:
+    schema = _arrow_schema()
+    count = 0
+    with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+        for batch in _record_batches(rows, schema):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+_WRITERS: Dict[str, Callable[[Path, Iterator[ReportRow]], int]] = {
+    "csv": _write_csv,
+    "jsonl.gz": _write_jsonl_gz,
+    "arrow": _write_arrow,
+    "parquet": _write_parquet,
+    "xlsx": write_xlsx_report,
+}
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+META_FILENAME = "meta.json"
+DEFAULT_MAX_ENTRIES = 32
+_READ_CHUNK = 1 << 20
+
+
+class ResultCache:
+    """Bounded, content-addressed store of finished validation runs.
+
+    Entries are keyed by a hash of both input files, the options that shape
+    the outputs and the validator source itself, so any code or rule change
+    misses. A hit copies the entry's outputs instead of validating again. Each
+    entry is a folder of output files plus ``meta.json`` with the counts; the
+    least recently used entries beyond ``max_entries`` are removed.
+    """
+
+    def __init__(self, directory: str | Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+
+    def key(self, input_paths: Iterable[str | Path], options: Dict[str, object]) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(validator_version().encode("ascii"))
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+        for path in map(Path, input_paths):
+            # The punch report's file name can carry its date range.
+            digest.update(path.name.encode("utf-8") + b"\0")
+            digest.update(str(path.stat().st_size).encode("ascii") + b"\0")
+            with path.open("rb") as handle:
+                for chunk in iter(lambda: handle.read(_READ_CHUNK), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def fetch(self, key: str, targets: Dict[str, Path]) -> Optional[Dict[str, object]]:
+        """Copies a cached entry's files to ``targets`` (stored name -> path).
+
+        Returns the stored metadata, or ``None`` on a miss.
+        """
+        entry = self.directory / key
+        meta_path = entry / META_FILENAME
+        try:
+            meta = json.loads(meta_path.read_text())
+            for name, target in targets.items():
+                _copy(entry / name, target)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        os.utime(meta_path, (now, now))
+        return meta
+
+    def store(self, key: str, files: Dict[str, Path], meta: Dict[str, object]) -> None:
+        """Saves ``files`` (stored name -> produced path) and ``meta`` under ``key``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.directory))
+        try:
+            for name, source in files.items():
+                _copy(source, staging / name)
+            (staging / META_FILENAME).write_text(json.dumps(meta))
+            try:
+                os.replace(staging, self.directory / key)
+            except OSError:
+                # Another run stored the same key first; keep its entry.
+                return
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries: list[Tuple[float, Path]] = []
+        for entry in self.directory.iterdir():
+            if entry.name.startswith("."):
+                continue
+            try:
+                entries.append(((entry / META_FILENAME).stat().st_mtime, entry))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        for _mtime, entry in entries[self.max_entries :]:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+@lru_cache(maxsize=1)
+def validator_version() -> str:
+    """Hash of the package source; results from other code are never reused."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _copy(source: Path, target: Path) -> None:
+    # Copies rather than hard links: outputs may later be overwritten in place.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source, target)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import DailyPunches, EmployeeBlock
+from .result_cache import validator_version
+from .validator import BlockResult, pack_result, unpack_result
+
+# Bump whenever the stored result format changes. Changes to the validator
+# code are caught by its source hash, stored alongside.
+STATE_VERSION = 3
+# Blocks kept per state file. Results of the latest run come first, then the
+# most recently used ones from earlier runs (other workbooks sharing the file).
+MAX_STATE_BLOCKS = 20_000
+# Saves of one state file from concurrent runs are merged one at a time.
+_SAVE_LOCK = threading.Lock()
+
+
+class RevalidationState:
+    """Per-block results from the previous run, keyed by block fingerprint.
+
+    A fingerprint covers everything a block's result depends on: its name, the
+    resolved punch employee, its recorded times and the punch segments it was
+    matched against (with their department code). Blocks whose fingerprint is
+    unchanged reuse their stored result; only the rest are validated again.
+    Results stored under a different rule book or validator source are
+    discarded.
+
+    Both inputs are still parsed in full, to fingerprint the blocks.
+
+    ``report_layout`` is where the last run that saved this state wrote each
+    block's rows in its CSV report, so the next CSV report can copy the rows
+    of unchanged blocks (see ``report.write_csv_report_spliced``). Saving
+    merges with what other runs saved to the same file meanwhile.
+    """
+
+    def __init__(self, path: str | Path, rules_signature: str = "") -> None:
+        self.path = Path(path)
+        self.rules_signature = rules_signature
+        self._current: Dict[str, Any] = {}
+        payload = self._load()
+        self._previous: Dict[str, Any] = payload.get("blocks", {})
+        self.report_layout: Optional[Dict[str, Any]] = payload.get("report")
+
+    def lookup(self, fingerprint: str) -> Optional[BlockResult]:
+        packed = self._previous.get(fingerprint)
+        if packed is None:
+            return None
+        self._current[fingerprint] = packed
+        return unpack_result(packed)
+
+    def store(self, fingerprint: str, result: BlockResult) -> None:
+        self._current[fingerprint] = pack_result(result)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _SAVE_LOCK:
+            blocks = dict(self._current)
+            for fingerprint, packed in self._load().get("blocks", {}).items():
+                if len(blocks) >= MAX_STATE_BLOCKS:
+                    break
+                blocks.setdefault(fingerprint, packed)
+            # Unique per process: runs from other processes may save together.
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(
+                json.dumps(
+                    {
+                        "version": STATE_VERSION,
+                        "validator": validator_version(),
+                        "rules": self.rules_signature,
+                        "report": self.report_layout,
+                        "blocks": blocks,
+                    },
+                    separators=(",", ":"),
+                )
+            )
+            os.replace(tmp_path, self.path)
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            payload = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(payload, dict)
+            or payload.get("version") != STATE_VERSION
+            or payload.get("validator") != validator_version()
+            or payload.get("rules", "") != self.rules_signature
+        ):
+            return {}
+        return payload
+
+
+def block_fingerprint(
+    block: EmployeeBlock,
+    resolved_key: str,
+    punches: Dict[Tuple[str, date], DailyPunches],
+) -> str:
+    days: List[list] = []
+    for day, times in block.times_by_date.items():
+        daily = punches.get((resolved_key, day))
+        segments = (
+            [daily.dept_code, [[seg.in_minutes, seg.out_minutes] for seg in daily.segments]]
+            if daily is not None
+            else None
+        )
+        days.append(
+            [
+                day.toordinal(),
+                times.clock_in,
+                times.lunch_out,
+                times.lunch_in,
+                times.clock_out,
+                segments,
+            ]
+        )
+    payload = json.dumps([block.name, resolved_key, days], separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+from array import array
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Optional
+
+from .utils import MINUTES_PER_DAY
+
+# Rounded and enforced times can land on midnight, so tables cover 0-1440.
+TABLE_SIZE = MINUTES_PER_DAY + 1
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """A named payroll policy.
+
+    ``boundary_minutes`` is the scheduled-time grid early clock-ins round up to,
+    ``tolerance_minutes`` the allowed difference between recorded and expected
+    times, ``lunch_minutes`` the minimum lunch, and shifts longer than
+    ``lunch_required_after`` minutes must include one.
+    """
+
+    name: str = "default"
+    boundary_minutes: int = 30
+    tolerance_minutes: int = 1
+    lunch_minutes: int = 30
+    lunch_required_after: int = 360
+
+    def compile(self) -> "CompiledRules":
+        if self.boundary_minutes <= 0:
+            raise ValueError(f"Rule set {self.name}: boundary_minutes must be positive.")
+        round_in = array("H")
+        for minute in range(TABLE_SIZE):
+            boundary = _nearest_boundary(minute, self.boundary_minutes)
+            round_in.append(min(boundary if minute < boundary else minute, MINUTES_PER_DAY))
+        earliest_return = array("H", (minute + self.lunch_minutes for minute in range(TABLE_SIZE)))
+        lunch_required = bytes(
+            1 if shift > self.lunch_required_after else 0 for shift in range(TABLE_SIZE)
+        )
+        return CompiledRules(self, round_in, earliest_return, lunch_required)
+
+
+class CompiledRules:
+    """Per-minute lookup tables for one rule set.
+
+    ``round_in[m]`` is the expected time for a raw punch at minute ``m``,
+    ``earliest_return[m]`` the earliest allowed lunch return after leaving at
+    ``m``, and ``lunch_required[s]`` whether a shift of ``s`` minutes needs a lunch.
+    """
+
+    __slots__ = ("rule_set", "round_in", "earliest_return", "lunch_required", "tolerance")
+
+    def __init__(
+        self, rule_set: RuleSet, round_in: array, earliest_return: array, lunch_required: bytes
+    ) -> None:
+        self.rule_set = rule_set
+        self.round_in = round_in
+        self.earliest_return = earliest_return
+        self.lunch_required = lunch_required
+        self.tolerance = rule_set.tolerance_minutes
+
+    def needs_lunch(self, shift_minutes: int) -> bool:
+        if shift_minutes < 0:
+            return False
+        return bool(self.lunch_required[min(shift_minutes, MINUTES_PER_DAY)])
+
+    def __reduce__(self) -> tuple:
+        # Tables are cheap to rebuild; ship only the rule set to worker processes.
+        return (_compile, (self.rule_set,))
+
+
+class RuleBook:
+    """Rule sets by name plus the department codes that use them."""
+
+    def __init__(
+        self,
+        rule_sets: Optional[Dict[str, RuleSet]] = None,
+        departments: Optional[Dict[str, str]] = None,
+        default: str = "default",
+    ) -> None:
+        self.rule_sets = dict(rule_sets or {})
+        self.rule_sets.setdefault(default, RuleSet(name=default))
+        self.departments = dict(departments or {})
+        self.default = default
+        for dept_code, name in self.departments.items():
+            if name not in self.rule_sets:
+                raise ValueError(f"Department {dept_code} uses unknown rule set {name}.")
+        self._compiled = {name: rule_set.compile() for name, rule_set in self.rule_sets.items()}
+        self._by_department = {
+            dept_code: self._compiled[name] for dept_code, name in self.departments.items()
+        }
+        self.default_rules = self._compiled[default]
+
+    def for_department(self, dept_code: Optional[str]) -> CompiledRules:
+        if dept_code is None:
+            return self.default_rules
+        return self._by_department.get(dept_code.strip(), self.default_rules)
+
+    def signature(self) -> str:
+        """Stable text form, used to tell whether cached results used the same rules."""
+        payload = {
+            "default": self.default,
+            "departments": dict(sorted(self.departments.items())),
+            "rule_sets": {
+                name: _rule_set_dict(rule_set) for name, rule_set in sorted(self.rule_sets.items())
+            },
+        }
+        return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+
+def load_rule_book(path: str | Path) -> RuleBook:
+    """Reads a JSON rule file.
+
+    Format: ``{"default": "default", "rule_sets": {"kitchen": {"boundary_minutes": 15}},
+    "departments": {"002": "kitchen"}}``. Omitted settings take the standard values.
+    """
+    payload = json.loads(Path(path).read_text())
+    allowed = {item.name for item in fields(RuleSet)} - {"name"}
+    rule_sets: Dict[str, RuleSet] = {}
+    for name, settings in payload.get("rule_sets", {}).items():
+        unknown = set(settings) - allowed
+        if unknown:
+            raise ValueError(f"Rule set {name} has unknown settings: {', '.join(sorted(unknown))}")
+        rule_sets[name] = RuleSet(name=name, **{key: int(value) for key, value in settings.items()})
+    return RuleBook(
+        rule_sets,
+        {str(code): name for code, name in payload.get("departments", {}).items()},
+        default=payload.get("default", "default"),
+    )
+
+
+def _nearest_boundary(minutes: int, boundary_minutes: int) -> int:
+    # Treat the nearest boundary as the scheduled time (ties round up).
+    lower = minutes - (minutes % boundary_minutes)
+    upper = lower + boundary_minutes
+    if minutes - lower < upper - minutes:
+        return lower
+    return upper
+
+
+def _compile(rule_set: RuleSet) -> CompiledRules:
+    return rule_set.compile()
+
+
+def _rule_set_dict(rule_set: RuleSet) -> Dict[str, object]:
+    return {item.name: getattr(rule_set, item.name) for item in fields(RuleSet)}
+
+
+DEFAULT_RULES = RuleBook()
@@ -1,44 +1,546 @@
 from __future__ import annotations
 
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
 from datetime import date, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
 
+from .cancellation import CancellationToken, ValidationCancelled, check_cancelled
 from .csv_reader import read_punches, read_report_range
-from .report import write_report
-from .validator import validate
-from .xlsx_reader import read_timesheet
-from .xlsx_writer import write_statuses
+from .memory_budget import MemoryBudget, SpilledPunches
+from .metrics import METRICS_FILENAME, InlineExecutor, RunMetrics, stage
+from .models import DailyPunches, Discrepancy, EmployeeBlock
+from .report import (
+    ReportSummary,
+    report_filename,
+    resolve_report_format,
+    write_csv_report_spliced,
+    write_report,
+)
+from .result_cache import ResultCache
+from .revalidation import RevalidationState, block_fingerprint
+from .rules import DEFAULT_RULES, RuleBook
+from .validator import (
+    MODES,
+    BlockResult,
+    iter_result_groups,
+    iter_validate,
+    resolve_employee_keys,
+    validate_blocks,
+    validate_status,
+)
+from .xlsx_reader import (
+    load_timesheet_cells,
+    parse_timesheet,
+    read_sheet_names,
+    sheet_matches_hint,
+)
+from .xlsx_writer import StatusWorkbook, compression_level
+
+STATE_FILENAME = "validation_state.json"
+SUMMARY_JSON_FILENAME = "validation_summary.json"
+SUMMARY_CSV_FILENAME = "validation_summary.csv"
+BATCH_MANIFEST_FILENAME = "batch_manifest.json"
+# Input parsing and output writing overlap on this many background threads.
+PIPELINE_THREADS = 3
+
+T = TypeVar("T")
 
 
 def run_validation(
     csv_path: str | Path,
     xlsx_path: str | Path,
     out_dir: str | Path,
-) -> Tuple[Path, Path, int, int, int]:
-    punches = read_punches(csv_path)
-    target_dates = {daily.date for daily in punches.values()}
-    report_range = read_report_range(csv_path)
-    sheet_hint = _sheet_hint_from_range(report_range)
-
-    blocks = read_timesheet(
-        xlsx_path, target_dates=target_dates, sheet_hint=sheet_hint
-    )
-    discrepancies, status_by_row = validate(blocks, punches)
+    compression: str | int = "default",
+    engine: str = "python",
+    workers: Optional[int] = None,
+    state_path: str | Path | None = None,
+    rules: RuleBook = DEFAULT_RULES,
+    mode: str = "full",
+    report_format: str = "csv",
+    summary: Optional[ReportSummary] = None,
+    cache: Optional[ResultCache] = None,
+    metrics: Optional[RunMetrics] = None,
+    memory_budget: Optional[int] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    timeout: Optional[float] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Tuple[Optional[Path], Path, int, int, int]:
+    """Validates the timesheet and writes the outputs into ``out_dir``.
 
+    Returns the report path (``None`` in ``status_only`` mode), the validated
+    XLSX path and the discrepancy, ok and needs-attention counts. Full runs
+    also write ``validation_summary.json``/``.csv``. A cancelled run removes
+    the outputs it had started writing.
+
+    Args:
+        compression: deflate level of the validated XLSX, a name or 0-9.
+        engine, workers: how blocks are validated; see ``validator``.
+        state_path: a ``RevalidationState`` file; unchanged blocks reuse it.
+        rules: the rule book to check against.
+        mode: ``full``, or ``status_only`` to write statuses and no report.
+        report_format: one of ``report.REPORT_FORMATS``.
+        summary: a ``ReportSummary`` to fill with the report's counters.
+        cache: a ``ResultCache`` whose matching entry is copied instead.
+        metrics: a ``RunMetrics`` to record per-stage numbers into.
+        memory_budget: resident memory cap in bytes; see ``MemoryBudget``.
+        cancel_token: a ``CancellationToken`` that stops the run.
+        timeout: seconds before the run stops with ``ValidationTimedOut``.
+        progress: called with each stage name as the run enters it.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown validation mode: {mode}")
+    report_format = resolve_report_format(report_format)
+    compression_level(compression)
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
-    report_path = out_dir / "validation_report.csv"
-    write_report(report_path, discrepancies)
+    budget = MemoryBudget(memory_budget) if memory_budget is not None else None
+    if budget is not None:
+        engine, workers = "python", None
+    if timeout is not None:
+        cancel_token = CancellationToken(timeout=timeout, parent=cancel_token)
+    report_name = report_filename(report_format) if mode == "full" else None
+    outputs = _cached_outputs(out_dir, _validated_path(out_dir, Path(xlsx_path)), report_name)
+    # Outputs of an earlier run in out_dir survive a cancelled run that did not
+    # get as far as rewriting them.
+    earlier = {path: _file_state(path) for path in outputs.values()}
+    try:
+        with metrics.run() if metrics is not None else nullcontext():
+            outcome = _run_validation(
+                Path(csv_path),
+                Path(xlsx_path),
+                out_dir,
+                compression,
+                engine,
+                workers,
+                state_path,
+                rules,
+                mode,
+                report_format,
+                summary,
+                cache,
+                metrics,
+                budget,
+                cancel_token,
+                progress,
+            )
+    except ValidationCancelled:
+        for path, state in earlier.items():
+            if _file_state(path) != state:
+                path.unlink(missing_ok=True)
+        raise
+    if metrics is not None:
+        metrics.emit(out_dir / METRICS_FILENAME)
+    return outcome
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    report_path: Optional[Path]
+    validated_path: Path
+    discrepancies: int
+    ok: int
+    needs_attention: int
+    # Counters of the report; None in status_only mode.
+    summary: Optional[ReportSummary]
+
+
+async def run_validation_async(
+    csv_path: str | Path,
+    xlsx_path: str | Path,
+    out_dir: str | Path,
+    executor: Optional[ThreadPoolExecutor] = None,
+    **options: Any,
+) -> ValidationResult:
+    """``run_validation`` on ``executor``, without blocking the event loop.
 
-    xlsx_path = Path(xlsx_path)
-    validated_name = f"{xlsx_path.stem}-validated.xlsx"
-    validated_path = out_dir / validated_name
-    write_statuses(xlsx_path, validated_path, status_by_row)
+    ``executor`` defaults to the loop's, a thread pool: runs share the GIL, so
+    pass ``workers`` to spread validation over processes. ``options`` go to
+    ``run_validation``. Cancelling the awaiting task stops the run, and the
+    ``CancelledError`` is raised once the run has stopped.
+    """
+    token = CancellationToken(parent=options.pop("cancel_token", None))
+    summary = options.pop("summary", None)
+    if summary is None and options.get("mode", "full") == "full":
+        summary = ReportSummary()
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        executor,
+        partial(
+            run_validation,
+            csv_path,
+            xlsx_path,
+            out_dir,
+            summary=summary,
+            cancel_token=token,
+            **options,
+        ),
+    )
+    try:
+        report_path, validated_path, count, ok_count, needs_attention = await asyncio.shield(future)
+    except asyncio.CancelledError:
+        token.cancel()
+        # Hold the caller until the worker is free; a ValidationCancelled (or
+        # the finished run) is dropped in favour of the cancellation.
+        await asyncio.wait([future])
+        raise
+    return ValidationResult(report_path, validated_path, count, ok_count, needs_attention, summary)
+
+
+def _run_validation(
+    csv_path: Path,
+    xlsx_path: Path,
+    out_dir: Path,
+    compression: str | int,
+    engine: str,
+    workers: Optional[int],
+    state_path: str | Path | None,
+    rules: RuleBook,
+    mode: str,
+    report_format: str,
+    summary: Optional[ReportSummary],
+    cache: Optional[ResultCache],
+    metrics: Optional[RunMetrics],
+    budget: Optional[MemoryBudget],
+    cancel_token: Optional[CancellationToken],
+    progress: Optional[Callable[[str], None]],
+) -> Tuple[Optional[Path], Path, int, int, int]:
+    check_cancelled(cancel_token)
+    validated_path = _validated_path(out_dir, xlsx_path)
+    report_name = report_filename(report_format) if mode == "full" else None
+    outputs = _cached_outputs(out_dir, validated_path, report_name)
+    cache_key = None
+    if cache is not None:
+        _report_progress(progress, "fetch_cache")
+        with stage(metrics, "fetch_cache") as record:
+            cache_key = cache.key(
+                [csv_path, xlsx_path],
+                {
+                    "compression": compression,
+                    "mode": mode,
+                    "report_format": report_format,
+                    "rules": rules.signature(),
+                },
+            )
+            meta = cache.fetch(cache_key, outputs)
+            record.counts["hits"] = int(meta is not None)
+        if meta is not None:
+            if summary is not None and report_name is not None:
+                summary.load_dict(json.loads((out_dir / SUMMARY_JSON_FILENAME).read_text()))
+            return (
+                out_dir / report_name if report_name else None,
+                validated_path,
+                int(meta["discrepancies"]),
+                int(meta["ok"]),
+                int(meta["needs_attention"]),
+            )
+
+    sheet_hint = _sheet_hint_from_range(read_report_range(csv_path))
+    # The timesheet sheets and the workbook the statuses are written into are
+    # inflated and parsed on the pool while the punch CSV is read here, and
+    # while validation streams the report. Under a memory budget nothing
+    # overlaps and the workbook is only parsed once the punches are released.
+    if metrics is None and budget is None:
+        executor = ThreadPoolExecutor(max_workers=PIPELINE_THREADS)
+    else:
+        executor = InlineExecutor()
+    with executor as pool:
+        sheets = pool.submit(
+            _staged,
+            metrics,
+            cancel_token,
+            "read_timesheet",
+            load_timesheet_cells,
+            xlsx_path,
+            sheet_hint,
+            budget is not None,
+            cancel_token,
+        )
+        status_workbook = None
+        if budget is None:
+            status_workbook = pool.submit(
+                _staged, metrics, cancel_token, "load_workbook", StatusWorkbook.load, xlsx_path
+            )
+        check_cancelled(cancel_token)
+        _report_progress(progress, "read_punches")
+        with stage(metrics, "read_punches") as record:
+            punches = read_punches(csv_path, budget, cancel_token)
+            record.counts["employee_days"] = len(punches)
+            record.counts["segments"] = sum(len(daily.segments) for daily in punches.values())
+        target_dates = {day for _employee_key, day in punches}
+        check_cancelled(cancel_token)
+        _report_progress(progress, "read_timesheet")
+        with stage(metrics, "read_timesheet") as record:
+            blocks = parse_timesheet(sheets.result(), target_dates, cancel_token)
+            sheets = None
+            record.counts["blocks"] = len(blocks)
+            record.counts["rows"] = sum(len(block.times_by_date) for block in blocks)
+
+        report_path: Optional[Path] = None
+        discrepancy_count = 0
+        pending = []
+        check_cancelled(cancel_token)
+        _report_progress(progress, "validate")
+        if mode == "status_only":
+            with stage(metrics, "validate") as record:
+                status_by_row = validate_status(
+                    blocks,
+                    punches,
+                    engine=engine,
+                    workers=workers,
+                    rules=rules,
+                    cancel_token=cancel_token,
+                )
+                record.counts["blocks"] = len(blocks)
+        else:
+            # Discrepancies stream straight into the report; the status map is
+            # filled in as they are produced and is complete once it is written.
+            status_by_row = {}
+            state = None
+            with stage(metrics, "validate") as record:
+                if state_path is None:
+                    discrepancies = iter_validate(
+                        blocks,
+                        punches,
+                        status_by_row,
+                        engine=engine,
+                        workers=workers,
+                        rules=rules,
+                        cancel_token=cancel_token,
+                    )
+                else:
+                    state = RevalidationState(state_path, rules.signature())
+                    groups = _revalidate(
+                        blocks, punches, state, status_by_row, engine, workers, rules, cancel_token
+                    )
+                    discrepancies = (item for _key, items in groups for item in items)
+                record.counts["blocks"] = len(blocks)
+            if summary is None:
+                summary = ReportSummary()
+            report_path = out_dir / report_filename(report_format)
+            with stage(metrics, "write_report") as record:
+                if state is not None and report_format == "csv":
+                    if metrics is not None:
+                        groups = metrics.timed("validate", groups)
+                    discrepancy_count, state.report_layout = write_csv_report_spliced(
+                        report_path, groups, state.report_layout, summary
+                    )
+                else:
+                    if metrics is not None:
+                        discrepancies = metrics.timed("validate", discrepancies)
+                    discrepancy_count = write_report(
+                        report_path, discrepancies, report_format, summary
+                    )
+                    if state is not None:
+                        state.report_layout = None
+                record.counts["discrepancies"] = discrepancy_count
+            if state is not None:
+                state.save()
+            pending.append(
+                pool.submit(
+                    _staged,
+                    metrics,
+                    cancel_token,
+                    "write_summary",
+                    summary.write,
+                    out_dir / SUMMARY_JSON_FILENAME,
+                    out_dir / SUMMARY_CSV_FILENAME,
+                )
+            )
+        if isinstance(punches, SpilledPunches):
+            punches.close()
+        del punches, blocks
+        if status_workbook is None:
+            status_workbook = pool.submit(
+                _staged, metrics, cancel_token, "load_workbook", StatusWorkbook.load, xlsx_path
+            )
+        check_cancelled(cancel_token)
+        _report_progress(progress, "write_statuses")
+        with stage(metrics, "write_statuses") as record:
+            status_workbook.result().save(
+                validated_path, status_by_row, compression=compression, cancel_token=cancel_token
+            )
+            record.counts["rows"] = len(status_by_row)
+        for future in pending:
+            future.result()
 
     ok_count = sum(1 for status in status_by_row.values() if status == "ok")
     needs_attention = sum(1 for status in status_by_row.values() if status != "ok")
-    return report_path, validated_path, len(discrepancies), ok_count, needs_attention
+    if cache is not None:
+        _report_progress(progress, "store_cache")
+        with stage(metrics, "store_cache"):
+            cache.store(
+                cache_key,
+                outputs,
+                {"discrepancies": discrepancy_count, "ok": ok_count, "needs_attention": needs_attention},
+            )
+    return report_path, validated_path, discrepancy_count, ok_count, needs_attention
+
+
+def _staged(
+    metrics: Optional[RunMetrics],
+    cancel_token: Optional[CancellationToken],
+    name: str,
+    func: Callable[..., T],
+    *args: Any,
+) -> T:
+    check_cancelled(cancel_token)
+    with stage(metrics, name):
+        return func(*args)
+
+
+def _report_progress(progress: Optional[Callable[[str], None]], name: str) -> None:
+    if progress is not None:
+        progress(name)
+
+
+def _validated_path(out_dir: Path, xlsx_path: Path) -> Path:
+    return out_dir / f"{xlsx_path.stem}-validated.xlsx"
+
+
+def _file_state(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cached_outputs(
+    out_dir: Path, validated_path: Path, report_name: Optional[str]
+) -> Dict[str, Path]:
+    # Cache entry file name -> output path of this run.
+    outputs = {"validated.xlsx": validated_path}
+    if report_name is not None:
+        outputs[report_name] = out_dir / report_name
+        for name in (SUMMARY_JSON_FILENAME, SUMMARY_CSV_FILENAME):
+            outputs[name] = out_dir / name
+    return outputs
+
+
+def pair_inputs(
+    csv_paths: Sequence[str | Path], xlsx_paths: Sequence[str | Path]
+) -> List[Tuple[Path, Path]]:
+    """Pairs each punch report with the timesheet that has a tab for its week.
+
+    The week comes from the report's date range (its header, else the
+    ``Punch_Report_<start>_<end>`` file name) and is matched against MMDD sheet
+    tabs. A report with no matching timesheet, or more than one, is an error.
+    """
+    tabs = {Path(path): read_sheet_names(path) for path in xlsx_paths}
+    pairs: List[Tuple[Path, Path]] = []
+    for csv_path in sorted(Path(path) for path in csv_paths):
+        sheet_hint = _sheet_hint_from_range(read_report_range(csv_path))
+        if sheet_hint is None:
+            raise ValueError(f"No report date range found in {csv_path.name}.")
+        matches = [path for path, names in tabs.items() if sheet_matches_hint(names, sheet_hint)]
+        if len(matches) != 1:
+            found = ", ".join(sorted(path.name for path in matches)) or "none"
+            raise ValueError(
+                f"{csv_path.name} needs exactly one timesheet with a {sheet_hint} tab (found {found})."
+            )
+        pairs.append((csv_path, matches[0]))
+    return pairs
+
+
+def run_batch(
+    pairs: Sequence[Tuple[str | Path, str | Path]],
+    out_root: str | Path,
+    workers: Optional[int] = None,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """Runs ``run_validation`` for every CSV/XLSX pair on a process pool.
+
+    Each pair writes into its own folder under ``out_root``; ``options`` are
+    passed through to ``run_validation``. A failing pair is recorded with its
+    error instead of stopping the batch. Returns the entries written to
+    ``batch_manifest.json`` in ``out_root``.
+    """
+    out_root = Path(out_root)
+    out_root.mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for csv_path, xlsx_path in pairs:
+        csv_path, xlsx_path = Path(csv_path), Path(xlsx_path)
+        out_dir = out_root / f"{xlsx_path.stem}-{csv_path.stem}"
+        jobs.append((csv_path, xlsx_path, out_dir, options))
+
+    if workers is not None and workers <= 1:
+        entries = [_run_pair(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            entries = list(pool.map(_run_pair, jobs))
+
+    manifest_path = out_root / BATCH_MANIFEST_FILENAME
+    manifest_path.write_text(json.dumps({"runs": entries}, indent=2) + "\n")
+    return entries
+
+
+def _run_pair(job: Tuple[Path, Path, Path, Dict[str, Any]]) -> Dict[str, Any]:
+    csv_path, xlsx_path, out_dir, options = job
+    entry: Dict[str, Any] = {"csv": str(csv_path), "xlsx": str(xlsx_path), "out_dir": str(out_dir)}
+    try:
+        report_path, validated_path, count, ok_count, needs_attention = run_validation(
+            csv_path, xlsx_path, out_dir, **options
+        )
+    except Exception as exc:
+        entry["error"] = str(exc)
+        return entry
+    entry.update(
+        report=str(report_path) if report_path is not None else None,
+        validated=str(validated_path),
+        discrepancies=count,
+        ok=ok_count,
+        needs_attention=needs_attention,
+    )
+    return entry
+
+
+def _revalidate(
+    blocks: List[EmployeeBlock],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    state: RevalidationState,
+    status_by_row: Dict[int, str],
+    engine: str,
+    workers: Optional[int],
+    rules: RuleBook,
+    cancel_token: Optional[CancellationToken],
+) -> Iterator[Tuple[Optional[str], Iterable[Discrepancy]]]:
+    """Reuses stored results of unchanged blocks and validates the rest.
+
+    Yields each block's discrepancies keyed by its fingerprint, then the
+    unmatched punches keyed ``None``; the caller saves ``state`` once the
+    report is written.
+    """
+    resolved_keys = resolve_employee_keys(blocks, punches)
+    fingerprints = [
+        block_fingerprint(block, resolved_key, punches)
+        for block, resolved_key in zip(blocks, resolved_keys)
+    ]
+    results: List[Optional[BlockResult]] = [state.lookup(fp) for fp in fingerprints]
+    stale = [position for position, result in enumerate(results) if result is None]
+    check_cancelled(cancel_token)
+    fresh = validate_blocks(
+        [blocks[position] for position in stale],
+        [resolved_keys[position] for position in stale],
+        punches,
+        engine=engine,
+        workers=workers,
+        rules=rules,
+    )
+    for position, result in zip(stale, fresh):
+        results[position] = result
+        state.store(fingerprints[position], result)
+    return (
+        (fingerprints[position] if position is not None else None, items)
+        for position, items in iter_result_groups(
+            blocks, results, punches, status_by_row, cancel_token
+        )
+    )
 
 
 def _sheet_hint_from_range(
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from .models import DailyPunches, EmployeeBlock
+from .reconciliation import ReconciliationIndex
+from .rules import RuleSet
+from .validator import _has_any_time, resolve_employee_keys
+from .validator_numpy import MISSING, _or_missing, sweep
+
+
+@dataclass(frozen=True)
+class PolicySummary:
+    """What validation would report if ``policy`` applied to every employee-day."""
+
+    policy: str
+    discrepancies: int
+    needs_attention: int
+    paid_minutes: int
+
+
+def simulate(
+    blocks: List[EmployeeBlock],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    policies: Sequence[RuleSet],
+) -> List[PolicySummary]:
+    """Evaluates every policy against the same parsed data in one sweep.
+
+    Employee-days are laid out once and repeated per policy, so all policies
+    are checked by a single pass of the NumPy engine's vectorized checks.
+    Department mappings are ignored: each policy is applied to everyone. Counts
+    match what ``validate`` reports with a rule book holding only that policy.
+    """
+    if np is None:
+        raise ImportError("Rule simulation requires numpy to be installed.")
+    if not policies:
+        return []
+
+    resolved_keys = resolve_employee_keys(blocks, punches)
+    # Employee-days whose outcome does not depend on the policy (missing punch
+    # data, bad punch sequences, punches with no timesheet row) are counted once.
+    fixed_discrepancies = 0
+    fixed_attention = np.zeros(len(blocks), dtype=bool)
+    index = ReconciliationIndex(punches)
+    positions: List[int] = []
+    columns: List[Tuple[int, ...]] = []
+    for position, (block, resolved_key) in enumerate(zip(blocks, resolved_keys)):
+        for day, recorded in block.times_by_date.items():
+            punch_key = (resolved_key, day)
+            daily = punches.get(punch_key)
+            if daily is None:
+                if _has_any_time(recorded):
+                    fixed_discrepancies += 1
+                    fixed_attention[position] = True
+                continue
+            index.mark_timesheet_day(resolved_key, day)
+            segments = daily.segments
+            if len(segments) not in (1, 2):
+                fixed_discrepancies += 1
+                fixed_attention[position] = True
+                continue
+            second = segments[1] if len(segments) == 2 else None
+            positions.append(position)
+            columns.append(
+                (
+                    segments[0].in_minutes,
+                    segments[0].out_minutes,
+                    second.in_minutes if second else MISSING,
+                    second.out_minutes if second else MISSING,
+                    _or_missing(recorded.clock_in),
+                    _or_missing(recorded.lunch_out),
+                    _or_missing(recorded.lunch_in),
+                    _or_missing(recorded.clock_out),
+                )
+            )
+
+    positions_by_key: Dict[str, List[int]] = {}
+    for position, block in enumerate(blocks):
+        positions_by_key.setdefault(block.key, []).append(position)
+    for employee_key, _day in index.missing_timesheet_days():
+        fixed_discrepancies += 1
+        fixed_attention[positions_by_key.get(employee_key, [])] = True
+
+    policy_count = len(policies)
+    attention = np.tile(fixed_attention, (policy_count, 1))
+    discrepancies = np.full(policy_count, fixed_discrepancies, dtype=np.int64)
+    paid_minutes = np.zeros(policy_count, dtype=np.int64)
+    if columns:
+        base = np.array(columns, dtype=np.int64)
+        rows = len(base)
+        table = np.tile(base, (policy_count, 1))
+        policy_ids = np.repeat(np.arange(policy_count), rows)
+        result = sweep(
+            policy_ids, table[:, :4], table[:, 4:], [policy.compile() for policy in policies]
+        )
+        per_row = (result.codes != 0).sum(axis=1) + result.lunch_break_failed
+        discrepancies += per_row.reshape(policy_count, rows).sum(axis=1)
+        paid_minutes += result.paid_minutes.reshape(policy_count, rows).sum(axis=1)
+        failing = np.flatnonzero(per_row)
+        attention[policy_ids[failing], np.tile(positions, policy_count)[failing]] = True
+
+    with_status = np.array([block.status_row is not None for block in blocks], dtype=bool)
+    return [
+        PolicySummary(
+            policy=policy.name,
+            discrepancies=int(discrepancies[idx]),
+            needs_attention=int((attention[idx] & with_status).sum()),
+            paid_minutes=int(paid_minutes[idx]),
+        )
+        for idx, policy in enumerate(policies)
+    ]
+
+
+def write_simulation_report(path: str | Path, summaries: Sequence[PolicySummary]) -> None:
+    """Writes the summary table; changes are relative to the first policy."""
+    report_path = Path(path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = summaries[0] if summaries else None
+    with report_path.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(
+            [
+                "policy",
+                "discrepancies",
+                "needs_attention",
+                "paid_minutes",
+                "discrepancy_change",
+                "paid_minutes_change",
+            ]
+        )
+        for summary in summaries:
+            writer.writerow(
+                [
+                    summary.policy,
+                    summary.discrepancies,
+                    summary.needs_attention,
+                    summary.paid_minutes,
+                    summary.discrepancies - baseline.discrepancies,
+                    summary.paid_minutes - baseline.paid_minutes,
+                ]
+            )
@@ -1,119 +1,521 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .cancellation import CHECK_EVERY_ROWS, CancellationToken, check_cancelled
+from .models import (
+    DailyPunches,
+    Discrepancy,
+    EmployeeBlock,
+    ExpectedTimes,
+    PunchSegment,
+    RecordedTimes,
+)
+from .name_resolver import NameResolver
+from .reconciliation import ReconciliationIndex
+from .rules import DEFAULT_RULES, CompiledRules, RuleBook
+
+
+# Per-block outcome: discrepancies in report order, whether the block needs
+# attention, and the punch keys it consumed.
+BlockResult = Tuple[List[Discrepancy], bool, List[Tuple[str, date]]]
+ENGINES = ("python", "numpy")
+# "status_only" decides ok / needs attention per block without building a report.
+MODES = ("full", "status_only")
 
-from .models import DailyPunches, Discrepancy, EmployeeBlock, ExpectedTimes, RecordedTimes
-from .utils import format_minutes, normalize_name
 
-TOLERANCE_MINUTES = 1
+def validate(
+    blocks: List[EmployeeBlock],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    engine: str = "python",
+    workers: Optional[int] = None,
+    rules: RuleBook = DEFAULT_RULES,
+    mode: str = "full",
+    cancel_token: Optional[CancellationToken] = None,
+) -> Tuple[List[Discrepancy], Dict[int, str]]:
+    if mode not in MODES:
+        raise ValueError(f"Unknown validation mode: {mode}")
+    if mode == "status_only":
+        return [], validate_status(
+            blocks, punches, engine=engine, workers=workers, rules=rules, cancel_token=cancel_token
+        )
+    status_by_row: Dict[int, str] = {}
+    discrepancies = list(
+        iter_validate(
+            blocks,
+            punches,
+            status_by_row,
+            engine=engine,
+            workers=workers,
+            rules=rules,
+            cancel_token=cancel_token,
+        )
+    )
+    return discrepancies, status_by_row
 
 
-def validate(
+def iter_validate(
     blocks: List[EmployeeBlock],
     punches: Dict[Tuple[str, date], DailyPunches],
+    status_by_row: Dict[int, str],
+    engine: str = "python",
+    workers: Optional[int] = None,
+    rules: RuleBook = DEFAULT_RULES,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Iterator[Discrepancy]:
+    """Yields discrepancies block by block, filling ``status_by_row`` as it goes.
+
+    With the python engine and no workers each block is validated only once the
+    previous block's rows have been consumed, so memory does not grow with the
+    discrepancy count. The numpy engine and worker shards validate in bulk and
+    then stream their results. Unmatched punches come last; ``status_by_row``
+    is complete once the iterator is exhausted.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown validation engine: {engine}")
+    resolved_keys = resolve_employee_keys(blocks, punches)
+    if engine == "python" and not _is_sharded(workers, blocks):
+        results: Iterable[BlockResult] = (
+            _validate_block(block, resolved_key, punches, rules)
+            for block, resolved_key in zip(blocks, resolved_keys)
+        )
+    else:
+        check_cancelled(cancel_token)
+        results = validate_blocks(
+            blocks, resolved_keys, punches, engine=engine, workers=workers, rules=rules
+        )
+    return iter_block_results(blocks, results, punches, status_by_row, cancel_token)
+
+
+def validate_status(
+    blocks: List[EmployeeBlock],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    engine: str = "python",
+    workers: Optional[int] = None,
+    rules: RuleBook = DEFAULT_RULES,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Dict[int, str]:
+    """Only the ok / needs attention status of each block.
+
+    With the python engine and no workers each block stops at its first failing
+    check and no ``Discrepancy`` is built. Other engines run the full checks and
+    drop the discrepancies.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown validation engine: {engine}")
+    resolved_keys = resolve_employee_keys(blocks, punches)
+    status_by_row: Dict[int, str] = {}
+    if engine != "python" or _is_sharded(workers, blocks):
+        check_cancelled(cancel_token)
+        results = validate_blocks(
+            blocks, resolved_keys, punches, engine=engine, workers=workers, rules=rules
+        )
+        for _item in iter_block_results(blocks, results, punches, status_by_row, cancel_token):
+            pass
+        return status_by_row
+
+    index = ReconciliationIndex(punches)
+    for block, resolved_key in zip(blocks, resolved_keys):
+        check_cancelled(cancel_token)
+        has_issue = _block_has_issue(block, resolved_key, punches, rules, index)
+        if block.status_row is not None:
+            status_by_row[block.status_row] = "needs attention" if has_issue else "ok"
+    for _daily in _missing_timesheet_rows(index, blocks, status_by_row, cancel_token):
+        pass
+    return status_by_row
+
+
+def resolve_employee_keys(
+    blocks: List[EmployeeBlock],
+    punches: Dict[Tuple[str, date], DailyPunches],
+) -> List[str]:
+    resolver = NameResolver.from_punches(punches)
+    return [resolver.resolve(block) or block.key for block in blocks]
+
+
+def validate_blocks(
+    blocks: List[EmployeeBlock],
+    resolved_keys: List[str],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    engine: str = "python",
+    workers: Optional[int] = None,
+    rules: RuleBook = DEFAULT_RULES,
+) -> List[BlockResult]:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown validation engine: {engine}")
+    if _is_sharded(workers, blocks):
+        return _validate_sharded(blocks, resolved_keys, punches, engine, workers, rules)
+    return _validate_blocks(engine, blocks, resolved_keys, punches, rules)
+
+
+def merge_block_results(
+    blocks: List[EmployeeBlock],
+    results: List[BlockResult],
+    punches: Dict[Tuple[str, date], DailyPunches],
 ) -> Tuple[List[Discrepancy], Dict[int, str]]:
-    discrepancies: List[Discrepancy] = []
     status_by_row: Dict[int, str] = {}
-    matched_keys: set[Tuple[str, date]] = set()
-    blocks_by_key: Dict[str, List[EmployeeBlock]] = {}
-    block_has_issue: Dict[int, bool] = {}
-
-    for block in blocks:
-        blocks_by_key.setdefault(block.key, []).append(block)
-
-    name_index, first_index = _build_name_index(punches)
-
-    for block in blocks:
-        has_issue = False
-        resolved_key = _resolve_employee_key(block, name_index, first_index) or block.key
-        for day, recorded in block.times_by_date.items():
-            punch_key = (resolved_key, day)
-            daily = punches.get(punch_key)
-            if daily is None:
-                if _has_any_time(recorded):
-                    discrepancies.append(
-                        Discrepancy(
-                            employee_name=block.name,
-                            date=day,
-                            field="day",
-                            expected="punch data",
-                            actual="missing",
-                            error_type="missing_punch_data",
-                        )
-                    )
-                    has_issue = True
-                continue
+    discrepancies = list(iter_block_results(blocks, results, punches, status_by_row))
+    return discrepancies, status_by_row
+
+
+def iter_block_results(
+    blocks: List[EmployeeBlock],
+    results: Iterable[BlockResult],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    status_by_row: Dict[int, str],
+    cancel_token: Optional[CancellationToken] = None,
+) -> Iterator[Discrepancy]:
+    for _position, discrepancies in iter_result_groups(
+        blocks, results, punches, status_by_row, cancel_token
+    ):
+        yield from discrepancies
+
+
+def iter_result_groups(
+    blocks: List[EmployeeBlock],
+    results: Iterable[BlockResult],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    status_by_row: Dict[int, str],
+    cancel_token: Optional[CancellationToken] = None,
+) -> Iterator[Tuple[Optional[int], Iterable[Discrepancy]]]:
+    """``iter_block_results`` grouped as ``(block position, discrepancies)``.
+
+    The punches no block matched come last, with position ``None``.
+    """
+    index = ReconciliationIndex(punches)
+    for position, (block, (block_discrepancies, has_issue, block_matched)) in enumerate(
+        zip(blocks, results)
+    ):
+        check_cancelled(cancel_token)
+        for employee_key, day in block_matched:
+            index.mark_timesheet_day(employee_key, day)
+        if block.status_row is not None:
+            status_by_row[block.status_row] = "needs attention" if has_issue else "ok"
+        yield position, block_discrepancies
+
+    yield None, _unmatched_punches(index, blocks, status_by_row, cancel_token)
+
+
+def _is_sharded(workers: Optional[int], blocks: List[EmployeeBlock]) -> bool:
+    return workers is not None and workers > 1 and len(blocks) > 1
+
+
+def _validate_blocks(
+    engine: str,
+    blocks: List[EmployeeBlock],
+    resolved_keys: List[str],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    rules: RuleBook,
+) -> List[BlockResult]:
+    if engine == "numpy":
+        from .validator_numpy import validate_arrays
+
+        return validate_arrays(blocks, resolved_keys, punches, rules)
+    return [
+        _validate_block(block, resolved_key, punches, rules)
+        for block, resolved_key in zip(blocks, resolved_keys)
+    ]
+
+
+def _validate_sharded(
+    blocks: List[EmployeeBlock],
+    resolved_keys: List[str],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    engine: str,
+    workers: int,
+    rules: RuleBook,
+) -> List[BlockResult]:
+    # Every block of one employee lands in the same shard together with that
+    # employee's punches; results are put back in block order afterwards.
+    positions_by_key: Dict[str, List[int]] = {}
+    for position, resolved_key in enumerate(resolved_keys):
+        positions_by_key.setdefault(resolved_key, []).append(position)
+    punches_by_key: Dict[str, Dict[Tuple[str, date], DailyPunches]] = {}
+    for punch_key, daily in punches.items():
+        punches_by_key.setdefault(punch_key[0], {})[punch_key] = daily
+
+    shard_count = min(workers, len(positions_by_key))
+    shards: List[List[int]] = [[] for _ in range(shard_count)]
+    shard_punches: List[Dict[Tuple[str, date], DailyPunches]] = [{} for _ in range(shard_count)]
+    ordered_keys = sorted(positions_by_key, key=lambda key: -len(positions_by_key[key]))
+    for resolved_key in ordered_keys:
+        target = min(range(shard_count), key=lambda idx: len(shards[idx]))
+        shards[target].extend(positions_by_key[resolved_key])
+        shard_punches[target].update(punches_by_key.get(resolved_key, {}))
+
+    results: List[Optional[BlockResult]] = [None] * len(blocks)
+    with ProcessPoolExecutor(max_workers=shard_count) as pool:
+        futures = [
+            (
+                positions,
+                pool.submit(
+                    _validate_shard,
+                    engine,
+                    rules,
+                    [_pack_block(blocks[position], resolved_keys[position]) for position in positions],
+                    [_pack_daily(daily) for daily in shard_punches[idx].values()],
+                ),
+            )
+            for idx, positions in enumerate(shards)
+        ]
+        days = _OrdinalDates()
+        for positions, future in futures:
+            for position, packed in zip(positions, future.result()):
+                results[position] = unpack_result(packed, days)
+    return results
+
+
+# Shards cross the process boundary as plain tuples of str/int, which pickle an
+# order of magnitude faster than the dataclasses they stand for.
+def _validate_shard(
+    engine: str, rules: RuleBook, packed_blocks: list, packed_punches: list
+) -> list:
+    days = _OrdinalDates()
+    blocks: List[EmployeeBlock] = []
+    resolved_keys: List[str] = []
+    for name, key, status_row, resolved_key, packed_days in packed_blocks:
+        times_by_date = {days[ordinal]: RecordedTimes(*times) for ordinal, *times in packed_days}
+        blocks.append(EmployeeBlock(name, key, {}, times_by_date, status_row))
+        resolved_keys.append(resolved_key)
+    punches: Dict[Tuple[str, date], DailyPunches] = {}
+    for name, key, ordinal, segments, dept_code in packed_punches:
+        day = days[ordinal]
+        punches[(key, day)] = DailyPunches(
+            name,
+            key,
+            day,
+            [PunchSegment(in_minutes, out_minutes) for in_minutes, out_minutes in segments],
+            dept_code,
+        )
+    results = _validate_blocks(engine, blocks, resolved_keys, punches, rules)
+    return [pack_result(result) for result in results]
+
+
+def _pack_block(block: EmployeeBlock, resolved_key: str) -> tuple:
+    days = [
+        (day.toordinal(), times.clock_in, times.lunch_out, times.lunch_in, times.clock_out)
+        for day, times in block.times_by_date.items()
+    ]
+    return (block.name, block.key, block.status_row, resolved_key, days)
+
+
+def _pack_daily(daily: DailyPunches) -> tuple:
+    segments = [(seg.in_minutes, seg.out_minutes) for seg in daily.segments]
+    return (
+        daily.employee_name,
+        daily.employee_key,
+        daily.date.toordinal(),
+        segments,
+        daily.dept_code,
+    )
+
+
+class _OrdinalDates(dict):
+    """Shares one ``date`` object per ordinal while unpacking a shard."""
+
+    def __missing__(self, ordinal: Optional[int]) -> Optional[date]:
+        day = date.fromordinal(ordinal) if ordinal is not None else None
+        self[ordinal] = day
+        return day
+
 
-            matched_keys.add(punch_key)
-            raw_times, expected, error = _compute_times(daily)
-            if error:
+def pack_result(result: BlockResult) -> tuple:
+    block_discrepancies, has_issue, matched = result
+    rows = [item.pack() for item in block_discrepancies]
+    return rows, has_issue, [(key, day.toordinal()) for key, day in matched]
+
+
+def unpack_result(packed: Sequence, days: Optional[_OrdinalDates] = None) -> BlockResult:
+    if days is None:
+        days = _OrdinalDates()
+    rows, has_issue, matched = packed
+    discrepancies = [Discrepancy.unpack(row, days[row[1]]) for row in rows]
+    return discrepancies, has_issue, [(key, days[ordinal]) for key, ordinal in matched]
+
+
+def _validate_block(
+    block: EmployeeBlock,
+    resolved_key: str,
+    punches: Dict[Tuple[str, date], DailyPunches],
+    rules: RuleBook,
+) -> BlockResult:
+    discrepancies: List[Discrepancy] = []
+    matched_keys: List[Tuple[str, date]] = []
+    has_issue = False
+    for day, recorded in block.times_by_date.items():
+        punch_key = (resolved_key, day)
+        daily = punches.get(punch_key)
+        if daily is None:
+            if _has_any_time(recorded):
                 discrepancies.append(
                     Discrepancy(
                         employee_name=block.name,
                         date=day,
-                        field="punch_sequence",
-                        expected="1 or 2 punch pairs",
-                        actual=str(len(daily.segments)),
-                        error_type="invalid_punch_sequence",
+                        field="day",
+                        expected="punch data",
+                        actual="missing",
+                        error_type="missing_punch_data",
                     )
                 )
                 has_issue = True
-                continue
-
-            lunch_required = expected.shift_minutes is not None and expected.shift_minutes > 360
-            lunch_validated = False
-            if raw_times.lunch_out is None and raw_times.lunch_in is None and lunch_required:
-                lunch_validated = _validate_manual_lunch(expected, recorded)
-                if not lunch_validated:
-                    discrepancies.append(
-                        Discrepancy(
-                            employee_name=block.name,
-                            date=day,
-                            field="lunch_break",
-                            expected="30 minutes",
-                            actual=_format_lunch(recorded),
-                            error_type="missing_or_invalid_lunch",
-                        )
-                    )
-                    has_issue = True
-
-            has_issue |= _compare_times(
-                discrepancies,
-                block.name,
-                day,
-                raw_times,
-                expected,
-                recorded,
-                skip_lunch=lunch_validated,
+            continue
+
+        matched_keys.append(punch_key)
+        day_rules = rules.for_department(daily.dept_code)
+        raw_times, expected, error = _compute_times(daily, day_rules)
+        if error:
+            discrepancies.append(
+                Discrepancy(
+                    employee_name=block.name,
+                    date=day,
+                    field="punch_sequence",
+                    expected="1 or 2 punch pairs",
+                    actual=len(daily.segments),
+                    error_type="invalid_punch_sequence",
+                )
             )
+            has_issue = True
+            continue
 
-        if block.status_row is not None:
-            status_by_row[block.status_row] = "needs attention" if has_issue else "ok"
-            block_has_issue[block.status_row] = has_issue
+        lunch_required = expected.shift_minutes is not None and day_rules.needs_lunch(
+            expected.shift_minutes
+        )
+        lunch_validated = False
+        if raw_times.lunch_out is None and raw_times.lunch_in is None and lunch_required:
+            lunch_validated = _validate_manual_lunch(expected, recorded, day_rules)
+            if not lunch_validated:
+                discrepancies.append(
+                    Discrepancy(
+                        employee_name=block.name,
+                        date=day,
+                        field="lunch_break",
+                        expected=day_rules.rule_set.lunch_minutes,
+                        actual=_recorded_lunch(recorded),
+                        error_type="missing_or_invalid_lunch",
+                    )
+                )
+                has_issue = True
 
-    for punch_key, daily in punches.items():
-        if punch_key in matched_keys:
-            continue
-        discrepancies.append(
-            Discrepancy(
-                employee_name=daily.employee_name,
-                date=daily.date,
-                field="day",
-                expected="timesheet entry",
-                actual="missing",
-                error_type="missing_timesheet_row",
-            )
+        has_issue |= _compare_times(
+            discrepancies,
+            block.name,
+            day,
+            raw_times,
+            expected,
+            recorded,
+            day_rules,
+            skip_lunch=lunch_validated,
         )
+    return discrepancies, has_issue, matched_keys
+
+
+def _block_has_issue(
+    block: EmployeeBlock,
+    resolved_key: str,
+    punches: Dict[Tuple[str, date], DailyPunches],
+    rules: RuleBook,
+    index: ReconciliationIndex,
+) -> bool:
+    # Matched days are still recorded after the first failure so that the
+    # missing timesheet row sweep sees every day this block covers.
+    has_issue = False
+    for day, recorded in block.times_by_date.items():
+        daily = punches.get((resolved_key, day))
+        if daily is None:
+            has_issue = has_issue or _has_any_time(recorded)
+            continue
+        index.mark_timesheet_day(resolved_key, day)
+        if not has_issue:
+            has_issue = _day_has_issue(daily, recorded, rules.for_department(daily.dept_code))
+    return has_issue
+
+
+def _day_has_issue(daily: DailyPunches, recorded: RecordedTimes, rules: CompiledRules) -> bool:
+    raw_times, expected, error = _compute_times(daily, rules)
+    if error:
+        return True
+    lunch_validated = False
+    if (
+        raw_times.lunch_out is None
+        and raw_times.lunch_in is None
+        and expected.shift_minutes is not None
+        and rules.needs_lunch(expected.shift_minutes)
+    ):
+        if not _validate_manual_lunch(expected, recorded, rules):
+            return True
+        lunch_validated = True
+    tolerance = rules.tolerance
+    if not _field_matches((raw_times.clock_in, expected.clock_in), recorded.clock_in, tolerance):
+        return True
+    if not lunch_validated:
+        if not _field_matches(
+            (raw_times.lunch_out, expected.lunch_out), recorded.lunch_out, tolerance
+        ):
+            return True
+        if not _field_matches(
+            _allowed_lunch_in(raw_times, expected, rules), recorded.lunch_in, tolerance
+        ):
+            return True
+    return not _field_matches((raw_times.clock_out,), recorded.clock_out, tolerance)
+
+
+def _field_matches(
+    expected_values: Sequence[Optional[int]], actual: Optional[int], tolerance: int
+) -> bool:
+    # Same outcome as _compare_field without building the discrepancy.
+    has_expected = False
+    for expected in expected_values:
+        if expected is None:
+            continue
+        if actual is not None and abs(expected - actual) <= tolerance:
+            return True
+        has_expected = True
+    return not has_expected and actual is None
+
+
+def _missing_timesheet_rows(
+    index: ReconciliationIndex,
+    blocks: List[EmployeeBlock],
+    status_by_row: Dict[int, str],
+    cancel_token: Optional[CancellationToken] = None,
+) -> Iterator[DailyPunches]:
+    blocks_by_key: Optional[Dict[str, List[EmployeeBlock]]] = None
+    for row_count, punch_key in enumerate(index.missing_timesheet_days()):
+        if row_count % CHECK_EVERY_ROWS == 0:
+            check_cancelled(cancel_token)
+        if blocks_by_key is None:
+            blocks_by_key = {}
+            for block in blocks:
+                blocks_by_key.setdefault(block.key, []).append(block)
+        daily = index.punches[punch_key]
         for block in blocks_by_key.get(daily.employee_key, []):
             if block.status_row is not None:
                 status_by_row[block.status_row] = "needs attention"
+        yield daily
 
-    return discrepancies, status_by_row
+
+def _unmatched_punches(
+    index: ReconciliationIndex,
+    blocks: List[EmployeeBlock],
+    status_by_row: Dict[int, str],
+    cancel_token: Optional[CancellationToken] = None,
+) -> Iterator[Discrepancy]:
+    for daily in _missing_timesheet_rows(index, blocks, status_by_row, cancel_token):
+        yield Discrepancy(
+            employee_name=daily.employee_name,
+            date=daily.date,
+            field="day",
+            expected="timesheet entry",
+            actual="missing",
+            error_type="missing_timesheet_row",
+        )
 
 
 def _compute_times(
     daily: DailyPunches,
+    rules: CompiledRules,
 ) -> tuple[RecordedTimes, ExpectedTimes, Optional[str]]:
     segments = daily.segments
     if len(segments) == 1:
@@ -127,7 +529,7 @@ def _compute_times(
         return (
             raw,
             ExpectedTimes(
-                clock_in=_round_in(seg.in_minutes),
+                clock_in=rules.round_in[seg.in_minutes],
                 lunch_out=None,
                 lunch_in=None,
                 clock_out=seg.out_minutes,
@@ -143,12 +545,12 @@ def _compute_times(
             lunch_in=second.in_minutes,
             clock_out=second.out_minutes,
         )
-        lunch_out = _round_in(first.out_minutes)
-        lunch_in = max(second.in_minutes, lunch_out + 30)
+        lunch_out = rules.round_in[first.out_minutes]
+        lunch_in = max(second.in_minutes, rules.earliest_return[lunch_out])
         return (
             raw,
             ExpectedTimes(
-                clock_in=_round_in(first.in_minutes),
+                clock_in=rules.round_in[first.in_minutes],
                 lunch_out=lunch_out,
                 lunch_in=lunch_in,
                 clock_out=second.out_minutes,
@@ -175,27 +577,6 @@ def _compute_times(
     )
 
 
-def _round_in(minutes: int) -> int:
-    boundary = _nearest_boundary(minutes)
-    return boundary if minutes < boundary else minutes
-
-
-def _round_out(minutes: int) -> int:
-    boundary = _nearest_boundary(minutes)
-    return boundary if minutes > boundary else minutes
-
-
-def _nearest_boundary(minutes: int) -> int:
-    # Treat the nearest 30-minute boundary as the scheduled time (ties round up).
-    lower = minutes - (minutes % 30)
-    upper = lower + 30
-    if minutes - lower < upper - minutes:
-        return lower
-    if minutes - lower > upper - minutes:
-        return upper
-    return upper
-
-
 def _compare_times(
     discrepancies: List[Discrepancy],
     employee_name: str,
@@ -203,6 +584,7 @@ def _compare_times(
     raw_times: RecordedTimes,
     expected: ExpectedTimes,
     recorded: RecordedTimes,
+    rules: CompiledRules,
     skip_lunch: bool,
 ) -> bool:
     has_issue = False
@@ -213,6 +595,7 @@ def _compare_times(
         "clock_in",
         _allowed_values(raw_times.clock_in, expected.clock_in),
         recorded.clock_in,
+        rules.tolerance,
     )
     if not skip_lunch:
         has_issue |= _compare_field(
@@ -222,14 +605,16 @@ def _compare_times(
             "clock_out_lunch",
             _allowed_values(raw_times.lunch_out, expected.lunch_out),
             recorded.lunch_out,
+            rules.tolerance,
         )
         has_issue |= _compare_field(
             discrepancies,
             employee_name,
             day,
             "clock_in_work",
-            _allowed_lunch_in(raw_times, expected),
+            _allowed_lunch_in(raw_times, expected, rules),
             recorded.lunch_in,
+            rules.tolerance,
         )
     has_issue |= _compare_field(
         discrepancies,
@@ -238,6 +623,7 @@ def _compare_times(
         "clock_out",
         _allowed_values(raw_times.clock_out, expected.clock_out),
         recorded.clock_out,
+        rules.tolerance,
     )
     return has_issue
 
@@ -249,6 +635,7 @@ def _compare_field(
     field: str,
     expected_values: list[Optional[int]],
     actual: int | None,
+    tolerance: int,
 ) -> bool:
     normalized = _normalize_expected(expected_values)
     if not normalized and actual is None:
@@ -260,7 +647,7 @@ def _compare_field(
                 date=day,
                 field=field,
                 expected=None,
-                actual=format_minutes(actual),
+                actual=actual,
                 error_type="unexpected_entry",
             )
         )
@@ -271,7 +658,7 @@ def _compare_field(
                 employee_name=employee_name,
                 date=day,
                 field=field,
-                expected=_format_expected(normalized),
+                expected=tuple(normalized),
                 actual=None,
                 error_type="missing_entry",
             )
@@ -279,15 +666,15 @@ def _compare_field(
         return True
     if actual is not None and normalized:
         for expected in normalized:
-            if abs(expected - actual) <= TOLERANCE_MINUTES:
+            if abs(expected - actual) <= tolerance:
                 return False
         discrepancies.append(
             Discrepancy(
                 employee_name=employee_name,
                 date=day,
                 field=field,
-                expected=_format_expected(normalized),
-                actual=format_minutes(actual),
+                expected=tuple(normalized),
+                actual=actual,
                 error_type="mismatch",
             )
         )
@@ -302,10 +689,12 @@ def _has_any_time(recorded: RecordedTimes) -> bool:
     )
 
 
-def _validate_manual_lunch(expected: ExpectedTimes, recorded: RecordedTimes) -> bool:
+def _validate_manual_lunch(
+    expected: ExpectedTimes, recorded: RecordedTimes, rules: CompiledRules
+) -> bool:
     if recorded.lunch_out is None or recorded.lunch_in is None:
         return False
-    if recorded.lunch_in - recorded.lunch_out != 30:
+    if recorded.lunch_in - recorded.lunch_out != rules.rule_set.lunch_minutes:
         return False
     if expected.clock_in is not None and recorded.lunch_out < expected.clock_in:
         return False
@@ -314,10 +703,10 @@ def _validate_manual_lunch(expected: ExpectedTimes, recorded: RecordedTimes) ->
     return True
 
 
-def _format_lunch(recorded: RecordedTimes) -> str:
+def _recorded_lunch(recorded: RecordedTimes) -> Union[str, Tuple[int, int]]:
     if recorded.lunch_out is None or recorded.lunch_in is None:
         return "missing"
-    return f"{format_minutes(recorded.lunch_out)}-{format_minutes(recorded.lunch_in)}"
+    return recorded.lunch_out, recorded.lunch_in
 
 
 def _allowed_values(*values: Optional[int]) -> list[Optional[int]]:
@@ -334,117 +723,17 @@ def _normalize_expected(values: list[Optional[int]]) -> list[int]:
     return unique
 
 
-def _format_expected(values: list[int]) -> str:
-    formatted = [format_minutes(value) for value in values]
-    return " | ".join(val for val in formatted if val)
-
-
-def _enforced_lunch_in(raw_times: RecordedTimes) -> Optional[int]:
-    if raw_times.lunch_out is None or raw_times.lunch_in is None:
-        return None
-    return max(raw_times.lunch_in, raw_times.lunch_out + 30)
-
-
-def _allowed_lunch_in(raw_times: RecordedTimes, expected: ExpectedTimes) -> list[Optional[int]]:
+def _allowed_lunch_in(
+    raw_times: RecordedTimes, expected: ExpectedTimes, rules: CompiledRules
+) -> list[Optional[int]]:
     values: list[Optional[int]] = []
     if raw_times.lunch_out is None or raw_times.lunch_in is None:
-        values.extend([raw_times.lunch_in, expected.lunch_in, _enforced_lunch_in(raw_times)])
+        values.extend([raw_times.lunch_in, expected.lunch_in])
         return values
 
-    min_return = raw_times.lunch_out + 30
+    min_return = rules.earliest_return[raw_times.lunch_out]
     if raw_times.lunch_in >= min_return:
         values.append(raw_times.lunch_in)
     values.append(expected.lunch_in)
     values.append(max(raw_times.lunch_in, min_return))
     return values
-
-
-def _build_name_index(
-    punches: Dict[Tuple[str, date], DailyPunches]
-) -> Tuple[Dict[str, set[str]], Dict[str, set[str]]]:
-    index: Dict[str, set[str]] = {}
-    first_index: Dict[str, set[str]] = {}
-    for (employee_key, _day), daily in punches.items():
-        tokens = _name_tokens(daily.employee_name)
-        if tokens:
-            first_index.setdefault(tokens[0], set()).add(employee_key)
-        for variant in _name_variants(daily.employee_name):
-            index.setdefault(variant, set()).add(employee_key)
-    return index, first_index
-
-
-def _resolve_employee_key(
-    block: EmployeeBlock, name_index: Dict[str, set[str]], first_index: Dict[str, set[str]]
-) -> Optional[str]:
-    tokens = _name_tokens(block.name)
-    if not tokens:
-        return None
-    variants: list[str] = [" ".join(tokens)]
-    if len(tokens) >= 2:
-        variants.append(" ".join(tokens[:2]))
-        variants.append(" ".join([tokens[0], tokens[-1]]))
-    variants.append(tokens[0])
-    seen: set[str] = set()
-    for variant in variants:
-        if variant in seen:
-            continue
-        seen.add(variant)
-        candidates = name_index.get(variant, set())
-        if block.key in candidates:
-            return block.key
-        if len(candidates) == 1:
-            return next(iter(candidates))
-
-    if len(tokens) >= 2:
-        first = tokens[0]
-        last = tokens[-1]
-        fuzzy: set[str] = set()
-        for employee_key in first_index.get(first, set()):
-            key_tokens = employee_key.split()
-            if not key_tokens:
-                continue
-            if _within_edit_distance(last, key_tokens[-1]):
-                fuzzy.add(employee_key)
-        if len(fuzzy) == 1:
-            return next(iter(fuzzy))
-    return None
-
-
-def _name_variants(name: str) -> set[str]:
-    tokens = _name_tokens(name)
-    if not tokens:
-        return set()
-    variants = {" ".join(tokens), tokens[0]}
-    if len(tokens) >= 2:
-        variants.add(" ".join(tokens[:2]))
-        variants.add(" ".join([tokens[0], tokens[-1]]))
-    return variants
-
-
-def _name_tokens(name: str) -> list[str]:
-    return [token for token in normalize_name(name).split() if len(token) > 1]
-
-
-def _within_edit_distance(a: str, b: str) -> bool:
-    if a == b:
-        return True
-    if abs(len(a) - len(b)) > 1:
-        return False
-    if len(a) == len(b):
-        mismatches = sum(1 for x, y in zip(a, b) if x != y)
-        return mismatches <= 1
-    # ensure a is shorter
-    if len(a) > len(b):
-        a, b = b, a
-    i = j = 0
-    edits = 0
-    while i < len(a) and j < len(b):
-        if a[i] == b[j]:
-            i += 1
-            j += 1
-            continue
-        edits += 1
-        if edits > 1:
-            return False
-        j += 1
-    return True
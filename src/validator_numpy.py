@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from .models import DailyPunches, Discrepancy, EmployeeBlock, RecordedTimes
+from .rules import CompiledRules, RuleBook
+from .validator import (
+    BlockResult,
+    _has_any_time,
+    _normalize_expected,
+    _recorded_lunch,
+)
+
+# Marks a missing time in the integer columns; real times are 0-1439.
+MISSING = -1
+COMPARED_FIELDS = ("clock_in", "clock_out_lunch", "clock_in_work", "clock_out")
+_OK, _UNEXPECTED, _MISSING_ENTRY, _MISMATCH = 0, 1, 2, 3
+# Slices of the flattened candidate row that belong to each compared field.
+_CANDIDATE_SLICES = (slice(0, 2), slice(2, 4), slice(4, 7), slice(7, 8))
+
+
+def validate_arrays(
+    blocks: List[EmployeeBlock],
+    resolved_keys: List[str],
+    punches: Dict[Tuple[str, date], DailyPunches],
+    rules: RuleBook,
+) -> List[BlockResult]:
+    """Array-at-a-time equivalent of the per-block Python checks.
+
+    Employee-days with one or two punch pairs are laid out as parallel integer
+    columns and checked with NumPy operations; ``Discrepancy`` objects are only
+    built for rows that fail. Output (including order) matches the Python engine.
+    """
+    if np is None:
+        raise ImportError("The numpy validation engine requires numpy to be installed.")
+
+    results: List[BlockResult] = [([], False, []) for _ in blocks]
+    # Rows are (block position, employee name, day, recorded, early discrepancy);
+    # rows with an early discrepancy are not vectorized.
+    rows: List[Tuple[int, str, date, RecordedTimes, Optional[Discrepancy]]] = []
+    columns: List[Tuple[int, ...]] = []
+    # Each distinct rule set in use gets a row in the stacked lookup tables.
+    rule_index: Dict[int, int] = {}
+    rule_list: List[CompiledRules] = []
+    for position, (block, resolved_key) in enumerate(zip(blocks, resolved_keys)):
+        for day, recorded in block.times_by_date.items():
+            punch_key = (resolved_key, day)
+            daily = punches.get(punch_key)
+            if daily is None:
+                if _has_any_time(recorded):
+                    early = Discrepancy(
+                        employee_name=block.name,
+                        date=day,
+                        field="day",
+                        expected="punch data",
+                        actual="missing",
+                        error_type="missing_punch_data",
+                    )
+                    rows.append((position, block.name, day, recorded, early))
+                continue
+
+            results[position][2].append(punch_key)
+            segments = daily.segments
+            if len(segments) not in (1, 2):
+                early = Discrepancy(
+                    employee_name=block.name,
+                    date=day,
+                    field="punch_sequence",
+                    expected="1 or 2 punch pairs",
+                    actual=len(segments),
+                    error_type="invalid_punch_sequence",
+                )
+                rows.append((position, block.name, day, recorded, early))
+                continue
+
+            second = segments[1] if len(segments) == 2 else None
+            day_rules = rules.for_department(daily.dept_code)
+            rule_id = rule_index.get(id(day_rules))
+            if rule_id is None:
+                rule_id = rule_index[id(day_rules)] = len(rule_list)
+                rule_list.append(day_rules)
+            rows.append((position, block.name, day, recorded, None))
+            columns.append(
+                (
+                    len(rows) - 1,
+                    rule_id,
+                    segments[0].in_minutes,
+                    segments[0].out_minutes,
+                    second.in_minutes if second else MISSING,
+                    second.out_minutes if second else MISSING,
+                    _or_missing(recorded.clock_in),
+                    _or_missing(recorded.lunch_out),
+                    _or_missing(recorded.lunch_in),
+                    _or_missing(recorded.clock_out),
+                )
+            )
+
+    failures = _evaluate(columns, rule_list) if columns else {}
+    has_issue = [False] * len(blocks)
+    for row_idx, (position, name, day, recorded, early) in enumerate(rows):
+        if early is not None:
+            results[position][0].append(early)
+            has_issue[position] = True
+            continue
+        failed = failures.get(row_idx)
+        if failed is None:
+            continue
+        has_issue[position] = True
+        results[position][0].extend(_materialize(name, day, recorded, failed, rule_list))
+
+    return [
+        (block_discrepancies, has_issue[position], matched)
+        for position, (block_discrepancies, _issue, matched) in enumerate(results)
+    ]
+
+
+def _or_missing(value: Optional[int]) -> int:
+    return MISSING if value is None else value
+
+
+class Sweep(NamedTuple):
+    """Per-row outcome of the vectorized checks.
+
+    ``codes`` holds one result code per compared field, ``allowed`` the
+    candidate expected times per field (``MISSING`` where absent) and
+    ``paid_minutes`` the expected worked minutes after lunch.
+    """
+
+    codes: "np.ndarray"
+    lunch_break_failed: "np.ndarray"
+    allowed: Tuple["np.ndarray", ...]
+    paid_minutes: "np.ndarray"
+
+
+def sweep(
+    rule_ids: "np.ndarray",
+    segments: "np.ndarray",
+    rec: "np.ndarray",
+    rule_list: List[CompiledRules],
+) -> Sweep:
+    """Runs every check for rows of ``(in1, out1, in2, out2)`` punch columns and
+    ``rec`` recorded times, each row under ``rule_list[rule_ids[row]]``."""
+    in1, out1, in2, out2 = segments[:, 0], segments[:, 1], segments[:, 2], segments[:, 3]
+    two_pairs = in2 != MISSING
+
+    round_in = np.array([rules.round_in for rules in rule_list], dtype=np.int64)
+    earliest_return = np.array([rules.earliest_return for rules in rule_list], dtype=np.int64)
+    lunch_table = np.array(
+        [np.frombuffer(rules.lunch_required, dtype=np.uint8) for rules in rule_list], dtype=bool
+    )
+    tolerance = np.array([rules.tolerance for rules in rule_list], dtype=np.int64)[rule_ids]
+    lunch_minutes = np.array(
+        [rules.rule_set.lunch_minutes for rules in rule_list], dtype=np.int64
+    )[rule_ids]
+
+    def lookup(tables: "np.ndarray", minutes: "np.ndarray") -> "np.ndarray":
+        # Missing entries are looked up at minute 0 and masked out by the caller.
+        return tables[rule_ids, np.clip(minutes, 0, tables.shape[1] - 1)]
+
+    raw_in = in1
+    raw_lunch_out = np.where(two_pairs, out1, MISSING)
+    raw_lunch_in = np.where(two_pairs, in2, MISSING)
+    raw_out = np.where(two_pairs, out2, out1)
+    expected_in = lookup(round_in, in1)
+    expected_lunch_out = np.where(two_pairs, lookup(round_in, out1), MISSING)
+    expected_lunch_in = np.where(
+        two_pairs, np.maximum(in2, lookup(earliest_return, expected_lunch_out)), MISSING
+    )
+    shift = (out1 - in1) + np.where(two_pairs, out2 - in2, 0)
+
+    lunch_required = ~two_pairs & (shift >= 0) & lookup(lunch_table, shift)
+    rec_lunch_out, rec_lunch_in = rec[:, 1], rec[:, 2]
+    manual_lunch_ok = (
+        (rec_lunch_out != MISSING)
+        & (rec_lunch_in != MISSING)
+        & (rec_lunch_in - rec_lunch_out == lunch_minutes)
+        & (rec_lunch_out >= expected_in)
+        & (rec_lunch_in <= raw_out)
+    )
+    lunch_validated = lunch_required & manual_lunch_ok
+    lunch_break_failed = lunch_required & ~manual_lunch_ok
+
+    min_return = np.where(two_pairs, lookup(earliest_return, raw_lunch_out), MISSING)
+    allowed = (
+        np.stack([raw_in, expected_in]),
+        np.stack([raw_lunch_out, expected_lunch_out]),
+        np.stack(
+            [
+                np.where(two_pairs & (raw_lunch_in >= min_return), raw_lunch_in, MISSING),
+                expected_lunch_in,
+                np.where(two_pairs, np.maximum(raw_lunch_in, min_return), MISSING),
+            ]
+        ),
+        np.stack([raw_out]),
+    )
+
+    codes = np.zeros((len(rule_ids), len(COMPARED_FIELDS)), dtype=np.int8)
+    for field_idx, candidates in enumerate(allowed):
+        actual = rec[:, field_idx]
+        present = actual != MISSING
+        valid = candidates != MISSING
+        has_allowed = valid.any(axis=0)
+        matched = (valid & (np.abs(candidates - actual) <= tolerance)).any(axis=0)
+        code = np.select(
+            [~has_allowed & present, has_allowed & ~present, has_allowed & present & ~matched],
+            [_UNEXPECTED, _MISSING_ENTRY, _MISMATCH],
+            default=_OK,
+        )
+        if field_idx in (1, 2):
+            code = np.where(lunch_validated, _OK, code)
+        codes[:, field_idx] = code
+
+    lunch_taken = np.where(
+        two_pairs, expected_lunch_in - expected_lunch_out, np.where(lunch_required, lunch_minutes, 0)
+    )
+    paid_minutes = raw_out - expected_in - lunch_taken
+    return Sweep(codes, lunch_break_failed, allowed, paid_minutes)
+
+
+def _evaluate(
+    columns: List[Tuple[int, ...]], rule_list: List[CompiledRules]
+) -> Dict[int, Tuple[object, ...]]:
+    table = np.array(columns, dtype=np.int64)
+    row_ids, rule_ids = table[:, 0], table[:, 1]
+    result = sweep(rule_ids, table[:, 2:6], table[:, 6:10], rule_list)
+
+    failing = np.flatnonzero(result.lunch_break_failed | result.codes.any(axis=1))
+    candidate_table = np.concatenate(result.allowed, axis=0).T
+    return {
+        int(row_ids[idx]): (
+            int(rule_ids[idx]),
+            bool(result.lunch_break_failed[idx]),
+            result.codes[idx].tolist(),
+            candidate_table[idx].tolist(),
+        )
+        for idx in failing
+    }
+
+
+def _materialize(
+    name: str,
+    day: date,
+    recorded: RecordedTimes,
+    failed: Tuple[object, ...],
+    rule_list: List[CompiledRules],
+) -> List[Discrepancy]:
+    rule_id, lunch_break_failed, codes, candidates = failed
+    items: List[Discrepancy] = []
+    if lunch_break_failed:
+        items.append(
+            Discrepancy(
+                employee_name=name,
+                date=day,
+                field="lunch_break",
+                expected=rule_list[rule_id].rule_set.lunch_minutes,
+                actual=_recorded_lunch(recorded),
+                error_type="missing_or_invalid_lunch",
+            )
+        )
+    actuals = (recorded.clock_in, recorded.lunch_out, recorded.lunch_in, recorded.clock_out)
+    for field, code, window, actual in zip(COMPARED_FIELDS, codes, _CANDIDATE_SLICES, actuals):
+        if code == _OK:
+            continue
+        expected = _normalize_expected(
+            [value if value != MISSING else None for value in candidates[window]]
+        )
+        if code == _UNEXPECTED:
+            items.append(
+                Discrepancy(
+                    employee_name=name,
+                    date=day,
+                    field=field,
+                    expected=None,
+                    actual=actual,
+                    error_type="unexpected_entry",
+                )
+            )
+        elif code == _MISSING_ENTRY:
+            items.append(
+                Discrepancy(
+                    employee_name=name,
+                    date=day,
+                    field=field,
+                    expected=tuple(expected),
+                    actual=None,
+                    error_type="missing_entry",
+                )
+            )
+        else:
+            items.append(
+                Discrepancy(
+                    employee_name=name,
+                    date=day,
+                    field=field,
+                    expected=tuple(expected),
+                    actual=actual,
+                    error_type="mismatch",
+                )
+            )
+    return items
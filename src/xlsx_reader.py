@@ -5,8 +5,9 @@ import zipfile
 import xml.etree.ElementTree as ET
 from datetime import date
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import IO, Dict, List, Optional, Set, Tuple
 
+from .cancellation import CHECK_EVERY_ROWS, CancellationToken, check_cancelled
 from .models import EmployeeBlock, RecordedTimes
 from .utils import excel_fraction_to_minutes, excel_serial_to_date, normalize_name
 
@@ -39,13 +40,39 @@ WEEKDAY_HINTS = {
     "sat": 5,
 }
 DATE_HINT_RE = re.compile(r"(\d{1,2})[/-](\d{1,2})")
+# Every column parse_timesheet looks at (names, labels, days, start hints).
+TIMESHEET_COLUMNS = frozenset("ABCDEFGH")
+_ROW_TAG = f"{{{NS['a']}}}row"
+_CELL_TAG = f"{{{NS['a']}}}c"
+_SHEET_DATA_TAG = f"{{{NS['a']}}}sheetData"
 
 
 def read_timesheet(
     xlsx_path: str | Path,
     target_dates: Optional[Set[date]] = None,
     sheet_hint: Optional[str] = None,
+    cancel_token: Optional[CancellationToken] = None,
 ) -> List[EmployeeBlock]:
+    return parse_timesheet(
+        load_timesheet_cells(xlsx_path, sheet_hint, cancel_token=cancel_token),
+        target_dates,
+        cancel_token,
+    )
+
+
+def load_timesheet_cells(
+    xlsx_path: str | Path,
+    sheet_hint: Optional[str] = None,
+    streaming: bool = False,
+    cancel_token: Optional[CancellationToken] = None,
+) -> List[Dict[Tuple[int, str], object]]:
+    """Inflates and parses the worksheets matching ``sheet_hint`` into cell maps.
+
+    This is the I/O-heavy half of ``read_timesheet``; it does not need the punch
+    data, so it can run while the punch CSV is still being read. ``streaming``
+    parses each sheet incrementally and keeps only ``TIMESHEET_COLUMNS``, so
+    neither the sheet XML nor its tree is ever held whole.
+    """
     path = Path(xlsx_path)
     with zipfile.ZipFile(path) as workbook:
         shared_strings = _load_shared_strings(workbook)
@@ -54,14 +81,38 @@ def read_timesheet(
             sheet_paths = _filter_sheet_paths(sheet_paths, sheet_hint)
             if not sheet_paths:
                 raise ValueError(f"No worksheet matches hint {sheet_hint}.")
-        blocks: List[EmployeeBlock] = []
+        sheets: List[Dict[Tuple[int, str], object]] = []
         for _sheet_name, sheet_path in sheet_paths:
+            check_cancelled(cancel_token)
             if sheet_path not in workbook.namelist():
                 continue
+            if streaming:
+                with workbook.open(sheet_path) as source:
+                    sheets.append(_stream_cells(source, shared_strings, cancel_token))
+                continue
             sheet_xml = workbook.read(sheet_path)
             root = ET.fromstring(sheet_xml)
-            blocks.extend(_parse_sheet(root, shared_strings, target_dates))
+            sheets.append(_load_cells(root, shared_strings, cancel_token))
+    return sheets
+
 
+def read_sheet_names(xlsx_path: str | Path) -> List[str]:
+    with zipfile.ZipFile(Path(xlsx_path)) as workbook:
+        return [name for name, _path in _load_sheet_paths(workbook)]
+
+
+def sheet_matches_hint(sheet_names: List[str], sheet_hint: str) -> bool:
+    return bool(_filter_sheet_paths([(name, "") for name in sheet_names], sheet_hint))
+
+
+def parse_timesheet(
+    sheets: List[Dict[Tuple[int, str], object]],
+    target_dates: Optional[Set[date]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+) -> List[EmployeeBlock]:
+    blocks: List[EmployeeBlock] = []
+    for cells in sheets:
+        blocks.extend(_parse_sheet(cells, target_dates, cancel_token))
     return blocks
 
 
@@ -115,16 +166,16 @@ def _filter_sheet_paths(
 
 
 def _parse_sheet(
-    root: ET.Element,
-    shared_strings: List[str],
+    cells: Dict[Tuple[int, str], object],
     target_dates: Optional[Set[date]],
+    cancel_token: Optional[CancellationToken] = None,
 ) -> List[EmployeeBlock]:
-    cells = _load_cells(root, shared_strings)
     rows = sorted({row for (row, _col) in cells.keys()})
     weekday_rows = [r for r in rows if _cell_str(cells.get((r, "B"))) == "monday"]
     blocks: List[EmployeeBlock] = []
 
     for week_row in weekday_rows:
+        check_cancelled(cancel_token)
         name = _find_employee_name(cells, week_row)
         if not name:
             continue
@@ -169,10 +220,14 @@ def _parse_sheet(
 
 
 def _load_cells(
-    root: ET.Element, shared_strings: List[str]
+    root: ET.Element,
+    shared_strings: List[str],
+    cancel_token: Optional[CancellationToken] = None,
 ) -> Dict[tuple[int, str], object]:
     cells: Dict[tuple[int, str], object] = {}
-    for row in root.findall(".//a:row", NS):
+    for row_count, row in enumerate(root.findall(".//a:row", NS)):
+        if row_count % CHECK_EVERY_ROWS == 0:
+            check_cancelled(cancel_token)
         row_idx = int(row.get("r", "0"))
         for cell in row.findall("a:c", NS):
             ref = cell.get("r")
@@ -186,6 +241,38 @@ def _load_cells(
     return cells
 
 
+def _stream_cells(
+    source: IO[bytes],
+    shared_strings: List[str],
+    cancel_token: Optional[CancellationToken] = None,
+) -> Dict[tuple[int, str], object]:
+    cells: Dict[tuple[int, str], object] = {}
+    sheet_data: Optional[ET.Element] = None
+    row_idx = 0
+    row_count = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if elem.tag == _ROW_TAG:
+                row_idx = int(elem.get("r", "0"))
+                row_count += 1
+                if row_count % CHECK_EVERY_ROWS == 0:
+                    check_cancelled(cancel_token)
+            elif elem.tag == _SHEET_DATA_TAG:
+                sheet_data = elem
+            continue
+        if elem.tag == _CELL_TAG:
+            ref = elem.get("r")
+            col = "".join(ch for ch in ref if ch.isalpha()) if ref else ""
+            if col in TIMESHEET_COLUMNS:
+                val = _cell_value(elem, shared_strings)
+                if val is not None and val != "":
+                    cells[(row_idx, col)] = val
+        elif elem.tag == _ROW_TAG and sheet_data is not None:
+            # Drop finished rows so the tree never grows past one row.
+            sheet_data.clear()
+    return cells
+
+
 def _cell_value(cell: ET.Element, shared_strings: List[str]) -> Optional[object]:
     cell_type = cell.get("t")
     if cell_type == "inlineStr":
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import re
+import zipfile
+from datetime import date
+from itertools import chain, islice
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from .models import ERROR_TYPES, FIELDS
+
+# Excel's last row is 1,048,576; the header takes one, the rest spill onto
+# further sheets.
+MAX_ROWS_PER_SHEET = 1_048_575
+# Rows are serialized and handed to the deflater in batches of this size.
+WRITE_BATCH_ROWS = 2_048
+EXCEL_EPOCH_ORDINAL = date(1899, 12, 30).toordinal()
+
+HEADER = ("Employee", "Date", "Field", "Expected", "Actual", "Error Type")
+COLUMN_WIDTHS = (28, 12, 18, 24, 24, 26)
+# Field and error type labels come from a fixed vocabulary, so the shared
+# string table is known before any row is written. Free text (names, times)
+# is written as inline strings, keeping memory flat however many rows there are.
+SHARED_STRINGS = HEADER + FIELDS + ERROR_TYPES
+_SHARED_INDEX = {value: idx for idx, value in enumerate(SHARED_STRINGS)}
+# Characters XML 1.0 cannot carry are written the OOXML way, as ``_xHHHH_``;
+# an underscore that would read as such an escape is escaped itself.
+_OOXML_ESCAPED = re.compile(
+    "[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]|_(?=x[0-9A-Fa-f]{4}_)"
+)
+_COLUMNS = "ABCDEF"
+_DATE_STYLE = 1
+_HEADER_STYLE = 2
+
+_NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+_REL_NS = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+_PKG_REL_NS = 'xmlns="http://schemas.openxmlformats.org/package/2006/relationships"'
+_DOC_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+ReportRow = Tuple[str, Optional[date], str, Optional[str], Optional[str], str]
+
+
+def write_xlsx_report(path: str | Path, rows: Iterable[ReportRow], level: int = 6) -> int:
+    """Streams report rows into a write-only XLSX workbook; returns the row count.
+
+    Sheet XML is generated a batch of rows at a time straight into the deflated
+    zip member, so no DOM is built and memory does not grow with the row count.
+    Dates are written as real Excel dates.
+    """
+    count = 0
+    sheet_count = 0
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=level) as zout:
+        zout.writestr("xl/styles.xml", _styles_xml())
+        zout.writestr("xl/sharedStrings.xml", _shared_strings_xml())
+        iterator = iter(rows)
+        pending = next(iterator, None)
+        while True:
+            sheet_count += 1
+            sheet_rows = (
+                chain([pending], islice(iterator, MAX_ROWS_PER_SHEET - 1)) if pending else ()
+            )
+            name = f"xl/worksheets/sheet{sheet_count}.xml"
+            with zout.open(name, "w", force_zip64=True) as handle:
+                count += _write_sheet(handle, sheet_rows)
+            pending = next(iterator, None)
+            if pending is None:
+                break
+        zout.writestr("xl/workbook.xml", _workbook_xml(sheet_count))
+        zout.writestr("xl/_rels/workbook.xml.rels", _workbook_rels_xml(sheet_count))
+        zout.writestr("_rels/.rels", _root_rels_xml())
+        zout.writestr("[Content_Types].xml", _content_types_xml(sheet_count))
+    return count
+
+
+def _write_sheet(handle: BinaryIO, rows: Iterable[ReportRow]) -> int:
+    handle.write(_sheet_start().encode("utf-8"))
+    row_number = 1
+    batch: List[str] = []
+    for row in rows:
+        row_number += 1
+        batch.append(_row_xml(row_number, row))
+        if len(batch) >= WRITE_BATCH_ROWS:
+            handle.write("".join(batch).encode("utf-8"))
+            batch.clear()
+    handle.write("".join(batch).encode("utf-8"))
+    handle.write(b"</sheetData></worksheet>")
+    return row_number - 1
+
+
+def _row_xml(row_number: int, row: ReportRow) -> str:
+    employee, day, field, expected, actual, error_type = row
+    cells = [
+        _text_cell("A", row_number, employee),
+        _date_cell(row_number, day),
+        _text_cell("C", row_number, field),
+        _text_cell("D", row_number, expected),
+        _text_cell("E", row_number, actual),
+        _text_cell("F", row_number, error_type),
+    ]
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+
+def _text_cell(column: str, row_number: int, value: Optional[str]) -> str:
+    if not value:
+        return ""
+    shared = _SHARED_INDEX.get(value)
+    if shared is not None:
+        return f'<c r="{column}{row_number}" t="s"><v>{shared}</v></c>'
+    # Without xml:space Excel drops leading and trailing spaces.
+    return (
+        f'<c r="{column}{row_number}" t="inlineStr">'
+        f'<is><t xml:space="preserve">{_xml_text(value)}</t></is></c>'
+    )
+
+
+def _xml_text(value: str) -> str:
+    return escape(_OOXML_ESCAPED.sub(_ooxml_escape, value))
+
+
+def _ooxml_escape(match: re.Match) -> str:
+    return f"_x{ord(match.group()):04X}_"
+
+
+def _date_cell(row_number: int, day: Optional[date]) -> str:
+    if day is None:
+        return ""
+    serial = day.toordinal() - EXCEL_EPOCH_ORDINAL
+    return f'<c r="B{row_number}" s="{_DATE_STYLE}"><v>{serial}</v></c>'
+
+
+def _sheet_start() -> str:
+    cols = "".join(
+        f'<col min="{idx}" max="{idx}" width="{width}" customWidth="1"/>'
+        for idx, width in enumerate(COLUMN_WIDTHS, start=1)
+    )
+    header = "".join(
+        f'<c r="{column}1" t="s" s="{_HEADER_STYLE}"><v>{_SHARED_INDEX[label]}</v></c>'
+        for column, label in zip(_COLUMNS, HEADER)
+    )
+    return (
+        f"{_XML_DECL}<worksheet {_NS}>"
+        '<sheetViews><sheetView workbookViewId="0">'
+        '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+        "</sheetView></sheetViews>"
+        f"<cols>{cols}</cols><sheetData><row r=\"1\">{header}</row>"
+    )
+
+
+def _shared_strings_xml() -> str:
+    items = "".join(f"<si><t>{escape(value)}</t></si>" for value in SHARED_STRINGS)
+    count = len(SHARED_STRINGS)
+    return f'{_XML_DECL}<sst {_NS} count="{count}" uniqueCount="{count}">{items}</sst>'
+
+
+def _styles_xml() -> str:
+    # Style 1 is the built-in short date format, style 2 a bold header.
+    return (
+        f"{_XML_DECL}<styleSheet {_NS}>"
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        "</styleSheet>"
+    )
+
+
+def _workbook_xml(sheet_count: int) -> str:
+    sheets = "".join(
+        f'<sheet name="{_sheet_name(idx, sheet_count)}" sheetId="{idx}" r:id="rId{idx}"/>'
+        for idx in range(1, sheet_count + 1)
+    )
+    return f"{_XML_DECL}<workbook {_NS} {_REL_NS}><sheets>{sheets}</sheets></workbook>"
+
+
+def _sheet_name(idx: int, sheet_count: int) -> str:
+    return "Discrepancies" if sheet_count == 1 else f"Discrepancies {idx}"
+
+
+def _workbook_rels_xml(sheet_count: int) -> str:
+    rels: Dict[str, Tuple[str, str]] = {
+        f"rId{idx}": ("worksheet", f"worksheets/sheet{idx}.xml")
+        for idx in range(1, sheet_count + 1)
+    }
+    rels[f"rId{sheet_count + 1}"] = ("styles", "styles.xml")
+    rels[f"rId{sheet_count + 2}"] = ("sharedStrings", "sharedStrings.xml")
+    items = "".join(
+        f'<Relationship Id="{rel_id}" Type="{_DOC_REL}/{kind}" Target="{target}"/>'
+        for rel_id, (kind, target) in rels.items()
+    )
+    return f"{_XML_DECL}<Relationships {_PKG_REL_NS}>{items}</Relationships>"
+
+
+def _root_rels_xml() -> str:
+    return (
+        f"{_XML_DECL}<Relationships {_PKG_REL_NS}>"
+        f'<Relationship Id="rId1" Type="{_DOC_REL}/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    )
+
+
+def _content_types_xml(sheet_count: int) -> str:
+    base = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+    sheets = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{idx}.xml" ContentType="{base}.worksheet+xml"/>'
+        for idx in range(1, sheet_count + 1)
+    )
+    return (
+        f"{_XML_DECL}"
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f'<Override PartName="/xl/workbook.xml" ContentType="{base}.sheet.main+xml"/>'
+        f'<Override PartName="/xl/styles.xml" ContentType="{base}.styles+xml"/>'
+        f'<Override PartName="/xl/sharedStrings.xml" ContentType="{base}.sharedStrings+xml"/>'
+        f"{sheets}</Types>"
+    )
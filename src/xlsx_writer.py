@@ -1,37 +1,270 @@
 from __future__ import annotations
 
+import struct
 import zipfile
+import zlib
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from .cancellation import CHECK_EVERY_ROWS, CancellationToken, check_cancelled
 
 NS_URI = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
 NS = {"a": NS_URI}
 
+COMPRESSION_LEVELS = {"fastest": 1, "default": 6, "smallest": 9}
+# Modified members at least this large are deflated in blocks on a thread pool.
+PARALLEL_DEFLATE_THRESHOLD = 1 << 20
+DEFLATE_BLOCK_SIZE = 1 << 18
+DEFLATE_WINDOW = 1 << 15
+ZIP32_LIMIT = 0xFFFFFFFF
+# Members that status writing may change; others are always deflated again.
+_STATUS_MEMBERS = ("xl/sharedStrings.xml", "xl/worksheets/sheet1.xml")
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+
 
 def write_statuses(
     input_path: str | Path,
     output_path: str | Path,
     status_by_row: Dict[int, str],
+    compression: str | int = "default",
+    workers: Optional[int] = None,
+    cancel_token: Optional[CancellationToken] = None,
 ) -> None:
-    input_path = Path(input_path)
-    output_path = Path(output_path)
-    with zipfile.ZipFile(input_path) as zin:
-        shared_strings, shared_root = _load_shared_strings(zin)
-        status_indices = _ensure_status_strings(shared_strings, shared_root)
-
-        sheet_root = ET.fromstring(zin.read("xl/worksheets/sheet1.xml"))
-        _apply_statuses(sheet_root, status_by_row, status_indices)
-
-        with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zout:
-            for item in zin.infolist():
-                if item.filename == "xl/sharedStrings.xml":
-                    xml_bytes = _shared_strings_xml(shared_root)
-                    zout.writestr(item, xml_bytes)
-                elif item.filename == "xl/worksheets/sheet1.xml":
-                    zout.writestr(item, ET.tostring(sheet_root, encoding="utf-8", xml_declaration=True))
-                else:
-                    zout.writestr(item, zin.read(item.filename))
+    StatusWorkbook.load(input_path).save(
+        output_path,
+        status_by_row,
+        compression=compression,
+        workers=workers,
+        cancel_token=cancel_token,
+    )
+
+
+class StatusWorkbook:
+    """An input workbook parsed ahead of writing its status cells.
+
+    Parsing the sheet and shared strings does not depend on validation results,
+    so ``load`` can run while validation is still in progress; ``save`` then
+    applies the statuses and writes the copy. A loaded workbook is saved once.
+    """
+
+    def __init__(
+        self,
+        input_path: Path,
+        shared_strings: List[str],
+        shared_root: ET.Element,
+        sheet_root: ET.Element,
+    ) -> None:
+        self.input_path = input_path
+        self.shared_strings = shared_strings
+        self.shared_root = shared_root
+        self.sheet_root = sheet_root
+
+    @classmethod
+    def load(cls, input_path: str | Path) -> "StatusWorkbook":
+        input_path = Path(input_path)
+        with zipfile.ZipFile(input_path) as zin:
+            shared_strings, shared_root = _load_shared_strings(zin)
+            sheet_root = ET.fromstring(zin.read("xl/worksheets/sheet1.xml"))
+        return cls(input_path, shared_strings, shared_root, sheet_root)
+
+    def save(
+        self,
+        output_path: str | Path,
+        status_by_row: Dict[int, str],
+        compression: str | int = "default",
+        workers: Optional[int] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> None:
+        level = compression_level(compression)
+        status_indices, strings_added = _ensure_status_strings(self.shared_strings, self.shared_root)
+        cells_changed = _apply_statuses(self.sheet_root, status_by_row, status_indices, cancel_token)
+
+        # Unchanged members are copied raw through ``source``, a handle of our own.
+        with zipfile.ZipFile(self.input_path) as zin, self.input_path.open("rb") as source:
+            with Path(output_path).open("wb") as handle:
+                zout = _ZipStreamWriter(handle)
+                for item in zin.infolist():
+                    check_cancelled(cancel_token)
+                    if item.filename == "xl/sharedStrings.xml" and strings_added:
+                        xml_bytes = _shared_strings_xml(self.shared_root)
+                        zout.write(item, _deflate(xml_bytes, level, workers, cancel_token), xml_bytes)
+                    elif item.filename == "xl/worksheets/sheet1.xml" and cells_changed:
+                        xml_bytes = ET.tostring(self.sheet_root, encoding="utf-8", xml_declaration=True)
+                        zout.write(item, _deflate(xml_bytes, level, workers, cancel_token), xml_bytes)
+                    elif item.filename in _STATUS_MEMBERS:
+                        # Re-uploads of a validated workbook often carry every status
+                        # already; the untouched part is copied without re-encoding.
+                        zout.copy(item, _read_compressed(source, item))
+                    else:
+                        data = zin.read(item.filename)
+                        zout.write(item, _deflate_serial(data, level), data)
+                zout.close()
+
+
+def compression_level(compression: str | int) -> int:
+    if isinstance(compression, int):
+        if not 0 <= compression <= 9:
+            raise ValueError(f"Compression level must be 0-9, got {compression}.")
+        return compression
+    try:
+        return COMPRESSION_LEVELS[compression]
+    except KeyError as exc:
+        choices = ", ".join(COMPRESSION_LEVELS)
+        raise ValueError(f"Unknown compression {compression!r} (expected {choices}).") from exc
+
+
+def _deflate(
+    data: bytes,
+    level: int,
+    workers: Optional[int],
+    cancel_token: Optional[CancellationToken] = None,
+) -> bytes:
+    if len(data) < PARALLEL_DEFLATE_THRESHOLD or workers == 1:
+        return _deflate_serial(data, level)
+    starts = range(0, len(data), DEFLATE_BLOCK_SIZE)
+
+    def deflate_block(start: int) -> bytes:
+        check_cancelled(cancel_token)
+        return _deflate_block(data, start, level)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return b"".join(pool.map(deflate_block, starts))
+
+
+def _deflate_serial(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _deflate_block(data: bytes, start: int, level: int) -> bytes:
+    # Each block is primed with the preceding 32 KiB window and ends on a byte-aligned
+    # sync flush, so the concatenated blocks form one raw DEFLATE stream. Block edges
+    # depend only on the input, which keeps the output identical for any worker count.
+    end = min(start + DEFLATE_BLOCK_SIZE, len(data))
+    view = memoryview(data)
+    if start:
+        window = bytes(view[max(0, start - DEFLATE_WINDOW) : start])
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=window)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    body = compressor.compress(view[start:end])
+    mode = zlib.Z_FINISH if end == len(data) else zlib.Z_SYNC_FLUSH
+    return body + compressor.flush(mode)
+
+
+class _ZipStreamWriter:
+    """Writes pre-deflated members into a zip archive in a single forward pass."""
+
+    def __init__(self, handle: BinaryIO) -> None:
+        self._handle = handle
+        self._offset = 0
+        self._central: List[bytes] = []
+
+    def write(self, item: zipfile.ZipInfo, compressed: bytes, data: bytes) -> None:
+        self._write(item, compressed, zlib.crc32(data), len(data), zipfile.ZIP_DEFLATED)
+
+    def copy(self, item: zipfile.ZipInfo, compressed: bytes) -> None:
+        """Writes a member's original compressed bytes as they are."""
+        self._write(item, compressed, item.CRC, item.file_size, item.compress_type)
+
+    def _write(
+        self, item: zipfile.ZipInfo, compressed: bytes, crc: int, size: int, method: int
+    ) -> None:
+        if max(self._offset, len(compressed), size) > ZIP32_LIMIT:
+            raise ValueError("Validated workbook is too large for a ZIP32 archive.")
+        name = item.filename.encode("utf-8")
+        flags = 0x800 if not item.filename.isascii() else 0
+        dos_time, dos_date = _dos_timestamp(item.date_time)
+        header = _LOCAL_HEADER.pack(
+            b"PK\x03\x04",
+            20,
+            flags,
+            method,
+            dos_time,
+            dos_date,
+            crc,
+            len(compressed),
+            size,
+            len(name),
+            0,
+        )
+        self._central.append(
+            struct.pack(
+                "<4sHHHHHHIIIHHHHHII",
+                b"PK\x01\x02",
+                (item.create_system << 8) | 20,
+                20,
+                flags,
+                method,
+                dos_time,
+                dos_date,
+                crc,
+                len(compressed),
+                size,
+                len(name),
+                0,
+                0,
+                0,
+                item.internal_attr,
+                item.external_attr,
+                self._offset,
+            )
+            + name
+        )
+        self._handle.write(header)
+        self._handle.write(name)
+        self._handle.write(compressed)
+        self._offset += len(header) + len(name) + len(compressed)
+
+    def close(self) -> None:
+        directory = b"".join(self._central)
+        if len(self._central) > 0xFFFF or self._offset + len(directory) > ZIP32_LIMIT:
+            raise ValueError("Validated workbook is too large for a ZIP32 archive.")
+        self._handle.write(directory)
+        self._handle.write(
+            struct.pack(
+                "<4sHHHHIIH",
+                b"PK\x05\x06",
+                0,
+                0,
+                len(self._central),
+                len(self._central),
+                len(directory),
+                self._offset,
+                0,
+            )
+        )
+
+
+def _read_compressed(source: BinaryIO, item: zipfile.ZipInfo) -> bytes:
+    """A member's stored bytes, still compressed, read from the archive file.
+
+    The local header's name and extra field can differ in length from the central
+    directory's, and its sizes are zero when a data descriptor follows, so only its
+    lengths are used; the size comes from ``item``.
+    """
+    source.seek(item.header_offset)
+    header = source.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size:
+        raise zipfile.BadZipFile(f"Truncated local header for {item.filename}.")
+    fields = _LOCAL_HEADER.unpack(header)
+    if fields[0] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {item.filename}.")
+    source.seek(fields[9] + fields[10], 1)
+    compressed = source.read(item.compress_size)
+    if len(compressed) != item.compress_size:
+        raise zipfile.BadZipFile(f"Truncated data for {item.filename}.")
+    return compressed
+
+
+def _dos_timestamp(date_time: tuple) -> tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    year = max(year, 1980)
+    dos_date = ((year - 1980) << 9) | (month << 5) | day
+    dos_time = (hour << 11) | (minute << 5) | (second // 2)
+    return dos_time, dos_date
 
 
 def _load_shared_strings(
@@ -51,8 +284,12 @@ def _load_shared_strings(
     return [], root
 
 
-def _ensure_status_strings(values: List[str], root: ET.Element) -> Dict[str, int]:
+def _ensure_status_strings(
+    values: List[str], root: ET.Element
+) -> Tuple[Dict[str, int], bool]:
+    """Shared string index per status, and whether any had to be added."""
     indices = {}
+    added = False
     for text in ("ok", "needs attention"):
         if text in values:
             indices[text] = values.index(text)
@@ -62,14 +299,20 @@ def _ensure_status_strings(values: List[str], root: ET.Element) -> Dict[str, int
         t = ET.SubElement(si, _tag("t"))
         t.text = text
         indices[text] = len(values) - 1
-    root.set("count", str(len(values)))
-    root.set("uniqueCount", str(len(values)))
-    return indices
+        added = True
+    if added:
+        root.set("count", str(len(values)))
+        root.set("uniqueCount", str(len(values)))
+    return indices, added
 
 
 def _apply_statuses(
-    root: ET.Element, status_by_row: Dict[int, str], status_indices: Dict[str, int]
-) -> None:
+    root: ET.Element,
+    status_by_row: Dict[int, str],
+    status_indices: Dict[str, int],
+    cancel_token: Optional[CancellationToken] = None,
+) -> int:
+    """Sets each row's status cell; returns how many cells had to change."""
     sheet_data = root.find("a:sheetData", NS)
     if sheet_data is None:
         sheet_data = ET.SubElement(root, _tag("sheetData"))
@@ -77,7 +320,10 @@ def _apply_statuses(
     rows = sheet_data.findall("a:row", NS)
     row_map = {int(row.get("r", "0")): row for row in rows}
 
-    for row_idx, status in status_by_row.items():
+    changed = 0
+    for row_count, (row_idx, status) in enumerate(status_by_row.items()):
+        if row_count % CHECK_EVERY_ROWS == 0:
+            check_cancelled(cancel_token)
         row = row_map.get(row_idx)
         if row is None:
             row = ET.Element(_tag("row"), {"r": str(row_idx)})
@@ -85,18 +331,30 @@ def _apply_statuses(
             row_map[row_idx] = row
 
         cell_ref = f"H{row_idx}"
+        value = str(status_indices[status])
         cell = _find_cell(row, cell_ref)
+        if cell is not None and _holds_shared_string(cell, value):
+            continue
+        changed += 1
         if cell is None:
             cell = ET.Element(_tag("c"), {"r": cell_ref, "t": "s"})
             row.append(cell)
+            _sort_row_cells(row)
         cell.set("t", "s")
         for inline in cell.findall("a:is", NS):
             cell.remove(inline)
         v = cell.find("a:v", NS)
         if v is None:
             v = ET.SubElement(cell, _tag("v"))
-        v.text = str(status_indices[status])
-        _sort_row_cells(row)
+        v.text = value
+    return changed
+
+
+def _holds_shared_string(cell: ET.Element, value: str) -> bool:
+    if cell.get("t") != "s" or cell.find("a:is", NS) is not None:
+        return False
+    v = cell.find("a:v", NS)
+    return v is not None and v.text == value
 
 
 def _find_cell(row: ET.Element, cell_ref: str) -> ET.Element | None:
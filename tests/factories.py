@@ -0,0 +1,207 @@
+"""Builds small synthetic punch reports and timesheet workbooks for tests."""
+
+import csv
+import random
+import zipfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from src.models import DailyPunches, EmployeeBlock, PunchSegment, RecordedTimes
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+WEEKDAY_COLUMNS = ["B", "C", "D", "E", "F", "G"]
+WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
+TIME_LABELS = ["Clock In", "Clock Out (Lunch)", "Clock In (Work)", "Clock Out"]
+BLOCK_HEIGHT = 14
+
+Times = Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]
+CSV_HEADER = [
+    "EMP L NAME", "EMP F NAME", "EMP##", "DATE", "IN", "OUT", "TOTAL", "DEPT CODE",
+    "IN LOCATION", "IN PUNCH METHOD", "OUT LOCATION", "OUT PUNCH METHOD",
+]
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    "</Types>"
+)
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+
+
+def build_workbook(
+    path: str | Path,
+    employees: Sequence[Tuple[str, date, Dict[date, Times]]],
+    sheet_name: str = "1222",
+) -> List[int]:
+    """Writes one employee block per entry and returns the block status rows."""
+    strings: List[str] = []
+    rows: Dict[int, List[str]] = {}
+    status_rows: List[int] = []
+
+    def shared(text: str) -> int:
+        if text not in strings:
+            strings.append(text)
+        return strings.index(text)
+
+    def put(row: int, col: str, value: object) -> None:
+        ref = f"{col}{row}"
+        if isinstance(value, str):
+            cell = f'<c r="{ref}" t="s"><v>{shared(value)}</v></c>'
+        else:
+            cell = f'<c r="{ref}"><v>{value}</v></c>'
+        rows.setdefault(row, []).append(cell)
+
+    for index, (name, monday, times_by_date) in enumerate(employees):
+        top = index * BLOCK_HEIGHT + 1
+        put(top, "A", name)
+        for col, label in zip(WEEKDAY_COLUMNS, WEEKDAY_NAMES):
+            put(top + 1, col, label)
+        for offset, col in enumerate(WEEKDAY_COLUMNS):
+            day = date.fromordinal(monday.toordinal() + offset)
+            put(top + 2, col, (datetime(day.year, day.month, day.day) - EXCEL_EPOCH).days)
+        for label_offset, label in enumerate(TIME_LABELS):
+            row = top + 3 + label_offset
+            put(row, "A", label)
+            for offset, col in enumerate(WEEKDAY_COLUMNS):
+                day = date.fromordinal(monday.toordinal() + offset)
+                value = times_by_date.get(day, (None, None, None, None))[label_offset]
+                if value is not None:
+                    put(row, col, value / 1440)
+        status_row = top + 7
+        put(status_row, "F", "Total")
+        status_rows.append(status_row)
+
+    sheet_rows = "".join(
+        f'<row r="{row}">{"".join(cells)}</row>' for row, cells in sorted(rows.items())
+    )
+    sheet_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f"<sheetData>{sheet_rows}</sheetData></worksheet>"
+    )
+    shared_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'count="{len(strings)}" uniqueCount="{len(strings)}">'
+        + "".join(f"<si><t>{escape(text)}</t></si>" for text in strings)
+        + "</sst>"
+    )
+    workbook_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    )
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", CONTENT_TYPES)
+        zf.writestr("xl/workbook.xml", workbook_xml)
+        zf.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        zf.writestr("xl/worksheets/sheet1.xml", sheet_xml)
+        zf.writestr("xl/sharedStrings.xml", shared_xml)
+    return status_rows
+
+
+def build_punch_csv(
+    path: str | Path,
+    punches: Sequence[Tuple[str, str, date, int, int]],
+    report_range: Optional[Tuple[date, date]] = None,
+    dept_code: str = "001",
+) -> None:
+    """Writes (first, last, day, in_minutes, out_minutes) rows as a punch report."""
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle, quoting=csv.QUOTE_ALL)
+        writer.writerow(["Punch_Report - Test"])
+        if report_range:
+            start, end = report_range
+            writer.writerow([f"{start:%m/%d/%Y}-{end:%m/%d/%Y}"])
+        writer.writerow(CSV_HEADER)
+        for first, last, day, in_minutes, out_minutes in punches:
+            writer.writerow(
+                [last, first, "", f"{day:%m/%d/%Y}", _clock(in_minutes), _clock(out_minutes),
+                 "", dept_code, "", "Time Clock", "", "Time Clock"]
+            )
+
+
+def _clock(minutes: int) -> str:
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def random_week(seed: int, employees: int = 40):
+    """Random parsed blocks and punches covering the validator's edge cases."""
+    rng = random.Random(seed)
+    monday = date(2025, 12, 22)
+    punches = {}
+    blocks = []
+    for idx in range(employees):
+        name = f"Worker{idx} Example"
+        key = name.lower()
+        times_by_date = {}
+        for offset in range(6):
+            day = monday + timedelta(days=offset)
+            start = rng.randrange(5 * 60, 10 * 60)
+            pairs = rng.choice([0, 1, 1, 2, 2, 2, 3])
+            segments = []
+            cursor = start
+            for _ in range(pairs):
+                length = rng.randrange(60, 6 * 60)
+                segments.append(PunchSegment(in_minutes=cursor, out_minutes=cursor + length))
+                cursor += length + rng.randrange(10, 45)
+            if segments:
+                punches[(key, day)] = DailyPunches(
+                    employee_name=name,
+                    employee_key=key,
+                    date=day,
+                    segments=segments,
+                    dept_code=rng.choice(["001", "002", None]),
+                )
+            recorded = [None, None, None, None]
+            if segments:
+                recorded[0] = segments[0].in_minutes + rng.choice([0, 0, 1, 5, 20])
+                recorded[3] = segments[-1].out_minutes + rng.choice([0, 0, -1, 3])
+                if len(segments) >= 2:
+                    recorded[1] = segments[0].out_minutes if rng.random() < 0.9 else None
+                    recorded[2] = segments[1].in_minutes + rng.choice([0, 10, 30])
+                elif rng.random() < 0.5:
+                    recorded[1] = 12 * 60
+                    recorded[2] = 12 * 60 + rng.choice([30, 30, 20])
+            elif rng.random() < 0.3:
+                recorded[0] = 9 * 60
+            times_by_date[day] = RecordedTimes(*[
+                value if value is None else max(1, min(value, 1439)) for value in recorded
+            ])
+        blocks.append(
+            EmployeeBlock(
+                name=name,
+                key=key,
+                dates_by_col={},
+                times_by_date=times_by_date,
+                status_row=10 * idx + 8,
+            )
+        )
+    orphan_day = monday + timedelta(days=2)
+    punches[("orphan person", orphan_day)] = DailyPunches(
+        employee_name="Orphan Person",
+        employee_key="orphan person",
+        date=orphan_day,
+        segments=[PunchSegment(in_minutes=8 * 60, out_minutes=12 * 60)],
+    )
+    return blocks, punches
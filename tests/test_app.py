@@ -0,0 +1,207 @@
+import http.client
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import app
+
+
+class _QuietHandler(app.UploadHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class _LiveServerTestCase(unittest.TestCase):
+    """Runs a ValidatorServer on an ephemeral port over a temporary outputs folder."""
+
+    max_validations = 2
+
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.outputs = Path(tmpdir.name)
+        patcher = mock.patch.object(app, "OUTPUTS_DIR", self.outputs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.server = app.ValidatorServer(
+            ("127.0.0.1", 0), _QuietHandler, max_validations=self.max_validations
+        )
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def connect(self) -> http.client.HTTPConnection:
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        self.addCleanup(connection.close)
+        return connection
+
+    def request(
+        self, connection: http.client.HTTPConnection, path: str, method: str = "GET", **headers: str
+    ) -> tuple:
+        connection.request(method, path, headers=headers)
+        response = connection.getresponse()
+        return response, response.read()
+
+
+class ServerTests(_LiveServerTestCase):
+    def setUp(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+        def run_job(job, progress, cancel_token) -> dict:
+            progress("validate")
+            self.started.set()
+            self.release.wait(5)
+            raise RuntimeError("stopped by the test")
+
+        patcher = mock.patch.object(app, "_run_job", run_job)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.release.set)
+        super().setUp()
+
+    def test_pages_are_served_while_a_validation_runs(self) -> None:
+        body = (
+            b"--B\r\nContent-Disposition: form-data; name=\"csv\"; filename=\"p.csv\"\r\n\r\nx\r\n"
+            b"--B\r\nContent-Disposition: form-data; name=\"xlsx\"; filename=\"t.xlsx\"\r\n\r\ny\r\n"
+            b"--B--\r\n"
+        )
+        upload = self.connect()
+        upload.request(
+            "POST",
+            "/upload",
+            body,
+            {"Content-Type": "multipart/form-data; boundary=B", "Accept": "application/json"},
+        )
+        response = upload.getresponse()
+        job_id = json.loads(response.read())["job_id"]
+        self.assertEqual(response.status, 202)
+        self.assertTrue(self.started.wait(5))
+
+        connection = self.connect()
+        response, page = self.request(connection, "/")
+        self.assertEqual(response.status, 200)
+        self.assertIn(b"Payroll Timesheet Validator", page)
+        # The validation is still holding its worker.
+        job = self.server.jobs.get(job_id)
+        self.assertEqual((job.state, job.stage), ("running", "validate"))
+
+    def test_keep_alive_reuses_the_connection(self) -> None:
+        connection = self.connect()
+        response, _page = self.request(connection, "/")
+        self.assertFalse(response.will_close)
+        sock = connection.sock
+        response, _page = self.request(connection, "/jobs/missing")
+        self.assertEqual(response.status, 404)
+        self.assertIs(connection.sock, sock)
+
+    def test_connection_is_closed_after_an_unread_body(self) -> None:
+        connection = self.connect()
+        connection.request("POST", "/elsewhere", b"x" * 1000, {"Content-Type": "text/plain"})
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 404)
+        self.assertEqual(response.getheader("Connection"), "close")
+        self.assertTrue(response.will_close)
+        self.assertIsNone(connection.sock)
+
+    def test_rejects_fewer_than_one_validation_slot(self) -> None:
+        with self.assertRaises(ValueError):
+            app.ValidatorServer(("127.0.0.1", 0), _QuietHandler, max_validations=0)
+
+
+class ParseRangeTests(unittest.TestCase):
+    def test_single_ranges(self) -> None:
+        self.assertEqual(app._parse_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(app._parse_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(app._parse_range("bytes=90-500", 100), (90, 99))
+        self.assertEqual(app._parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(app._parse_range("bytes=-500", 100), (0, 99))
+
+    def test_ranges_outside_the_file_are_not_satisfiable(self) -> None:
+        for header, size in (("bytes=100-", 100), ("bytes=150-200", 100), ("bytes=-0", 100)):
+            with self.subTest(header=header), self.assertRaises(ValueError):
+                app._parse_range(header, size)
+        for header in ("bytes=0-", "bytes=-5"):
+            with self.subTest(header=header, size=0), self.assertRaises(ValueError):
+                app._parse_range(header, 0)
+
+    def test_unsupported_ranges_are_ignored(self) -> None:
+        for header in ("bytes=0-1,5-6", "items=0-5", "bytes=abc", "bytes=5-1", "bytes=-", "bytes=1"):
+            with self.subTest(header=header):
+                self.assertIsNone(app._parse_range(header, 100))
+
+
+class DownloadTests(_LiveServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = os.urandom(200_000)
+        (self.outputs / "run-x").mkdir()
+        (self.outputs / "run-x" / "report.csv").write_bytes(self.data)
+        self.path = "/outputs/run-x/report.csv"
+
+    def test_full_and_partial_downloads(self) -> None:
+        connection = self.connect()
+        response, body = self.request(connection, self.path)
+        self.assertEqual((response.status, body), (200, self.data))
+        self.assertEqual(response.getheader("Content-Length"), str(len(self.data)))
+        self.assertEqual(response.getheader("Accept-Ranges"), "bytes")
+        self.assertTrue(response.getheader("ETag").startswith('"'))
+
+        response, body = self.request(connection, self.path, Range="bytes=100-199")
+        self.assertEqual((response.status, body), (206, self.data[100:200]))
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 100-199/{len(self.data)}")
+
+        response, body = self.request(connection, self.path, Range="bytes=-10")
+        self.assertEqual((response.status, body), (206, self.data[-10:]))
+
+        response, body = self.request(connection, self.path, Range=f"bytes={len(self.data)}-")
+        self.assertEqual((response.status, body), (416, b""))
+        self.assertEqual(response.getheader("Content-Range"), f"bytes */{len(self.data)}")
+
+        response, body = self.request(connection, self.path, method="HEAD")
+        self.assertEqual((response.status, body), (200, b""))
+        self.assertEqual(response.getheader("Content-Length"), str(len(self.data)))
+
+    def test_conditional_requests(self) -> None:
+        connection = self.connect()
+        response, _body = self.request(connection, self.path)
+        etag, last_modified = response.getheader("ETag"), response.getheader("Last-Modified")
+
+        response, body = self.request(connection, self.path, **{"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, b""))
+        self.assertEqual(response.getheader("ETag"), etag)
+        response, body = self.request(connection, self.path, **{"If-Modified-Since": last_modified})
+        self.assertEqual((response.status, body), (304, b""))
+        # If-None-Match wins over the date.
+        response, body = self.request(
+            connection, self.path, **{"If-None-Match": '"other"', "If-Modified-Since": last_modified}
+        )
+        self.assertEqual((response.status, body), (200, self.data))
+
+        response, body = self.request(connection, self.path, Range="bytes=0-9", **{"If-Range": etag})
+        self.assertEqual((response.status, body), (206, self.data[:10]))
+        # A stale If-Range gets the whole, current file.
+        response, body = self.request(
+            connection, self.path, Range="bytes=0-9", **{"If-Range": '"stale"'}
+        )
+        self.assertEqual((response.status, body), (200, self.data))
+
+    def test_paths_outside_outputs_are_refused(self) -> None:
+        connection = self.connect()
+        response, _body = self.request(connection, "/outputs/../app.py")
+        self.assertEqual(response.status, 400)
+        response, _body = self.request(connection, "/outputs/%2e%2e/app.py")
+        self.assertEqual(response.status, 400)
+        response, _body = self.request(connection, "/outputs/run-x")
+        self.assertEqual(response.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
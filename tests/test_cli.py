@@ -0,0 +1,40 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import date
+from pathlib import Path
+
+import cli
+from factories import build_punch_csv, build_workbook
+
+MONDAY = date(2025, 12, 22)
+
+
+class CliTests(unittest.TestCase):
+    def test_timeout_exits_with_one_line_and_no_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path = tmpdir / "Punch_Report_2025-12-21_2025-12-27.csv"
+            xlsx_path = tmpdir / "timesheet.xlsx"
+            build_punch_csv(csv_path, [("Alex", "Worker", MONDAY, 7 * 60, 15 * 60)])
+            build_workbook(xlsx_path, [("Alex Worker", MONDAY, {MONDAY: (7 * 60, None, None, 15 * 60)})])
+            out_dir = tmpdir / "out"
+
+            stderr = io.StringIO()
+            with redirect_stderr(stderr), redirect_stdout(io.StringIO()), self.assertRaises(
+                SystemExit
+            ) as raised:
+                cli.main(
+                    ["--csv", str(csv_path), "--xlsx", str(xlsx_path), "--out-dir", str(out_dir),
+                     "--timeout", "0"]
+                )
+            self.assertEqual(raised.exception.code, cli.EXIT_TIMED_OUT)
+            self.assertEqual(
+                stderr.getvalue(), "Validation timed out after 0 s; partial outputs removed.\n"
+            )
+            self.assertEqual(list(out_dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
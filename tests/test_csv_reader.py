@@ -4,6 +4,7 @@ from datetime import date
 from pathlib import Path
 
 from src.csv_reader import read_punches, read_report_range
+from src.memory_budget import MemoryBudget, SpilledPunches
 from src.utils import normalize_name, parse_csv_date
 
 
@@ -54,6 +55,20 @@ class CsvReaderTests(unittest.TestCase):
         self.assertLessEqual(start, end)
         self.assertLessEqual((end - start).days, 7)
 
+    def test_spilled_punches_match_in_memory_groups(self) -> None:
+        path = _csv_path()
+        grouped = read_punches(path)
+        # A one-byte budget is always near, so every row goes to disk.
+        spilled = read_punches(path, MemoryBudget(1))
+        try:
+            self.assertIsInstance(spilled, SpilledPunches)
+            self.assertEqual(len(spilled), len(grouped))
+            self.assertEqual(list(spilled), list(grouped))
+            self.assertEqual([spilled[key] for key in spilled], list(grouped.values()))
+            self.assertNotIn(("nobody", date(2000, 1, 1)), spilled)
+        finally:
+            spilled.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,116 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src.cancellation import CancellationToken, check_cancelled
+from src.jobs import JOB_FILENAME, Job, JobQueue
+
+
+def _wait(queue: JobQueue, job_id: str, states=("done", "failed")) -> Job:
+    for _ in range(500):
+        job = queue.get(job_id)
+        if job.state in states:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job {job_id} stuck in {job.state}")
+
+
+class JobQueueTests(unittest.TestCase):
+    def test_job_state_is_saved_in_its_run_dir(self) -> None:
+        release = threading.Event()
+        stages = []
+
+        def run(job: Job, progress, cancel_token) -> dict:
+            progress("read_punches")
+            stages.append(json.loads((job.run_dir / JOB_FILENAME).read_text())["stage"])
+            release.wait(5)
+            return {"ok": 3}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "run-a").mkdir()
+            queue = JobQueue(tmpdir, run, workers=1)
+            try:
+                self.assertEqual(queue.submit("a", "p.csv", "t.xlsx").state, "queued")
+                running = _wait(queue, "a", states=("running",))
+                release.set()
+                done = _wait(queue, "a")
+            finally:
+                queue.shutdown()
+            self.assertEqual(stages, ["read_punches"])
+            self.assertEqual(running.csv_name, "p.csv")
+            self.assertEqual((done.state, done.stage, done.result), ("done", None, {"ok": 3}))
+            # A fresh queue (a restarted server) reads it back from disk.
+            self.assertEqual(JobQueue(tmpdir, run, workers=1).get("a").result, {"ok": 3})
+            self.assertIsNone(queue.get("../a"))
+
+    def test_failed_job_keeps_the_error(self) -> None:
+        def run(job: Job, progress, cancel_token) -> dict:
+            raise ValueError("Timesheet has no 1222 tab.")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "run-a").mkdir()
+            queue = JobQueue(tmpdir, run, workers=1)
+            try:
+                queue.submit("a", "p.csv", "t.xlsx")
+                job = _wait(queue, "a")
+            finally:
+                queue.shutdown()
+            self.assertEqual((job.state, job.error), ("failed", "Timesheet has no 1222 tab."))
+
+    def test_recover_requeues_unfinished_jobs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            for job_id, state in (("a", "running"), ("b", "done"), ("c", "queued")):
+                (root / f"run-{job_id}").mkdir()
+                Job(job_id, root / f"run-{job_id}", "p.csv", "t.xlsx", state=state).save()
+            ran = []
+            queue = JobQueue(
+                root, lambda job, progress, cancel_token: ran.append(job.job_id) or {}, workers=1
+            )
+            try:
+                recovered = queue.recover()
+                self.assertEqual([job.job_id for job in recovered], ["a", "c"])
+                self.assertEqual(_wait(queue, "c").state, "done")
+            finally:
+                queue.shutdown()
+            self.assertEqual(sorted(ran), ["a", "c"])
+
+    def test_shutdown_cancels_running_jobs_and_leaves_them_for_recover(self) -> None:
+        started = threading.Event()
+
+        def run(job: Job, progress, cancel_token: CancellationToken) -> dict:
+            started.set()
+            # A validation that would run for a long time, checking its token.
+            while True:
+                check_cancelled(cancel_token)
+                threading.Event().wait(0.01)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for job_id in ("a", "b"):
+                (Path(tmpdir) / f"run-{job_id}").mkdir()
+            queue = JobQueue(tmpdir, run, workers=1)
+            queue.submit("a", "p.csv", "t.xlsx")
+            queue.submit("b", "p.csv", "t.xlsx")
+            self.assertTrue(started.wait(5))
+            queue.shutdown()
+            stopped = _wait(queue, "a", states=("queued",))
+            self.assertEqual((stopped.stage, stopped.error), (None, None))
+            self.assertEqual(queue.get("b").state, "queued")
+
+            # A restarted server picks both up again.
+            ran = []
+            queue = JobQueue(
+                tmpdir, lambda job, progress, cancel_token: ran.append(job.job_id) or {}, workers=1
+            )
+            try:
+                self.assertEqual([job.job_id for job in queue.recover()], ["a", "b"])
+                self.assertEqual(_wait(queue, "b").state, "done")
+            finally:
+                queue.shutdown()
+            self.assertEqual(sorted(ran), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import time
+import unittest
+
+from src.metrics import RunMetrics, stage
+
+
+class MetricsTests(unittest.TestCase):
+    def test_streamed_stage_time_is_moved_out_of_its_consumer(self) -> None:
+        def produce():
+            for item in range(3):
+                time.sleep(0.01)
+                yield item
+
+        metrics = RunMetrics()
+        with metrics.run():
+            with metrics.stage("write") as record:
+                items = list(metrics.timed("produce", produce()))
+                record.counts["rows"] = len(items)
+            with metrics.stage("write"):
+                bytearray(1 << 20)
+
+        self.assertEqual(list(metrics.stages), ["write", "produce"])
+        self.assertGreaterEqual(metrics.stages["produce"].wall_seconds, 0.03)
+        self.assertLess(metrics.stages["write"].wall_seconds, 0.03)
+        self.assertGreaterEqual(metrics.stages["write"].peak_bytes, 1 << 20)
+        self.assertGreaterEqual(metrics.peak_bytes, 1 << 20)
+        self.assertEqual(metrics.to_dict()["stages"][0]["counts"], {"rows": 3})
+
+    def test_stage_without_metrics_is_a_no_op(self) -> None:
+        with stage(None, "write") as record:
+            record.counts["rows"] = 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src import multipart
+from src.multipart import UploadTooLarge, parse_multipart
+
+CONTENT_TYPE = "multipart/form-data; boundary=----form7MA4YWxk"
+DELIMITER = b"------form7MA4YWxk"
+
+
+def _body(*parts: tuple) -> bytes:
+    chunks = [b"preamble"]
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        chunks.append(
+            b"\r\n" + DELIMITER + b"\r\n"
+            + f"Content-Disposition: {disposition}\r\n".encode()
+            + b"Content-Type: application/octet-stream\r\n\r\n"
+            + data
+        )
+    chunks.append(b"\r\n" + DELIMITER + b"--\r\n")
+    return b"".join(chunks)
+
+
+class MultipartTests(unittest.TestCase):
+    def _parse(self, body: bytes, directory: Path, **kwargs) -> dict:
+        stream = io.BytesIO(body + b"NEXT REQUEST")
+        files = parse_multipart(
+            stream,
+            CONTENT_TYPE,
+            len(body),
+            lambda name, filename: directory / filename if name in ("csv", "xlsx") else None,
+            **kwargs,
+        )
+        # The whole body is consumed and nothing past it.
+        self.assertEqual(stream.read(), b"NEXT REQUEST")
+        return files
+
+    def test_streams_files_split_across_chunks(self) -> None:
+        # Data that holds boundary-like bytes and ends right at chunk edges.
+        csv_data = b"a,b\r\n------form7MA4YWx\r\n" * 500
+        xlsx_data = bytes(range(256)) * 300 + b"\r\n--"
+        body = _body(("note", None, b"hello"), ("csv", "p.csv", csv_data), ("xlsx", "t.xlsx", xlsx_data))
+        for chunk in (1, 7, 37, 4096):
+            with self.subTest(chunk=chunk), tempfile.TemporaryDirectory() as tmpdir, mock.patch.object(
+                multipart, "READ_CHUNK", chunk
+            ):
+                files = self._parse(body, Path(tmpdir))
+                self.assertEqual(sorted(files), ["csv", "xlsx"])
+                self.assertEqual(files["csv"][0], "p.csv")
+                self.assertEqual(files["csv"][1].read_bytes(), csv_data)
+                self.assertEqual(files["xlsx"][1].read_bytes(), xlsx_data)
+
+    def test_skips_empty_and_unwanted_parts(self) -> None:
+        body = _body(("csv", "p.csv", b""), ("other", "x.bin", b"data"))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertEqual(self._parse(body, Path(tmpdir)), {})
+            self.assertEqual(list(Path(tmpdir).iterdir()), [])
+
+    def test_refuses_oversized_body_before_reading(self) -> None:
+        body = _body(("csv", "p.csv", b"x" * 1000))
+        stream = io.BytesIO(body)
+        with tempfile.TemporaryDirectory() as tmpdir, self.assertRaises(UploadTooLarge):
+            parse_multipart(stream, CONTENT_TYPE, len(body), lambda *_: Path(tmpdir) / "f", max_bytes=500)
+        self.assertEqual(stream.tell(), 0)
+
+    def test_truncated_body_is_rejected(self) -> None:
+        body = _body(("csv", "p.csv", b"x" * 1000))[:-40]
+        with tempfile.TemporaryDirectory() as tmpdir, self.assertRaises(ValueError):
+            parse_multipart(
+                io.BytesIO(body), CONTENT_TYPE, len(body) + 40, lambda *_: Path(tmpdir) / "f"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from src.models import EmployeeBlock
+from src.name_resolver import NameResolver
+
+
+def _block(name: str) -> EmployeeBlock:
+    return EmployeeBlock(
+        name=name,
+        key=" ".join(name.lower().replace(",", "").split()),
+        dates_by_col={},
+        times_by_date={},
+        status_row=None,
+    )
+
+
+class NameResolverTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.resolver = NameResolver(
+            [
+                "maria leiva",
+                "maria gonzalez",
+                "jose gonzalez",
+                "jose gonsales",
+                "eden zuniga",
+                "francisco quiroga reyes",
+            ]
+        )
+
+    def test_exact_and_partial_variants(self) -> None:
+        self.assertEqual(self.resolver.resolve(_block("Eden Zuniga")), "eden zuniga")
+        self.assertEqual(
+            self.resolver.resolve(_block("Francisco Quiroga")), "francisco quiroga reyes"
+        )
+        self.assertEqual(self.resolver.resolve(_block("Eden")), "eden zuniga")
+
+    def test_one_edit_last_name(self) -> None:
+        self.assertEqual(self.resolver.resolve(_block("Maria Leyva")), "maria leiva")
+        self.assertEqual(self.resolver.resolve(_block("Maria Gonsalez")), "maria gonzalez")
+
+    def test_ambiguous_names_are_not_resolved(self) -> None:
+        self.assertIsNone(self.resolver.resolve(_block("Maria")))
+        self.assertIsNone(self.resolver.resolve(_block("Jose Gonzales")))
+        self.assertIsNone(self.resolver.resolve(_block("Nobody Here")))
+
+    def test_resolution_is_memoized(self) -> None:
+        block = _block("Maria Leyva")
+        self.resolver.resolve(block)
+        self.resolver._deletion_indexes.clear()
+        self.assertEqual(self.resolver.resolve(block), "maria leiva")
+        self.assertEqual(self.resolver._deletion_indexes, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
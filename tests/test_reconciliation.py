@@ -0,0 +1,47 @@
+import unittest
+from datetime import date, timedelta
+
+from src.models import DailyPunches, PunchSegment
+from src.reconciliation import ReconciliationIndex
+
+MONDAY = date(2025, 12, 22)
+
+
+def _punches(entries):
+    return {
+        (key, day): DailyPunches(key.title(), key, day, [PunchSegment(8 * 60, 12 * 60)])
+        for key, day in entries
+    }
+
+
+class ReconciliationIndexTests(unittest.TestCase):
+    def test_missing_days_come_from_bitmap_difference(self) -> None:
+        later = MONDAY + timedelta(days=20)
+        punches = _punches(
+            [
+                ("dana smith", later),
+                ("dana smith", MONDAY),
+                ("alex worker", MONDAY + timedelta(days=1)),
+                ("alex worker", MONDAY + timedelta(days=3)),
+            ]
+        )
+        index = ReconciliationIndex(punches)
+        index.mark_timesheet_day("alex worker", MONDAY + timedelta(days=1))
+        index.mark_timesheet_day("dana smith", MONDAY - timedelta(days=7))
+        self.assertEqual(
+            list(index.missing_timesheet_days()),
+            [
+                ("dana smith", MONDAY),
+                ("dana smith", later),
+                ("alex worker", MONDAY + timedelta(days=3)),
+            ],
+        )
+
+    def test_empty_punches(self) -> None:
+        index = ReconciliationIndex({})
+        index.mark_timesheet_day("dana smith", MONDAY)
+        self.assertEqual(list(index.missing_timesheet_days()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import csv
+import gzip
+import json
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+from src import report, xlsx_report
+from src.models import Discrepancy
+from src.report import ReportSummary, report_filename, resolve_report_format, write_report
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import openpyxl
+    from openpyxl.utils.escape import unescape as ooxml_unescape
+except ImportError:
+    openpyxl = None
+
+DISCREPANCIES = [
+    Discrepancy("Alex Worker", date(2025, 12, 22), "clock_in", (420, 450), 480, "mismatch"),
+    Discrepancy("Dana Smith", date(2025, 12, 23), "clock_out", None, 900, "unexpected_entry"),
+    Discrepancy("Sam Lee", None, "day", "timesheet entry", "missing", "missing_timesheet_row"),
+]
+EXPECTED_ROWS = [
+    ["Alex Worker", "2025-12-22", "clock_in", "07:00 | 07:30", "08:00", "mismatch"],
+    ["Dana Smith", "2025-12-23", "clock_out", None, "15:00", "unexpected_entry"],
+    ["Sam Lee", None, "day", "timesheet entry", "missing", "missing_timesheet_row"],
+]
+
+
+class ReportTests(unittest.TestCase):
+    def test_csv_report(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / report_filename("csv")
+            self.assertEqual(write_report(path, iter(DISCREPANCIES)), 3)
+            with path.open(newline="") as handle:
+                rows = list(csv.reader(handle))
+        self.assertEqual(rows[0], list(report.REPORT_COLUMNS))
+        self.assertEqual(rows[1:], [[value or "" for value in row] for row in EXPECTED_ROWS])
+
+    def test_jsonl_gz_report(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / report_filename("jsonl.gz")
+            self.assertEqual(write_report(path, iter(DISCREPANCIES), "jsonl.gz"), 3)
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                records = [json.loads(line) for line in handle]
+        self.assertEqual(
+            [[record[column] for column in report.REPORT_COLUMNS] for record in records],
+            EXPECTED_ROWS,
+        )
+
+    @unittest.skipUnless(pyarrow is not None, "pyarrow is not installed")
+    def test_columnar_reports_are_written_in_row_groups(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.object(report, "ROW_GROUP_SIZE", 2):
+            arrow_path = Path(tmpdir) / report_filename("arrow")
+            parquet_path = Path(tmpdir) / report_filename("parquet")
+            self.assertEqual(write_report(arrow_path, iter(DISCREPANCIES), "arrow"), 3)
+            self.assertEqual(write_report(parquet_path, iter(DISCREPANCIES), "parquet"), 3)
+            with pyarrow.OSFile(str(arrow_path)) as source:
+                reader = pyarrow.ipc.open_file(source)
+                self.assertEqual(reader.num_record_batches, 2)
+                arrow_table = reader.read_all()
+            parquet_file = pyarrow.parquet.ParquetFile(parquet_path)
+            self.assertEqual(parquet_file.num_row_groups, 2)
+            parquet_table = parquet_file.read()
+        for table in (arrow_table, parquet_table):
+            rows = [
+                [value.isoformat() if isinstance(value, date) else value for value in row.values()]
+                for row in table.to_pylist()
+            ]
+            self.assertEqual(rows, EXPECTED_ROWS)
+
+    def test_summary_is_counted_while_writing(self) -> None:
+        late_out = Discrepancy(
+            "Alex Worker", date(2025, 12, 22), "clock_out", (930,), 945, "mismatch"
+        )
+        summary = ReportSummary()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            write_report(tmpdir / "report.csv", iter(DISCREPANCIES + [late_out]), summary=summary)
+            summary.write(tmpdir / "summary.json", tmpdir / "summary.csv")
+            payload = json.loads((tmpdir / "summary.json").read_text())
+            with (tmpdir / "summary.csv").open(newline="") as handle:
+                csv_rows = list(csv.reader(handle))
+        self.assertEqual(payload["discrepancies"], 4)
+        self.assertEqual(payload["by_employee"], {"Alex Worker": 2, "Dana Smith": 1, "Sam Lee": 1})
+        self.assertEqual(payload["by_error_type"]["mismatch"], 2)
+        self.assertEqual(payload["by_field"]["clock_out"], 2)
+        self.assertEqual(list(payload["by_date"]), ["", "2025-12-22", "2025-12-23"])
+        # Clocking in at 08:00 against 07:30 loses 30 paid minutes; clocking out
+        # at 15:45 against 15:30 adds 15.
+        self.assertEqual(payload["under_recorded_minutes"], 30)
+        self.assertEqual(payload["over_recorded_minutes"], 15)
+        self.assertIn(["error_type", "mismatch", "2"], csv_rows)
+
+    def test_spliced_csv_report_rewrites_only_changed_blocks(self) -> None:
+        alex, dana, sam = ([item] for item in DISCREPANCIES)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "report.csv"
+            count, layout = report.write_csv_report_spliced(
+                path, [("a", alex), ("b", []), ("c", dana), (None, sam)]
+            )
+            self.assertEqual(count, 3)
+            head = path.read_bytes()[: layout["spans"][1][1]]
+
+            changed = Discrepancy("Dana Smith", date(2025, 12, 23), "clock_in", None, 450, "unexpected_entry")
+            summary = ReportSummary()
+            with mock.patch.object(report, "_csv_bytes", wraps=report._csv_bytes) as encode:
+                count, layout = report.write_csv_report_spliced(
+                    path, [("a", alex), ("c2", [changed]), ("b", []), (None, sam)], layout, summary
+                )
+            # The header, Alex's row and Sam's row are reused or left in place.
+            self.assertEqual(encode.call_count, 3)
+            self.assertEqual((count, summary.total), (3, 3))
+            self.assertTrue(path.read_bytes().startswith(head))
+
+            fresh = Path(tmpdir) / "fresh.csv"
+            write_report(fresh, iter([alex[0], changed, sam[0]]))
+            self.assertEqual(path.read_bytes(), fresh.read_bytes())
+
+            # Once the file is changed behind its back, nothing is reused.
+            path.write_bytes(b"edited")
+            report.write_csv_report_spliced(path, [("a", alex), (None, sam)], layout)
+            write_report(fresh, iter([alex[0], sam[0]]))
+            self.assertEqual(path.read_bytes(), fresh.read_bytes())
+
+    def test_xlsx_report_is_streamed_across_sheets(self) -> None:
+        ns = {"a": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.object(
+            xlsx_report, "MAX_ROWS_PER_SHEET", 2
+        ):
+            path = Path(tmpdir) / report_filename("xlsx")
+            self.assertEqual(write_report(path, iter(DISCREPANCIES), "xlsx"), 3)
+            with zipfile.ZipFile(path) as archive:
+                shared = [
+                    item.findtext("a:t", namespaces=ns)
+                    for item in ET.fromstring(archive.read("xl/sharedStrings.xml"))
+                ]
+                workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+                sheets = [
+                    ET.fromstring(archive.read(f"xl/worksheets/sheet{idx}.xml")) for idx in (1, 2)
+                ]
+        self.assertEqual(len(workbook.findall("a:sheets/a:sheet", ns)), 2)
+
+        rows = []
+        for sheet in sheets:
+            for row in sheet.findall("a:sheetData/a:row", ns)[1:]:
+                values = {}
+                for cell in row.findall("a:c", ns):
+                    column = cell.get("r").rstrip("0123456789")
+                    if cell.get("t") == "s":
+                        values[column] = shared[int(cell.findtext("a:v", namespaces=ns))]
+                    elif cell.get("t") == "inlineStr":
+                        values[column] = cell.findtext("a:is/a:t", namespaces=ns)
+                    else:
+                        serial = int(cell.findtext("a:v", namespaces=ns))
+                        values[column] = (date(1899, 12, 30) + timedelta(days=serial)).isoformat()
+                rows.append([values.get(column) for column in "ABCDEF"])
+        self.assertEqual(rows, EXPECTED_ROWS)
+
+    def test_xlsx_report_keeps_spaces_and_control_characters(self) -> None:
+        name = "  Ana\x0bMaria\x1f _x0041_ "
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / report_filename("xlsx")
+            write_report(path, iter([Discrepancy(name, None, "day", "x", "y", "mismatch")]), "xlsx")
+            with zipfile.ZipFile(path) as archive:
+                sheet = ET.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+            ns = {"a": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+            text = sheet.find(".//a:c[@r='A2']/a:is/a:t", ns)
+            self.assertEqual(text.get("{http://www.w3.org/XML/1998/namespace}space"), "preserve")
+            self.assertEqual(text.text, "  Ana_x000B_Maria_x001F_ _x005F_x0041_ ")
+            if openpyxl is not None:
+                workbook = openpyxl.load_workbook(path, read_only=True)
+                cell = next(workbook.active.iter_rows(min_row=2, values_only=True))[0]
+                workbook.close()
+                self.assertEqual(ooxml_unescape(cell), name)
+
+    def test_columnar_formats_fall_back_without_pyarrow(self) -> None:
+        with mock.patch.object(report, "pa", None):
+            with self.assertWarns(RuntimeWarning):
+                self.assertEqual(resolve_report_format("parquet"), "jsonl.gz")
+            with self.assertRaises(ImportError):
+                write_report("unused.arrow", [], "arrow")
+        self.assertEqual(resolve_report_format("csv"), "csv")
+        with self.assertRaises(ValueError):
+            resolve_report_format("xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+from src import revalidation
+from src.revalidation import RevalidationState
+
+RESULT = ([], False, [("alex worker", date(2025, 12, 22))])
+
+
+class RevalidationStateTests(unittest.TestCase):
+    def test_runs_sharing_a_state_file_keep_each_others_blocks(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "state.json"
+            # Two uploads of different workbooks start from the same file...
+            first = RevalidationState(path, "rules")
+            second = RevalidationState(path, "rules")
+            first.store("block-a", RESULT)
+            second.store("block-b", RESULT)
+            first.save()
+            second.save()
+            # ...and neither wipes the other's results.
+            merged = RevalidationState(path, "rules")
+            self.assertEqual(merged.lookup("block-a"), RESULT)
+            self.assertEqual(merged.lookup("block-b"), RESULT)
+
+            with mock.patch.object(revalidation, "MAX_STATE_BLOCKS", 2):
+                third = RevalidationState(path, "rules")
+                third.store("block-c", RESULT)
+                third.lookup("block-b")
+                third.save()
+            blocks = json.loads(path.read_text())["blocks"]
+            self.assertEqual(len(blocks), 2)
+            self.assertIn("block-c", blocks)
+
+    def test_results_of_other_validator_code_or_rules_are_dropped(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "state.json"
+            state = RevalidationState(path, "rules")
+            state.store("block-a", RESULT)
+            state.save()
+            self.assertIsNone(RevalidationState(path, "other rules").lookup("block-a"))
+            with mock.patch.object(revalidation, "validator_version", return_value="patched"):
+                self.assertIsNone(RevalidationState(path, "rules").lookup("block-a"))
+            self.assertEqual(RevalidationState(path, "rules").lookup("block-a"), RESULT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.rules import DEFAULT_RULES, RuleSet, load_rule_book
+
+
+def _round_in(minutes: int, boundary: int) -> int:
+    lower = minutes - minutes % boundary
+    nearest = lower if minutes - lower < boundary - (minutes - lower) else lower + boundary
+    return nearest if minutes < nearest else minutes
+
+
+class RuleTests(unittest.TestCase):
+    def test_compiled_rounding_matches_arithmetic(self) -> None:
+        for boundary in (15, 30, 60):
+            compiled = RuleSet(boundary_minutes=boundary).compile()
+            for minute in range(24 * 60):
+                self.assertEqual(compiled.round_in[minute], _round_in(minute, boundary))
+
+    def test_lunch_required_threshold(self) -> None:
+        rules = DEFAULT_RULES.default_rules
+        self.assertFalse(rules.needs_lunch(360))
+        self.assertTrue(rules.needs_lunch(361))
+        self.assertFalse(rules.needs_lunch(-30))
+        self.assertEqual(rules.earliest_return[11 * 60], 11 * 60 + 30)
+
+    def test_load_rule_book_selects_by_department(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "rules.json"
+            path.write_text(
+                json.dumps(
+                    {
+                        "rule_sets": {"kitchen": {"boundary_minutes": 15, "lunch_minutes": 45}},
+                        "departments": {"002": "kitchen"},
+                    }
+                )
+            )
+            book = load_rule_book(path)
+        self.assertEqual(book.for_department("002").rule_set.boundary_minutes, 15)
+        self.assertEqual(book.for_department(" 002 ").rule_set.lunch_minutes, 45)
+        self.assertIs(book.for_department("001"), book.default_rules)
+        self.assertIs(book.for_department(None), book.default_rules)
+
+    def test_rejects_unknown_settings(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "rules.json"
+            path.write_text(json.dumps({"rule_sets": {"x": {"rounding": 5}}}))
+            with self.assertRaises(ValueError):
+                load_rule_book(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,375 @@
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+from factories import build_punch_csv, build_workbook
+from src import runner
+from src.csv_reader import read_punches
+from src.cancellation import CancellationToken, ValidationCancelled, ValidationTimedOut
+from src.metrics import RunMetrics
+from src.report import ReportSummary, write_report
+from src.result_cache import ResultCache
+from src.runner import pair_inputs, run_batch, run_validation, run_validation_async
+from src.validator import validate
+from src.xlsx_reader import read_timesheet
+from src.xlsx_writer import write_statuses
+
+MONDAY = date(2025, 12, 22)
+
+
+def _write_inputs(tmpdir: Path, late_clock_in: bool = False) -> tuple:
+    names = [("Alex", "Worker"), ("Dana", "Smith"), ("Sam", "Lee")]
+    punches = []
+    employees = []
+    for first, last in names:
+        times = {}
+        for offset in range(3):
+            day = MONDAY + timedelta(days=offset)
+            punches.append((first, last, day, 7 * 60, 11 * 60))
+            punches.append((first, last, day, 11 * 60 + 30, 15 * 60 + 30))
+            times[day] = (7 * 60, 11 * 60, 11 * 60 + 30, 15 * 60 + 30)
+        employees.append((f"{first} {last}", MONDAY, times))
+    if late_clock_in:
+        employees[1][2][MONDAY] = (7 * 60 + 20, 11 * 60, 11 * 60 + 30, 15 * 60 + 30)
+    csv_path = tmpdir / "Punch_Report_2025-12-21_2025-12-27.csv"
+    xlsx_path = tmpdir / "timesheet.xlsx"
+    build_punch_csv(csv_path, punches, report_range=(MONDAY - timedelta(days=1), MONDAY + timedelta(days=5)))
+    build_workbook(xlsx_path, employees)
+    return csv_path, xlsx_path
+
+
+class RunnerTests(unittest.TestCase):
+    def test_run_validation_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir)
+            report_path, validated_path, count, ok_count, needs_attention = run_validation(
+                csv_path, xlsx_path, tmpdir / "out"
+            )
+            self.assertTrue(report_path.exists())
+            self.assertTrue(validated_path.exists())
+            self.assertEqual((count, ok_count, needs_attention), (0, 3, 0))
+            self.assertTrue((tmpdir / "out" / "validation_summary.json").exists())
+            self.assertTrue((tmpdir / "out" / "validation_summary.csv").exists())
+
+    def test_progress_reports_each_stage_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir)
+            stages = []
+            run_validation(csv_path, xlsx_path, tmpdir / "out", progress=stages.append)
+            self.assertEqual(stages, ["read_punches", "read_timesheet", "validate", "write_statuses"])
+
+    def test_pipelined_run_matches_sequential_steps(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir, late_clock_in=True)
+            report_path, validated_path, count, _ok, _attention = run_validation(
+                csv_path, xlsx_path, tmpdir / "out", compression="fastest"
+            )
+
+            punches = read_punches(csv_path)
+            blocks = read_timesheet(xlsx_path, target_dates={d.date for d in punches.values()})
+            discrepancies, status_by_row = validate(blocks, punches)
+            write_report(tmpdir / "report.csv", discrepancies)
+            write_statuses(xlsx_path, tmpdir / "validated.xlsx", status_by_row, "fastest")
+
+            self.assertEqual(count, len(discrepancies))
+            self.assertEqual(report_path.read_bytes(), (tmpdir / "report.csv").read_bytes())
+            self.assertEqual(validated_path.read_bytes(), (tmpdir / "validated.xlsx").read_bytes())
+
+    def test_status_only_writes_statuses_without_report(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir, late_clock_in=True)
+            report_path, validated_path, count, ok_count, needs_attention = run_validation(
+                csv_path, xlsx_path, tmpdir / "out", mode="status_only"
+            )
+            self.assertIsNone(report_path)
+            self.assertFalse((tmpdir / "out" / "validation_report.csv").exists())
+            self.assertTrue(validated_path.exists())
+            self.assertEqual((count, ok_count, needs_attention), (0, 2, 1))
+
+    def test_batch_pairs_inputs_by_week_and_writes_manifest(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            first_dir, second_dir = tmpdir / "week1", tmpdir / "week2"
+            first_dir.mkdir()
+            second_dir.mkdir()
+            first_csv, first_xlsx = _write_inputs(first_dir)
+            next_monday = MONDAY + timedelta(days=7)
+            second_csv = second_dir / "Punch_Report_2025-12-28_2026-01-03.csv"
+            second_xlsx = second_dir / "site-b.xlsx"
+            build_punch_csv(second_csv, [("Alex", "Worker", next_monday, 7 * 60, 11 * 60)])
+            build_workbook(
+                second_xlsx,
+                [("Alex Worker", next_monday, {next_monday: (7 * 60 + 20, None, None, 11 * 60)})],
+                sheet_name="1229",
+            )
+
+            pairs = pair_inputs([second_csv, first_csv], [second_xlsx, first_xlsx])
+            self.assertEqual(pairs, [(first_csv, first_xlsx), (second_csv, second_xlsx)])
+            with self.assertRaises(ValueError):
+                pair_inputs([second_csv], [first_xlsx])
+
+            entries = run_batch(pairs, tmpdir / "batch", workers=2)
+            manifest = json.loads((tmpdir / "batch" / "batch_manifest.json").read_text())
+        self.assertEqual(manifest["runs"], entries)
+        self.assertEqual(
+            [(e["discrepancies"], e["ok"], e["needs_attention"]) for e in entries],
+            [(0, 3, 0), (1, 0, 1)],
+        )
+        self.assertTrue(all(e["validated"].endswith("-validated.xlsx") for e in entries))
+
+    def test_incremental_run_revalidates_only_changed_blocks(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            state_path = tmpdir / "state.json"
+            csv_path, xlsx_path = _write_inputs(tmpdir)
+            run_validation(csv_path, xlsx_path, tmpdir / "first", state_path=state_path)
+
+            csv_path, xlsx_path = _write_inputs(tmpdir, late_clock_in=True)
+            with mock.patch.object(runner, "validate_blocks", wraps=runner.validate_blocks) as spy:
+                incremental = run_validation(
+                    csv_path, xlsx_path, tmpdir / "second", state_path=state_path
+                )
+            revalidated = spy.call_args.args[0]
+            self.assertEqual([block.name for block in revalidated], ["Dana Smith"])
+
+            fresh = run_validation(csv_path, xlsx_path, tmpdir / "fresh")
+            self.assertEqual(incremental[2:], fresh[2:])
+            self.assertEqual(incremental[2:], (1, 2, 1))
+            self.assertEqual(incremental[0].read_text(), fresh[0].read_text())
+
+    def test_incremental_rerun_patches_its_report_in_place(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            state_path = tmpdir / "state.json"
+            csv_path, xlsx_path = _write_inputs(tmpdir, late_clock_in=True)
+            run_validation(csv_path, xlsx_path, tmpdir / "out", state_path=state_path)
+
+            # Dana's late clock-in is fixed; Alex's and Sam's blocks are unchanged.
+            csv_path, xlsx_path = _write_inputs(tmpdir)
+            with mock.patch.object(
+                runner, "write_csv_report_spliced", wraps=runner.write_csv_report_spliced
+            ) as splice:
+                patched = run_validation(csv_path, xlsx_path, tmpdir / "out", state_path=state_path)
+            self.assertEqual(splice.call_args.args[0], tmpdir / "out" / "validation_report.csv")
+            self.assertIsNotNone(splice.call_args.args[2])
+
+            fresh = run_validation(csv_path, xlsx_path, tmpdir / "fresh")
+            self.assertEqual(patched[2:], fresh[2:])
+            self.assertEqual(patched[0].read_bytes(), fresh[0].read_bytes())
+
+    def test_cached_run_copies_earlier_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            cache = ResultCache(tmpdir / "cache", max_entries=1)
+            csv_path, xlsx_path = _write_inputs(tmpdir, late_clock_in=True)
+            first = run_validation(csv_path, xlsx_path, tmpdir / "first", cache=cache)
+
+            summary = ReportSummary()
+            with mock.patch.object(runner, "read_punches") as spy:
+                second = run_validation(
+                    csv_path, xlsx_path, tmpdir / "second", cache=cache, summary=summary
+                )
+            spy.assert_not_called()
+            self.assertEqual(first[2:], second[2:])
+            self.assertEqual(first[0].read_bytes(), second[0].read_bytes())
+            self.assertEqual(first[1].read_bytes(), second[1].read_bytes())
+            self.assertEqual(summary.total, 1)
+
+            # Another output option is a different entry, which evicts the first.
+            run_validation(csv_path, xlsx_path, tmpdir / "third", cache=cache, mode="status_only")
+            self.assertEqual(len(list((tmpdir / "cache").iterdir())), 1)
+            with mock.patch.object(runner, "read_punches", wraps=runner.read_punches) as spy:
+                run_validation(csv_path, xlsx_path, tmpdir / "fourth", cache=cache)
+            spy.assert_called_once()
+
+    def test_metrics_are_written_and_sent_to_sinks(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir, late_clock_in=True)
+            received = []
+            metrics = RunMetrics(sinks=[received.append])
+            run_validation(csv_path, xlsx_path, tmpdir / "out", metrics=metrics)
+            payload = json.loads((tmpdir / "out" / "run_metrics.json").read_text())
+        self.assertEqual(received, [metrics])
+        stages = {item["name"]: item for item in payload["stages"]}
+        self.assertEqual(
+            set(stages),
+            {
+                "read_punches",
+                "read_timesheet",
+                "load_workbook",
+                "validate",
+                "write_report",
+                "write_summary",
+                "write_statuses",
+            },
+        )
+        self.assertEqual(stages["read_timesheet"]["counts"], {"blocks": 3, "rows": 9})
+        self.assertEqual(stages["write_report"]["counts"], {"discrepancies": 1})
+        self.assertEqual(stages["write_statuses"]["counts"], {"rows": 3})
+        self.assertGreater(stages["write_statuses"]["peak_bytes"], 0)
+
+    @unittest.skipUnless(Path("/proc/self/statm").exists(), "needs Linux resident-size readings")
+    def test_memory_budget_caps_peak_rss(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir)
+            punches = [
+                (f"First{employee}", f"Last{employee}", MONDAY + timedelta(days=offset), start, end)
+                for offset in range(40)
+                for employee in range(400)
+                for start, end in ((7 * 60, 11 * 60), (11 * 60 + 30, 15 * 60 + 30))
+            ]
+            build_punch_csv(csv_path, punches, report_range=(MONDAY, MONDAY + timedelta(days=5)))
+
+            def run(out_name: str, headroom_mb: int, budgeted: bool) -> tuple:
+                # Each run gets its own process so its peak RSS is its own (read
+                # from VmHWM: ru_maxrss carries the parent's peak across exec).
+                # The budget sits a fixed headroom above the process after imports.
+                script = (
+                    "import json, re, sys\n"
+                    "from src.runner import run_validation\n"
+                    "def peak():\n"
+                    "    status = open('/proc/self/status').read()\n"
+                    "    return int(re.search(r'VmHWM:\\s+(\\d+)', status).group(1)) * 1024\n"
+                    f"budget = peak() + {headroom_mb} * 2**20\n"
+                    f"result = run_validation(sys.argv[1], sys.argv[2], sys.argv[3],"
+                    f" memory_budget=budget if {budgeted} else None)\n"
+                    "print(json.dumps([budget, peak(), result[2:]]))\n"
+                )
+                completed = subprocess.run(
+                    [sys.executable, "-c", script, str(csv_path), str(xlsx_path), str(tmpdir / out_name)],
+                    capture_output=True,
+                    check=True,
+                    text=True,
+                )
+                return tuple(json.loads(completed.stdout))
+
+            budget, unbudgeted_peak, plain = run("plain", 10, budgeted=False)
+            budget, budgeted_peak, capped = run("capped", 10, budgeted=True)
+            self.assertGreater(unbudgeted_peak, budget)
+            self.assertLessEqual(budgeted_peak, budget)
+            self.assertEqual(plain, capped)
+            for name in ("validation_report.csv", "timesheet-validated.xlsx"):
+                self.assertEqual(
+                    (tmpdir / "plain" / name).read_bytes(), (tmpdir / "capped" / name).read_bytes()
+                )
+
+    def test_async_runs_share_one_loop(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir, late_clock_in=True)
+
+            async def main() -> list:
+                return await asyncio.gather(
+                    run_validation_async(csv_path, xlsx_path, tmpdir / "a"),
+                    run_validation_async(csv_path, xlsx_path, tmpdir / "b", report_format="jsonl.gz"),
+                    run_validation_async(csv_path, xlsx_path, tmpdir / "c", mode="status_only"),
+                )
+
+            full, jsonl, status_only = asyncio.run(main())
+            self.assertEqual((full.discrepancies, full.ok, full.needs_attention), (1, 2, 1))
+            self.assertEqual(full.summary.total, 1)
+            self.assertEqual(full.report_path, tmpdir / "a" / "validation_report.csv")
+            self.assertEqual(jsonl.report_path.name, "validation_report.jsonl.gz")
+            self.assertIsNone(status_only.report_path)
+            self.assertIsNone(status_only.summary)
+            self.assertEqual((status_only.ok, status_only.needs_attention), (2, 1))
+
+    def test_async_run_takes_caller_summary_and_token(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir, late_clock_in=True)
+            summary = ReportSummary()
+            result = asyncio.run(
+                run_validation_async(
+                    csv_path, xlsx_path, tmpdir / "a", summary=summary, cancel_token=CancellationToken()
+                )
+            )
+            self.assertIs(result.summary, summary)
+            self.assertEqual(summary.total, 1)
+
+            token = CancellationToken()
+            token.cancel()
+            with self.assertRaises(ValidationCancelled):
+                asyncio.run(run_validation_async(csv_path, xlsx_path, tmpdir / "b", cancel_token=token))
+
+    def test_cancelled_async_run_stops_at_next_stage(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir)
+            started, release = threading.Event(), threading.Event()
+            real_read_punches = runner.read_punches
+
+            def blocking_read_punches(*args):
+                started.set()
+                release.wait(5)
+                return real_read_punches(*args)
+
+            async def main() -> None:
+                task = asyncio.create_task(run_validation_async(csv_path, xlsx_path, tmpdir / "out"))
+                await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+                task.cancel()
+                # Let the task see the cancellation before the worker moves on.
+                await asyncio.sleep(0)
+                await asyncio.sleep(0)
+                release.set()
+                await task
+
+            with mock.patch.object(runner, "read_punches", blocking_read_punches), mock.patch.object(
+                runner, "parse_timesheet", wraps=runner.parse_timesheet
+            ) as parse:
+                with self.assertRaises(asyncio.CancelledError):
+                    asyncio.run(main())
+            parse.assert_not_called()
+            self.assertFalse((tmpdir / "out" / "timesheet-validated.xlsx").exists())
+
+    def test_timed_out_run_leaves_no_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir)
+            with self.assertRaises(ValidationTimedOut):
+                run_validation(csv_path, xlsx_path, tmpdir / "out", timeout=0)
+            self.assertEqual(list((tmpdir / "out").iterdir()), [])
+
+    def test_cancelled_run_removes_only_its_partial_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            csv_path, xlsx_path = _write_inputs(tmpdir)
+            _report, validated_path, *_counts = run_validation(csv_path, xlsx_path, tmpdir / "out")
+            earlier_workbook = validated_path.read_bytes()
+
+            token = CancellationToken()
+            real_write_report = runner.write_report
+
+            def write_then_cancel(*args, **kwargs):
+                count = real_write_report(*args, **kwargs)
+                token.cancel()
+                return count
+
+            with mock.patch.object(runner, "write_report", write_then_cancel):
+                with self.assertRaises(ValidationCancelled):
+                    run_validation(csv_path, xlsx_path, tmpdir / "out", cancel_token=token)
+            names = sorted(path.name for path in (tmpdir / "out").iterdir())
+            # The rewritten report is gone; the earlier workbook and summary
+            # were never touched.
+            self.assertEqual(
+                names,
+                ["timesheet-validated.xlsx", "validation_summary.csv", "validation_summary.json"],
+            )
+            self.assertEqual(validated_path.read_bytes(), earlier_workbook)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from factories import random_week
+from src.rules import RuleBook, RuleSet
+from src.simulation import simulate, write_simulation_report
+from src.validator import _compute_times, resolve_employee_keys, validate
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+POLICIES = [
+    RuleSet("current"),
+    RuleSet("quarter_hour", boundary_minutes=15),
+    RuleSet("lenient", tolerance_minutes=5),
+    RuleSet("long_lunch", lunch_minutes=45, lunch_required_after=300),
+]
+
+
+def _paid_minutes(blocks, punches, policy: RuleSet) -> int:
+    rules = policy.compile()
+    total = 0
+    for block, resolved_key in zip(blocks, resolve_employee_keys(blocks, punches)):
+        for day in block.times_by_date:
+            daily = punches.get((resolved_key, day))
+            if daily is None or len(daily.segments) not in (1, 2):
+                continue
+            _raw, expected, _error = _compute_times(daily, rules)
+            paid = expected.clock_out - expected.clock_in
+            if expected.lunch_in is not None:
+                paid -= expected.lunch_in - expected.lunch_out
+            elif rules.needs_lunch(expected.shift_minutes):
+                paid -= policy.lunch_minutes
+            total += paid
+    return total
+
+
+@unittest.skipUnless(numpy is not None, "numpy is not installed")
+class SimulationTests(unittest.TestCase):
+    def test_matches_validation_per_policy(self) -> None:
+        for seed in range(3):
+            blocks, punches = random_week(seed)
+            summaries = simulate(blocks, punches, POLICIES)
+            self.assertEqual([summary.policy for summary in summaries], [p.name for p in POLICIES])
+            for policy, summary in zip(POLICIES, summaries):
+                discrepancies, status_by_row = validate(
+                    blocks, punches, rules=RuleBook({policy.name: policy}, default=policy.name)
+                )
+                self.assertEqual(summary.discrepancies, len(discrepancies))
+                self.assertEqual(
+                    summary.needs_attention,
+                    sum(1 for status in status_by_row.values() if status != "ok"),
+                )
+                self.assertEqual(summary.paid_minutes, _paid_minutes(blocks, punches, policy))
+
+    def test_writes_changes_against_first_policy(self) -> None:
+        blocks, punches = random_week(1)
+        summaries = simulate(blocks, punches, POLICIES)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "simulation.csv"
+            write_simulation_report(path, summaries)
+            with path.open(newline="") as handle:
+                rows = list(csv.DictReader(handle))
+        self.assertEqual(rows[0]["discrepancy_change"], "0")
+        self.assertEqual(
+            int(rows[2]["discrepancy_change"]),
+            summaries[2].discrepancies - summaries[0].discrepancies,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
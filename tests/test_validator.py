@@ -1,11 +1,24 @@
+import json
 import unittest
 from datetime import date
+from unittest import mock
 
+from factories import random_week
+from src import models, validator
+from src.cancellation import CancellationToken, ValidationCancelled
 from src.models import DailyPunches, EmployeeBlock, PunchSegment, RecordedTimes
-from src.validator import validate
+from src.rules import RuleBook, RuleSet
+from src.validator import iter_validate, validate
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class ValidatorTests(unittest.TestCase):
+    engine = "python"
+
     def test_rounding_and_lunch_rules(self) -> None:
         day = date(2025, 1, 6)
         punches = {
@@ -33,7 +46,7 @@ class ValidatorTests(unittest.TestCase):
             status_row=10,
         )
 
-        discrepancies, status_by_row = validate([block], punches)
+        discrepancies, status_by_row = validate([block], punches, engine=self.engine)
         self.assertEqual(len(discrepancies), 0)
         self.assertEqual(status_by_row.get(10), "ok")
 
@@ -61,7 +74,7 @@ class ValidatorTests(unittest.TestCase):
             status_row=12,
         )
 
-        discrepancies, status_by_row = validate([block], punches)
+        discrepancies, status_by_row = validate([block], punches, engine=self.engine)
         self.assertEqual(len(discrepancies), 0)
         self.assertEqual(status_by_row.get(12), "ok")
 
@@ -92,7 +105,7 @@ class ValidatorTests(unittest.TestCase):
             status_row=20,
         )
 
-        discrepancies, status_by_row = validate([block], punches)
+        discrepancies, status_by_row = validate([block], punches, engine=self.engine)
         self.assertEqual(len(discrepancies), 0)
         self.assertEqual(status_by_row.get(20), "ok")
 
@@ -120,7 +133,7 @@ class ValidatorTests(unittest.TestCase):
             status_row=30,
         )
 
-        discrepancies, status_by_row = validate([block], punches)
+        discrepancies, status_by_row = validate([block], punches, engine=self.engine)
         self.assertEqual(len(discrepancies), 0)
         self.assertEqual(status_by_row.get(30), "ok")
 
@@ -151,12 +164,189 @@ class ValidatorTests(unittest.TestCase):
             status_row=32,
         )
 
-        discrepancies, status_by_row = validate([block], punches)
+        discrepancies, status_by_row = validate([block], punches, engine=self.engine)
         self.assertEqual(status_by_row.get(32), "needs attention")
         self.assertTrue(
             any(d.field == "clock_in_work" and d.error_type == "mismatch" for d in discrepancies)
         )
 
+    def test_discrepancy_text_is_formatted_on_access(self) -> None:
+        day = date(2025, 12, 22)
+        punches = {
+            ("alex worker", day): DailyPunches(
+                employee_name="Alex Worker",
+                employee_key="alex worker",
+                date=day,
+                segments=[PunchSegment(in_minutes=7 * 60 + 20, out_minutes=15 * 60)],
+            )
+        }
+        block = EmployeeBlock(
+            name="Alex Worker",
+            key="alex worker",
+            dates_by_col={},
+            times_by_date={day: RecordedTimes(8 * 60, None, None, 15 * 60)},
+            status_row=8,
+        )
+
+        discrepancies, _ = validate([block], punches, engine=self.engine)
+        clock_in = next(d for d in discrepancies if d.field == "clock_in")
+        self.assertEqual(clock_in.raw_expected, (7 * 60 + 20, 7 * 60 + 30))
+        self.assertEqual(clock_in.raw_actual, 8 * 60)
+        self.assertEqual(clock_in.expected, "07:20 | 07:30")
+        self.assertEqual(clock_in.actual, "08:00")
+        self.assertEqual(clock_in.error_type, "mismatch")
+
+    def test_sequence_and_lunch_errors_keep_numbers_until_rendered(self) -> None:
+        day = date(2025, 12, 24)
+        punches = {}
+        blocks = []
+        segments_by_name = {
+            "Three Pairs": [PunchSegment(7 * 60, 9 * 60), PunchSegment(10 * 60, 11 * 60),
+                            PunchSegment(12 * 60, 15 * 60)],
+            "Short Lunch": [PunchSegment(7 * 60 + 10, 14 * 60 + 58)],
+            "No Lunch": [PunchSegment(7 * 60 + 10, 14 * 60 + 58)],
+        }
+        recorded_by_name = {
+            "Three Pairs": RecordedTimes(7 * 60, None, None, 15 * 60),
+            "Short Lunch": RecordedTimes(7 * 60 + 10, 12 * 60, 12 * 60 + 20, 14 * 60 + 58),
+            "No Lunch": RecordedTimes(7 * 60 + 10, None, None, 14 * 60 + 58),
+        }
+        for row, (name, segments) in enumerate(segments_by_name.items()):
+            key = name.lower()
+            punches[(key, day)] = DailyPunches(name, key, day, segments)
+            blocks.append(EmployeeBlock(name, key, {}, {day: recorded_by_name[name]}, row + 2))
+
+        with mock.patch.object(models, "format_minutes") as format_minutes:
+            discrepancies, _ = validate(blocks, punches, engine=self.engine)
+        format_minutes.assert_not_called()
+        by_name = {
+            d.employee_name: d for d in discrepancies if d.field in ("punch_sequence", "lunch_break")
+        }
+        raw = {name: (d.raw_expected, d.raw_actual) for name, d in by_name.items()}
+        self.assertEqual(
+            raw,
+            {
+                "Three Pairs": ("1 or 2 punch pairs", 3),
+                "Short Lunch": (30, (12 * 60, 12 * 60 + 20)),
+                "No Lunch": (30, "missing"),
+            },
+        )
+
+        # Text only appears when read, also after a JSON round trip of the state.
+        packed = json.loads(json.dumps([item.pack() for item in by_name.values()]))
+        restored = [models.Discrepancy.unpack(row, day) for row in packed]
+        self.assertEqual(restored, list(by_name.values()))
+        rendered = {d.employee_name: (d.expected, d.actual) for d in restored}
+        self.assertEqual(
+            rendered,
+            {
+                "Three Pairs": ("1 or 2 punch pairs", "3"),
+                "Short Lunch": ("30 minutes", "12:00-12:20"),
+                "No Lunch": ("30 minutes", "missing"),
+            },
+        )
+
+    def test_department_rule_set_is_applied(self) -> None:
+        day = date(2025, 12, 22)
+        punches = {
+            ("alex worker", day): DailyPunches(
+                employee_name="Alex Worker",
+                employee_key="alex worker",
+                date=day,
+                segments=[PunchSegment(in_minutes=7 * 60 + 10, out_minutes=12 * 60)],
+                dept_code="002",
+            )
+        }
+        block = EmployeeBlock(
+            name="Alex Worker",
+            key="alex worker",
+            dates_by_col={},
+            times_by_date={day: RecordedTimes(7 * 60 + 15, None, None, 12 * 60)},
+            status_row=8,
+        )
+        rules = RuleBook({"kitchen": RuleSet("kitchen", boundary_minutes=15)}, {"002": "kitchen"})
+
+        _, default_status = validate([block], punches, engine=self.engine)
+        _, kitchen_status = validate([block], punches, engine=self.engine, rules=rules)
+        self.assertEqual(default_status.get(8), "needs attention")
+        self.assertEqual(kitchen_status.get(8), "ok")
+
+    def test_sharded_workers_match_serial(self) -> None:
+        blocks, punches = random_week(11)
+        blocks.append(
+            EmployeeBlock(
+                name="Worker3 Example",
+                key="worker3 example",
+                dates_by_col={},
+                times_by_date=dict(blocks[3].times_by_date),
+                status_row=999,
+            )
+        )
+        serial = validate(blocks, punches, engine=self.engine)
+        sharded = validate(blocks, punches, engine=self.engine, workers=3)
+        self.assertEqual(sharded, serial)
+        self.assertEqual(list(sharded[1]), list(serial[1]))
+
+    def test_status_only_matches_full_statuses(self) -> None:
+        for seed in range(4):
+            blocks, punches = random_week(seed)
+            _discrepancies, expected = validate(blocks, punches, engine=self.engine)
+            with mock.patch.object(validator, "Discrepancy") as discrepancy:
+                discrepancies, status_by_row = validate(
+                    blocks, punches, engine=self.engine, mode="status_only"
+                )
+            self.assertEqual(discrepancies, [])
+            self.assertEqual(status_by_row, expected)
+            if self.engine == "python":
+                discrepancy.assert_not_called()
+
+    def test_iter_validate_streams_block_by_block(self) -> None:
+        blocks, punches = random_week(5)
+        expected_discrepancies, expected_status = validate(blocks, punches, engine=self.engine)
+
+        status_by_row = {}
+        with mock.patch.object(validator, "_validate_block", wraps=validator._validate_block) as spy:
+            stream = iter_validate(blocks, punches, status_by_row, engine=self.engine)
+            first = next(stream)
+            if self.engine == "python":
+                self.assertLess(spy.call_count, len(blocks))
+            self.assertIn(blocks[0].status_row, status_by_row)
+            streamed = [first, *stream]
+        self.assertEqual(streamed, expected_discrepancies)
+        self.assertEqual(status_by_row, expected_status)
+
+    def test_cancelled_token_stops_between_blocks(self) -> None:
+        blocks, punches = random_week(5)
+        token = CancellationToken()
+        status_by_row = {}
+        stream = iter_validate(blocks, punches, status_by_row, engine=self.engine, cancel_token=token)
+        next(stream)
+        token.cancel()
+        with self.assertRaises(ValidationCancelled):
+            list(stream)
+        self.assertLess(len(status_by_row), len(blocks))
+        with self.assertRaises(ValidationCancelled):
+            validate(blocks, punches, engine=self.engine, mode="status_only", cancel_token=token)
+
+
+@unittest.skipUnless(numpy is not None, "numpy is not installed")
+class NumpyEngineTests(ValidatorTests):
+    engine = "numpy"
+
+    def test_matches_python_engine(self) -> None:
+        rules = RuleBook(
+            {"kitchen": RuleSet("kitchen", boundary_minutes=15, tolerance_minutes=3,
+                                lunch_minutes=45, lunch_required_after=300)},
+            {"002": "kitchen"},
+        )
+        for seed in range(5):
+            blocks, punches = random_week(seed)
+            for rule_book in (None, rules):
+                options = {"rules": rule_book} if rule_book else {}
+                expected = validate(blocks, punches, **options)
+                actual = validate(blocks, punches, engine="numpy", **options)
+                self.assertEqual(actual, expected)
+
 
 if __name__ == "__main__":
     unittest.main()
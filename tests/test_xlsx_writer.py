@@ -1,14 +1,39 @@
+import io
+import struct
 import tempfile
 import unittest
 import zipfile
+import zlib
 import xml.etree.ElementTree as ET
+from datetime import date
 from pathlib import Path
+from unittest import mock
 
-from src.xlsx_writer import write_statuses
+from src import xlsx_writer
+from src.xlsx_writer import _deflate, write_statuses
+from factories import build_workbook
 
 NS = {"a": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
 
 
+def _raw_member(path: Path, item: zipfile.ZipInfo) -> bytes:
+    with path.open("rb") as handle:
+        return xlsx_writer._read_compressed(handle, item)
+
+
+class _Unseekable(io.RawIOBase):
+    """A write-only stream, so zipfile writes data descriptors."""
+
+    def __init__(self, handle) -> None:
+        self._handle = handle
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self._handle.write(data)
+
+
 class XlsxWriterTests(unittest.TestCase):
     def test_writes_status_cell(self) -> None:
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -31,6 +56,117 @@ class XlsxWriterTests(unittest.TestCase):
                 value = shared[int(cell.text)]
                 self.assertEqual(value, "needs attention")
 
+    def test_parallel_deflate_is_deterministic(self) -> None:
+        data = b"".join(
+            f'<row r="{idx}"><c r="A{idx}" t="s"><v>{idx % 97}</v></c></row>'.encode()
+            for idx in range(120_000)
+        )
+        self.assertGreater(len(data), xlsx_writer.PARALLEL_DEFLATE_THRESHOLD)
+        outputs = {_deflate(data, 6, workers) for workers in (2, 4, 8)}
+        self.assertEqual(len(outputs), 1)
+        self.assertEqual(zlib.decompress(outputs.pop(), -zlib.MAX_WBITS), data)
+
+    def test_large_sheet_is_written_in_parallel_blocks(self) -> None:
+        monday = date(2025, 12, 22)
+        employees = [
+            (f"Worker {idx:03d}", monday, {monday: (7 * 60, None, None, 15 * 60)})
+            for idx in range(60)
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "timesheet.xlsx"
+            status_rows = build_workbook(src, employees)
+            statuses = {row: "ok" for row in status_rows}
+            outputs = []
+            for compression in ("fastest", "smallest"):
+                out = Path(tmpdir) / f"validated-{compression}.xlsx"
+                with mock.patch.object(xlsx_writer, "PARALLEL_DEFLATE_THRESHOLD", 1024), \
+                        mock.patch.object(xlsx_writer, "DEFLATE_BLOCK_SIZE", 4096):
+                    write_statuses(src, out, statuses, compression=compression, workers=4)
+                with zipfile.ZipFile(out) as zf:
+                    self.assertIsNone(zf.testzip())
+                    sheet_root = ET.fromstring(zf.read("xl/worksheets/sheet1.xml"))
+                    self.assertIsNotNone(sheet_root.find(f".//a:c[@r='H{status_rows[-1]}']", NS))
+                outputs.append(out.read_bytes())
+
+            again = Path(tmpdir) / "validated-again.xlsx"
+            with mock.patch.object(xlsx_writer, "PARALLEL_DEFLATE_THRESHOLD", 1024), \
+                    mock.patch.object(xlsx_writer, "DEFLATE_BLOCK_SIZE", 4096):
+                write_statuses(src, again, statuses, compression="fastest", workers=2)
+            self.assertEqual(again.read_bytes(), outputs[0])
+
+    def test_unchanged_statuses_are_not_rewritten(self) -> None:
+        monday = date(2025, 12, 22)
+        employees = [
+            (f"Worker {idx}", monday, {monday: (7 * 60, None, None, 15 * 60)}) for idx in range(3)
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "timesheet.xlsx"
+            status_rows = build_workbook(src, employees)
+            first = Path(tmpdir) / "first.xlsx"
+            write_statuses(src, first, {row: "ok" for row in status_rows}, compression="smallest")
+
+            # A re-upload of the validated workbook with one status changed.
+            statuses = {row: "ok" for row in status_rows}
+            with mock.patch.object(xlsx_writer, "_sort_row_cells") as sort_cells:
+                write_statuses(first, Path(tmpdir) / "same.xlsx", statuses, compression="fastest")
+                statuses[status_rows[1]] = "needs attention"
+                write_statuses(first, Path(tmpdir) / "changed.xlsx", statuses)
+            sort_cells.assert_not_called()
+
+            with zipfile.ZipFile(first) as original, zipfile.ZipFile(
+                Path(tmpdir) / "same.xlsx"
+            ) as same, zipfile.ZipFile(Path(tmpdir) / "changed.xlsx") as changed:
+                self.assertIsNone(same.testzip())
+                sheet = "xl/worksheets/sheet1.xml"
+                # Nothing changed: the sheet keeps its original compressed bytes.
+                self.assertEqual(
+                    _raw_member(Path(tmpdir) / "same.xlsx", same.getinfo(sheet)),
+                    _raw_member(first, original.getinfo(sheet)),
+                )
+                self.assertEqual(same.read("xl/sharedStrings.xml"), original.read("xl/sharedStrings.xml"))
+                sheet_root = ET.fromstring(changed.read(sheet))
+                values = [
+                    sheet_root.find(f".//a:c[@r='H{row}']/a:v", NS).text for row in status_rows
+                ]
+                self.assertEqual(len(set(values)), 2)
+                self.assertEqual(values[0], values[2])
+
+    def test_copies_members_with_data_descriptors_and_extra_fields(self) -> None:
+        monday = date(2025, 12, 22)
+        employees = [("Worker 1", monday, {monday: (7 * 60, None, None, 15 * 60)})]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "timesheet.xlsx"
+            status_rows = build_workbook(src, employees)
+            statuses = {row: "ok" for row in status_rows}
+            first = Path(tmpdir) / "first.xlsx"
+            write_statuses(src, first, statuses)
+            # Streamed archives put sizes in a data descriptor after each member;
+            # the extra field makes the local header longer than the bare name.
+            repacked = Path(tmpdir) / "repacked.xlsx"
+            with zipfile.ZipFile(first) as zin, repacked.open("wb") as handle:
+                with zipfile.ZipFile(_Unseekable(handle), "w", zipfile.ZIP_DEFLATED) as zout:
+                    for item in zin.infolist():
+                        info = zipfile.ZipInfo(item.filename, item.date_time)
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        info.extra = struct.pack("<HHBI", 0x5455, 5, 1, 1766400000)
+                        zout.writestr(info, zin.read(item.filename))
+
+            out = Path(tmpdir) / "validated.xlsx"
+            write_statuses(repacked, out, statuses)
+            with zipfile.ZipFile(repacked) as zin, zipfile.ZipFile(out) as zout:
+                sheet = zin.getinfo("xl/worksheets/sheet1.xml")
+                self.assertTrue(sheet.flag_bits & 0x08)
+                self.assertIsNone(zout.testzip())
+                for name in xlsx_writer._STATUS_MEMBERS:
+                    self.assertEqual(zout.read(name), zin.read(name))
+                    self.assertEqual(
+                        _raw_member(out, zout.getinfo(name)), _raw_member(repacked, zin.getinfo(name))
+                    )
+
+    def test_rejects_unknown_compression(self) -> None:
+        with self.assertRaises(ValueError):
+            xlsx_writer.compression_level("tiny")
+
 
 if __name__ == "__main__":
     unittest.main()